@@ -0,0 +1,229 @@
+#Copyright (C) 2025 Akram
+
+import json
+import os
+from datetime import datetime
+from functools import cache
+
+import numpy as np
+import pandas as pd
+
+from core.data_store import NO_DAY, days_to_years, parse_day
+from core.metrics import METRICS_YEARS, load_universe
+
+# Erstes Startjahr der Index-Simulation
+INDEX_START_YEAR = 2011
+
+INDEX_PATH = "data/sp500_index.json"
+DIVIDENDS_PATH = "data/sp500_dividends.json"
+
+
+def index_year_end_records(index_data):
+    """ Jahr ('YYYY') -> Datensatz des letzten Handelstags im Jahr, None wenn ein Datum nicht lesbar ist"""
+    records_by_year = {}
+    for record in index_data.get("historical", []):
+        try:
+            year = record["date"][:4]
+            records_by_year.setdefault(year, []).append(record)
+        except:
+            continue
+
+    year_end_records = {}
+    for year, records in records_by_year.items():
+        try:
+            year_end_records[year] = max(records, key=lambda r: datetime.strptime(r["date"], "%Y-%m-%d"))
+        except:
+            year_end_records[year] = None
+    return year_end_records
+
+def record_price(record):
+    try:
+        return float(record["adjClose"])
+    except:
+        return None
+
+def index_year_end_prices(index_data):
+    """ Jahr ('YYYY') -> adjClose des letzten Handelstags im Jahr, None wenn Datum oder Kurs nicht lesbar"""
+    return {year: record_price(record) for year, record in index_year_end_records(index_data).items()}
+
+def daily_series(records, value_key):
+    """ (Tage, Werte) der Datensätze mit lesbarem Datum und Wert, nach Datum sortiert"""
+    days, values = [], []
+    for record in records:
+        try:
+            day = parse_day(record["date"])
+            value = float(record[value_key])
+        except:
+            continue
+        if day != NO_DAY:
+            days.append(day)
+            values.append(value)
+    days = np.array(days, dtype=np.int64)
+    order = np.argsort(days, kind="stable")
+    return days[order], np.array(values, dtype=np.float64)[order]
+
+
+class IndexBenchmark:
+    """
+    S&P 500 als Vergleichsmaßstab, einmal aus sp500_index.json (und sp500_dividends.json) aufbereitet:
+    - Kursindex: adjClose je Handelstag und je Jahresende (letzter Handelstag wie bisher per Datum bestimmt)
+    - Gesamtrendite-Index: Kurs x Anteile, jede adjDividend wird zum letzten Schlusskurs an oder vor
+      ihrem Datum wieder angelegt (ohne Dividendendaten identisch mit dem Kursindex)
+    Abfragen für beliebige (Startjahr, Haltedauer) sind Array-Zugriffe auf die Jahresendwerte.
+    """
+
+    def __init__(self, index_data, dividend_data=None):
+        year_end_records = index_year_end_records(index_data)
+        self.year_end_prices = {year: record_price(record) for year, record in year_end_records.items()}
+        self.days, self.prices = daily_series(index_data.get("historical", []), "adjClose")
+
+        dividend_days, amounts = daily_series((dividend_data or {}).get("historical", []), "adjDividend")
+        positions = np.searchsorted(self.days, dividend_days, side="right") - 1
+        reinvested = positions >= 0
+        closes = self.prices[positions[reinvested]]
+        factors = np.where(closes > 0, 1 + amounts[reinvested] / np.where(closes > 0, closes, 1), 1.0)
+        self.dividend_days = dividend_days[reinvested]
+        self.dividend_shares = np.cumprod(factors)
+        self.totals = self.prices * self.shares_at(self.days)
+
+        # Jahresendwerte als Arrays: Position = Jahr - first_year, NaN = kein gültiger Wert
+        years = sorted(int(year) for year in self.year_end_prices if year.isdigit())
+        self.first_year = years[0] if years else 0
+        size = years[-1] - self.first_year + 1 if years else 0
+        self.year_end_price = np.full(size, np.nan)
+        self.year_end_total = np.full(size, np.nan)
+        for year, record in year_end_records.items():
+            price = self.year_end_prices[year]
+            if not year.isdigit() or price is None:
+                continue
+            self.year_end_price[int(year) - self.first_year] = price
+            self.year_end_total[int(year) - self.first_year] = price * float(self.shares_at(parse_day(record["date"])))
+
+    def shares_at(self, days):
+        """ Anteile je ursprünglichem Anteil nach Wiederanlage aller Dividenden bis einschließlich days"""
+        days = np.asarray(days, dtype=np.int64)
+        if len(self.dividend_shares) == 0:
+            return np.ones(days.shape)
+        positions = np.searchsorted(self.dividend_days, days, side="right") - 1
+        return np.where(positions >= 0, self.dividend_shares[np.maximum(positions, 0)], 1.0)
+
+    def year_end_values(self, years, total_return=False):
+        """ Jahresendwert je Jahr (Kurs- oder Gesamtrendite-Index), NaN für Jahre ohne gültigen Wert"""
+        values = self.year_end_total if total_return else self.year_end_price
+        positions = np.asarray(years, dtype=np.int64) - self.first_year
+        if len(values) == 0:
+            return np.full(positions.shape, np.nan)
+        inside = (positions >= 0) & (positions < len(values))
+        return np.where(inside, values[np.clip(positions, 0, len(values) - 1)], np.nan)
+
+    def returns(self, start_years, holding_years, total_return=False):
+        """ Rendite (%) vom Jahresende start_years bis zum Jahresende start_years + holding_years (gebroadcastet), NaN = unbekannt"""
+        start_years, holding_years = np.broadcast_arrays(np.asarray(start_years, dtype=np.int64),
+                                                         np.asarray(holding_years, dtype=np.int64))
+        start_values = self.year_end_values(start_years, total_return)
+        end_values = self.year_end_values(start_years + holding_years, total_return)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(start_values > 0, (end_values - start_values) / start_values * 100.0, np.nan)
+
+    def simulate(self, horizons=range(1, 11), total_return=False):
+        """ Index-Simulation (nur Startjahre ab INDEX_START_YEAR) für alle Haltedauern: {Haltedauer: DataFrame}"""
+        start_years = np.array(sorted(int(year) for year in self.year_end_prices if year.isdigit()), dtype=np.int64)
+        start_years = start_years[start_years >= INDEX_START_YEAR]
+        start_values = self.year_end_values(start_years, total_return)
+        results = {}
+        for holding_years in horizons:
+            end_values = self.year_end_values(start_years + holding_years, total_return)
+            simulation_results = []
+            for start_year, start_price, end_price in zip(start_years.tolist(), start_values.tolist(), end_values.tolist()):
+                if np.isnan(start_price) or np.isnan(end_price) or start_price <= 0:
+                    continue
+                total_return_pct = round(((end_price - start_price) / start_price) * 100.0, 2)
+                try:
+                    cagr = round(((end_price / start_price) ** (1 / holding_years) - 1) * 100, 2)
+                except:
+                    cagr = None
+                simulation_results.append({
+                    "StartYear": start_year,
+                    "EndYear": start_year + holding_years,
+                    "BuyPrice": round(start_price, 2),
+                    "SellPrice": round(end_price, 2),
+                    "Return (%)": total_return_pct,
+                    "CAGR (%)": cagr
+                })
+            results[holding_years] = pd.DataFrame(simulation_results)
+        return results
+
+    def results_by_horizon(self, horizons=range(1, 11), total_return=False):
+        """ {Haltedauer: {(StartYear, EndYear): (Return (%), CAGR (%))}}"""
+        return {
+            holding_years: {(row["StartYear"], row["EndYear"]): (row["Return (%)"], row["CAGR (%)"])
+                            for row in frame.to_dict(orient="records")}
+            for holding_years, frame in self.simulate(horizons, total_return).items()
+        }
+
+    def daily_values(self, total_return=False):
+        return self.totals if total_return else self.prices
+
+    def year_end_positions(self):
+        """ Jahr -> Position des letzten Handelstags im Jahr in days"""
+        years = days_to_years(self.days)
+        unique, counts = np.unique(years, return_counts=True)
+        return dict(zip(unique.tolist(), (np.cumsum(counts) - 1).tolist()))
+
+    def values_in_month(self, days, total_return=False):
+        """ Wert am letzten Handelstag an oder vor days im selben Kalendermonat (NaN = keiner)"""
+        days = np.asarray(days, dtype=np.int64)
+        if len(self.days) == 0:
+            return np.full(days.shape, np.nan)
+        positions = np.searchsorted(self.days, days, side="right") - 1
+        found = np.maximum(positions, 0)
+        same_month = (positions >= 0) & (self.days[found].astype("datetime64[D]").astype("datetime64[M]") ==
+                                         days.astype("datetime64[D]").astype("datetime64[M]"))
+        return np.where(same_month, self.daily_values(total_return)[found], np.nan)
+
+
+class EqualWeightBenchmark:
+    """
+    Gleich gewichteter Vergleichsmaßstab: je Startjahr ein Portfolio aus allen Unternehmen der
+    S&P-500-CSV dieses Jahres, mit derselben Engine (Symbolauflösung, Kurse, ggf. DRIP) über alle
+    Haltedauern simuliert wie die Strategien. Ticker ohne gültigen Start- oder Endkurs fallen wie dort heraus.
+    """
+
+    def __init__(self, engine, years=METRICS_YEARS, horizons=range(1, 11)):
+        universe = load_universe(list(years))
+        self.portfolios = {year: group["Ticker"].tolist() for year, group in universe.groupby("Year", sort=False)}
+        max_tickers = max((len(tickers) for tickers in self.portfolios.values()), default=0)
+        self.rows = engine.simulate_rows(self.portfolios, horizons, max_tickers)
+
+    def simulate(self):
+        """ {Haltedauer: DataFrame} mit StartYear, EndYear, Return (%), CAGR (%) und der Anzahl der Unternehmen"""
+        return {
+            holding_years: pd.DataFrame([{"StartYear": row["StartYear"], "EndYear": row["EndYear"],
+                                          "Return (%)": row["TotalReturn (%)"], "CAGR (%)": row["TotalCAGR (%)"],
+                                          "IncludedTickersCount": row["IncludedTickersCount"]} for row in rows])
+            for holding_years, rows in self.rows.items()
+        }
+
+    def results_by_horizon(self):
+        """ {Haltedauer: {(StartYear, EndYear): (Return (%), CAGR (%))}} wie IndexBenchmark.results_by_horizon"""
+        return {
+            holding_years: {(row["StartYear"], row["EndYear"]): (row["TotalReturn (%)"], row["TotalCAGR (%)"])
+                            for row in rows if row["TotalReturn (%)"] is not None}
+            for holding_years, rows in self.rows.items()
+        }
+
+
+@cache
+def get_benchmark(index_path=INDEX_PATH, dividends_path=DIVIDENDS_PATH):
+    """ IndexBenchmark aus den Rohdaten, einmal je Prozess geladen; ohne Dividendendatei nur der Kursindex"""
+    with open(index_path, "r", encoding="utf-8") as f:
+        index_data = json.load(f)
+    dividend_data = None
+    if os.path.exists(dividends_path):
+        with open(dividends_path, "r", encoding="utf-8") as f:
+            dividend_data = json.load(f)
+    return IndexBenchmark(index_data, dividend_data)
+
+def as_benchmark(index_data):
+    """ IndexBenchmark unverändert, Rohdaten aus sp500_index.json werden aufbereitet (ohne Dividenden)"""
+    return index_data if isinstance(index_data, IndexBenchmark) else IndexBenchmark(index_data)
@@ -0,0 +1,276 @@
+#Copyright (C) 2025 Akram
+
+import json
+import os
+from datetime import datetime
+from functools import cache, cached_property
+
+import numpy as np
+
+# Wird erhöht, wenn sich der Aufbau des Speichers ändert (erzwingt einen Neuaufbau)
+STORE_VERSION = 5
+
+RAW_DIR = "data"
+STORE_DIR = "data/store"
+
+# Tabelle -> Rohdatei der FMP API
+SOURCE_FILES = {
+    "prices": "historical_price_full.json",
+    "dividends": "stock_dividend.json",
+    "income": "income_statement_annual.json",
+    "income_quarter": "income_statement_quarter.json",
+}
+# Tabellen, deren Rohdatei fehlen darf (ältere Datenstände): die Tabelle bleibt dann leer
+OPTIONAL_SOURCES = {"income_quarter"}
+
+# Platzhalter für nicht lesbare Datumsangaben / Kalenderjahre
+NO_DAY = np.iinfo(np.int32).min
+NO_YEAR = -1
+
+
+def parse_day(date_str):
+    """ 'YYYY-MM-DD' -> Tage seit 1970-01-01 (int), NO_DAY wenn nicht lesbar"""
+    try:
+        return (datetime.strptime(date_str, "%Y-%m-%d") - datetime(1970, 1, 1)).days
+    except Exception:
+        return NO_DAY
+
+def day_to_str(day):
+    return str(np.datetime64(int(day), "D"))
+
+def str_to_day(date_str):
+    return int(np.datetime64(date_str, "D").astype(np.int64))
+
+def days_to_years(days):
+    days = np.asarray(days)
+    years = days.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int32) + 1970
+    return np.where(days == NO_DAY, NO_YEAR, years).astype(np.int32)
+
+def payment_day(record):
+    """ Zahltag einer Dividende: paymentDate, ohne Angabe der Ex-Tag (date)"""
+    day = parse_day(record.get("paymentDate"))
+    if day == NO_DAY:
+        day = parse_day(record.get("date"))
+    return day
+
+def filing_day(record):
+    """ Veröffentlichung eines Berichts: fillingDate, sonst das Datum aus acceptedDate (NO_DAY wenn beides fehlt)"""
+    day = parse_day(record.get("fillingDate"))
+    if day == NO_DAY:
+        day = parse_day(str(record.get("acceptedDate") or "")[:10])
+    return day
+
+def to_float(value):
+    try:
+        return float(value)
+    except Exception:
+        return np.nan
+
+def to_int(value, default=NO_YEAR):
+    try:
+        return int(value)
+    except Exception:
+        return default
+
+
+# Spalten je Tabelle: Spaltenname -> (Datentyp, Funktion record -> Wert)
+COLUMNS = {
+    "prices": {
+        "day": (np.int32, lambda r: parse_day(r.get("date"))),
+        "adj_close": (np.float64, lambda r: to_float(r.get("adjClose"))),
+        "close": (np.float64, lambda r: to_float(r.get("close"))),
+    },
+    "dividends": {
+        "day": (np.int32, lambda r: parse_day(r.get("date"))),
+        "adj_dividend": (np.float64, lambda r: to_float(r.get("adjDividend"))),
+        "payment_day": (np.int32, payment_day),
+    },
+    "income": {
+        "day": (np.int32, lambda r: parse_day(r.get("date"))),
+        "calendar_year": (np.int32, lambda r: to_int(r.get("calendarYear", 0))),
+        "revenue": (np.float64, lambda r: to_float(r.get("revenue"))),
+        "eps": (np.float64, lambda r: to_float(r.get("eps"))),
+        "filing_day": (np.int32, filing_day),
+    },
+}
+# Quartalsberichte haben denselben Aufbau wie die Jahresberichte (day = Ende des Quartals)
+COLUMNS["income_quarter"] = COLUMNS["income"]
+
+
+def get_records(table, raw, ticker):
+    """ Datensätze eines Tickers aus der Rohdatei, None wenn der Ticker dort keine Daten hat"""
+    entry = raw.get(ticker)
+    if table in ("income", "income_quarter"):
+        return entry if isinstance(entry, list) else None
+    if isinstance(entry, dict) and "historical" in entry:
+        return entry["historical"]
+    return None
+
+def source_fingerprint(raw_dir):
+    fingerprint = {}
+    for table, filename in SOURCE_FILES.items():
+        path = os.path.join(raw_dir, filename)
+        if table in OPTIONAL_SOURCES and not os.path.exists(path):
+            continue
+        stat = os.stat(path)
+        fingerprint[filename] = {"size": stat.st_size, "mtime": stat.st_mtime}
+    return fingerprint
+
+def compile_store(raw_dir=RAW_DIR, store_dir=STORE_DIR):
+    """
+    Wandelt die FMP-Rohdaten (JSON) einmalig in einen spaltenorientierten Speicher um:
+    je Tabelle ein Verzeichnis mit einer .npy-Datei pro Spalte. Die Datensätze eines Tickers liegen
+    zusammenhängend in Originalreihenfolge, offsets[i]:offsets[i+1] ist der Bereich von Ticker i.
+    """
+    raw = {}
+    for table, filename in SOURCE_FILES.items():
+        path = os.path.join(raw_dir, filename)
+        if table in OPTIONAL_SOURCES and not os.path.exists(path):
+            raw[table] = {}
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            raw[table] = json.load(f)
+
+    tickers = sorted(set().union(*(data.keys() for data in raw.values())))
+
+    for table, columns in COLUMNS.items():
+        values = {name: [] for name in columns}
+        offsets = [0]
+        present = []
+        for ticker in tickers:
+            records = get_records(table, raw[table], ticker)
+            present.append(records is not None)
+            for record in records or []:
+                for name, (_, getter) in columns.items():
+                    values[name].append(getter(record))
+            offsets.append(len(values["day"]))
+
+        table_dir = os.path.join(store_dir, table)
+        os.makedirs(table_dir, exist_ok=True)
+        for name, (dtype, _) in columns.items():
+            np.save(os.path.join(table_dir, f"{name}.npy"), np.array(values[name], dtype=dtype))
+        offsets = np.array(offsets, dtype=np.int64)
+        np.save(os.path.join(table_dir, "offsets.npy"), offsets)
+        np.save(os.path.join(table_dir, "present.npy"), np.array(present, dtype=bool))
+        np.save(os.path.join(table_dir, "ticker_id.npy"),
+                np.repeat(np.arange(len(tickers), dtype=np.int32), np.diff(offsets)))
+        np.save(os.path.join(table_dir, "year.npy"), days_to_years(np.array(values["day"], dtype=np.int32)))
+
+    from core.price_matrix import build_price_matrix
+    prices_dir = os.path.join(store_dir, "prices")
+    build_price_matrix(np.load(os.path.join(prices_dir, "day.npy")), np.load(os.path.join(prices_dir, "adj_close.npy")),
+                       np.load(os.path.join(prices_dir, "close.npy")), np.load(os.path.join(prices_dir, "ticker_id.npy")), len(tickers),
+                       os.path.join(store_dir, "price_matrix"))
+
+    # Manifest zuletzt schreiben: ein abgebrochener Lauf hinterlässt keinen scheinbar gültigen Speicher
+    manifest = {"version": STORE_VERSION, "tickers": tickers, "sources": source_fingerprint(raw_dir)}
+    with open(os.path.join(store_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"Datenspeicher in '{store_dir}' erstellt ({len(tickers)} Ticker).")
+
+
+class Table:
+    """ Eine Tabelle des Speichers; Spalten werden per Memory-Mapping geladen"""
+
+    def __init__(self, table_dir, names):
+        self.offsets = np.load(os.path.join(table_dir, "offsets.npy"))
+        self.present = np.load(os.path.join(table_dir, "present.npy"))
+        self.columns = {
+            name: np.load(os.path.join(table_dir, f"{name}.npy"), mmap_mode="r")
+            for name in list(names) + ["ticker_id", "year"]
+        }
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def rows(self, ticker_id):
+        """ Spalten-Ausschnitte eines Tickers, None wenn er in der Rohdatei fehlt"""
+        if ticker_id is None or not self.present[ticker_id]:
+            return None
+        start, end = self.offsets[ticker_id], self.offsets[ticker_id + 1]
+        return {name: column[start:end] for name, column in self.columns.items()}
+
+
+class DataStore:
+    def __init__(self, store_dir=STORE_DIR):
+        with open(os.path.join(store_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.store_dir = store_dir
+        self.tickers = self.manifest["tickers"]
+        self.ticker_index = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.prices = Table(os.path.join(store_dir, "prices"), COLUMNS["prices"])
+        self.dividends = Table(os.path.join(store_dir, "dividends"), COLUMNS["dividends"])
+        self.income = Table(os.path.join(store_dir, "income"), COLUMNS["income"])
+        self.income_quarter = Table(os.path.join(store_dir, "income_quarter"), COLUMNS["income_quarter"])
+
+        from core.price_matrix import PriceMatrix
+        self.price_matrix = PriceMatrix(os.path.join(store_dir, "price_matrix"))
+
+    @cached_property
+    def yearly(self):
+        """ Jahreswerte je (Ticker, Jahr), beim ersten Zugriff einmal berechnet"""
+        from core.yearly_aggregates import YearlyAggregates
+        return YearlyAggregates(self)
+
+    @cached_property
+    def quarterly(self):
+        """ Quartals- und TTM-Werte je (Ticker, Quartal), beim ersten Zugriff einmal berechnet"""
+        from core.quarterly_aggregates import QuarterlyAggregates
+        return QuarterlyAggregates(self)
+
+    @cached_property
+    def income_as_of(self):
+        """ Zeitpunktgenauer Index der Jahresberichte nach Veröffentlichungsdatum"""
+        from core.point_in_time import FilingIndex
+        income = self.income
+        return FilingIndex(income, {"eps": income["calendar_year"], "revenue": income["year"]})
+
+    @cached_property
+    def income_quarter_as_of(self):
+        """ Zeitpunktgenauer Index der Quartalsberichte (Periode = Quartal seit 1970-Q1)"""
+        from core.point_in_time import FilingIndex
+        from core.quarterly_aggregates import day_quarters
+        income = self.income_quarter
+        days = np.asarray(income["day"], dtype=np.int64)
+        quarters = np.where(days == NO_DAY, NO_YEAR, day_quarters(np.where(days == NO_DAY, 0, days)))
+        return FilingIndex(income, {"eps": quarters, "revenue": quarters})
+
+    @cached_property
+    def reinvestment(self):
+        """ Anteile bei Wiederanlage der Dividenden je (Ticker, Handelstag), beim ersten Zugriff einmal berechnet"""
+        from core.reinvestment import DividendReinvestment
+        return DividendReinvestment(self)
+
+    def ticker_id(self, ticker):
+        return self.ticker_index.get(ticker)
+
+    def ticker_ids(self, tickers):
+        """ Ticker-IDs als Array, -1 für Ticker ohne Daten im Speicher"""
+        return np.array([self.ticker_index.get(ticker, -1) for ticker in tickers], dtype=np.int64)
+
+
+def is_current(raw_dir=RAW_DIR, store_dir=STORE_DIR):
+    manifest_path = os.path.join(store_dir, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != STORE_VERSION:
+        return False
+    try:
+        return manifest["sources"] == source_fingerprint(raw_dir)
+    except FileNotFoundError:
+        # Rohdaten nicht vorhanden: vorhandenen Speicher verwenden
+        return True
+
+def load_store(raw_dir=RAW_DIR, store_dir=STORE_DIR):
+    """ Lädt den Datenspeicher; fehlt er oder haben sich die Rohdaten geändert, wird er neu erstellt"""
+    if not is_current(raw_dir, store_dir):
+        compile_store(raw_dir, store_dir)
+    return DataStore(store_dir)
+
+@cache
+def get_store(raw_dir=RAW_DIR, store_dir=STORE_DIR):
+    """ Wie load_store, aber nur beim ersten Aufruf je Prozess; danach wird dieselbe Instanz wiederverwendet"""
+    return load_store(raw_dir, store_dir)
+
@@ -0,0 +1,70 @@
+#Copyright (C) 2025 Akram
+
+import inspect
+import json
+from functools import wraps
+
+from core.data_store import get_store
+
+
+class MetricCache:
+    """
+    Memoisiert Kennzahl-Ergebnisse je (Datensatz, Kennzahl, Jahr, Parameter) für beide Strategien.
+    Der Datensatz-Schlüssel stammt aus dem Manifest des Datenspeichers: Ergebnisse eines älteren
+    Datenstands werden nie wiederverwendet. invalidate() verwirft alles bzw. einen Datensatz.
+    """
+
+    def __init__(self):
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def dataset_key(store):
+        return store.store_dir, json.dumps(store.manifest["sources"], sort_keys=True)
+
+    def get(self, store, metric, year, params, compute):
+        key = (self.dataset_key(store), metric, year, tuple(sorted(params.items())))
+        if key in self._results:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._results[key] = compute()
+        return self._results[key]
+
+    def invalidate(self, store=None):
+        if store is None:
+            self._results.clear()
+            return
+        dataset = self.dataset_key(store)
+        self._results = {key: value for key, value in self._results.items() if key[0] != dataset}
+
+
+# Gemeinsamer Cache aller Analysen eines Prozesses
+metric_cache = MetricCache()
+
+
+def memoize_metric(metric):
+    """
+    Dekorator für Kennzahl-Funktionen f(target_year, **parameter): jedes Ergebnis wird je Datensatz,
+    Jahr und Parameter (inkl. Standardwerten) nur einmal berechnet. Aufrufer dürfen das
+    zurückgegebene Ergebnis nicht verändern.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            target_year = params.pop(next(iter(signature.parameters)))
+            return metric_cache.get(get_store(), metric, target_year, params, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def invalidate_dataset():
+    """ Nach einer Aktualisierung der Rohdaten: Datenspeicher neu laden und alle Kennzahlen verwerfen"""
+    metric_cache.invalidate()
+    get_store.cache_clear()
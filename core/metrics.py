@@ -0,0 +1,285 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+import pandas as pd
+
+from core.data_store import NO_DAY, NO_YEAR, get_store, str_to_day
+from core.metric_cache import memoize_metric, metric_cache
+from core.quarterly_aggregates import QUARTERS_PER_YEAR, quarter_as_of, quarter_end_days
+
+UNIVERSE_PATH = "data/s&p500/sp500_{year}.csv"
+
+# Zeiträume der Kennzahlen in Jahren
+DIVIDEND_CAGR_YEARS = 10
+REVENUE_CAGR_YEARS = 10
+EPS_PROGRESSION_YEARS = 5
+
+# Jahre, für die die Kennzahlen gemeinsam in einem Durchlauf berechnet werden
+METRICS_YEARS = range(2011, 2025)
+
+
+def load_universe(years, path=UNIVERSE_PATH):
+    """
+    S&P-500-Zusammensetzung je Jahr als langer DataFrame (Year, Ticker) in CSV-Reihenfolge.
+    Steht ein Ticker in einer CSV mehrfach, zählt nur die erste Zeile.
+    """
+    frames = [pd.read_csv(path.format(year=year))[["Ticker"]].drop_duplicates("Ticker").assign(Year=year)
+              for year in years]
+    return pd.concat(frames, ignore_index=True)[["Year", "Ticker"]]
+
+def growth_rate(end, start, years):
+    """
+    Jährliche Wachstumsrate in % ((end / start) ** (1 / years) - 1) * 100, NaN wenn end oder start <= 0.
+    Die Potenz wird mit Pythons pow berechnet: numpys SIMD-Potenz weicht im letzten Bit ab,
+    so bleiben die Ergebnisse identisch mit der bisherigen Berechnung je Ticker.
+    """
+    end, start, years = np.broadcast_arrays(np.asarray(end, dtype=np.float64), np.asarray(start, dtype=np.float64),
+                                            np.asarray(years, dtype=np.float64))
+    result = np.full(end.shape, np.nan)
+    valid = (end > 0) & (start > 0) & (years > 0)
+    ratios = (end[valid] / start[valid]).tolist()
+    exponents = (1 / years[valid]).tolist()
+    result[valid] = (np.array([r ** e for r, e in zip(ratios, exponents)], dtype=np.float64) - 1) * 100.0
+    return result
+
+def compute_metrics(store, years, progression_years=EPS_PROGRESSION_YEARS, universe=None, point_in_time=False):
+    """
+    Berechnet alle vier Kennzahlen für jedes (Ticker, Jahr)-Paar der S&P-500-Zusammensetzungen
+    in wenigen Array-Operationen über store.yearly. Ergebnis: ein langer DataFrame mit einer Zeile
+    je Ticker und Jahr (CSV-Reihenfolge) mit den Kennzahlen und ihren Ausgangswerten.
+    Mit point_in_time stammen EPS und Umsatz aus den bis zum 31.12. des Zieljahres
+    veröffentlichten Berichten (store.income_as_of): Endjahr ist das neueste damals bekannte Jahr.
+    """
+    if universe is None:
+        universe = load_universe(years)
+    ticker_ids = store.ticker_ids(universe["Ticker"])
+    target = universe["Year"].to_numpy(dtype=np.int64)
+    known = ticker_ids >= 0
+    yearly = store.yearly
+
+    dividend_sum = yearly.take("dividend_sum", ticker_ids, target)
+    dividend_sum_start = yearly.take("dividend_sum", ticker_ids, target - DIVIDEND_CAGR_YEARS)
+    year_end_close = yearly.take("year_end_close", ticker_ids, target)
+    if point_in_time:
+        as_of = year_end_days(target)
+        income = store.income_as_of
+        eps_years = known_end_years(store, "eps", ticker_ids, target)
+        revenue_years = known_end_years(store, "revenue", ticker_ids, target)
+        eps_start, _ = income.value_as_of("eps", ticker_ids, eps_years - progression_years + 1, as_of)
+        eps_end, _ = income.value_as_of("eps", ticker_ids, eps_years, as_of)
+        revenue_start, revenue_start_day = income.value_as_of("revenue", ticker_ids, revenue_years - REVENUE_CAGR_YEARS, as_of)
+        revenue_end, revenue_end_day = income.value_as_of("revenue", ticker_ids, revenue_years, as_of)
+    else:
+        eps_start = yearly.take("eps", ticker_ids, target - progression_years + 1)
+        eps_end = yearly.take("eps", ticker_ids, target)
+        revenue_start = yearly.take("revenue", ticker_ids, target - REVENUE_CAGR_YEARS)
+        revenue_end = yearly.take("revenue", ticker_ids, target)
+        revenue_start_day = yearly.take("revenue_day", ticker_ids, target - REVENUE_CAGR_YEARS)
+        revenue_end_day = yearly.take("revenue_day", ticker_ids, target)
+
+    dividend_yield = np.full(len(universe), np.nan)
+    has_yield = (dividend_sum != 0) & (year_end_close > 0)
+    dividend_yield[has_yield] = (dividend_sum[has_yield] / year_end_close[has_yield]) * 100.0
+
+    return pd.DataFrame({
+        "Year": target,
+        "Ticker": universe["Ticker"].to_numpy(),
+        "TickerId": ticker_ids,
+        "HasDividendData": known & store.dividends.present[np.maximum(ticker_ids, 0)],
+        "HasPriceData": known & store.prices.present[np.maximum(ticker_ids, 0)],
+        "HasIncomeData": known & store.income.present[np.maximum(ticker_ids, 0)],
+        "DividendSum": dividend_sum,
+        "DividendSumStart": dividend_sum_start,
+        "DividendFirstDayStart": yearly.take("dividend_first_day", ticker_ids, target - DIVIDEND_CAGR_YEARS),
+        "DividendLastDay": yearly.take("dividend_last_day", ticker_ids, target),
+        "YearEndClose": year_end_close,
+        "YearEndDay": yearly.take("year_end_day", ticker_ids, target),
+        "EPSStart": eps_start,
+        "EPSEnd": eps_end,
+        "RevenueStart": revenue_start,
+        "RevenueEnd": revenue_end,
+        "RevenueStartDay": revenue_start_day,
+        "RevenueEndDay": revenue_end_day,
+        "DividendYield": dividend_yield,
+        "DividendCAGR": growth_rate(dividend_sum, dividend_sum_start, DIVIDEND_CAGR_YEARS),
+        "EPSGrowth": growth_rate(eps_end, eps_start, progression_years - 1),
+        "RevenueCAGR": growth_rate(revenue_end, revenue_start, REVENUE_CAGR_YEARS),
+    })
+
+def year_end_days(years):
+    """ Jahre -> Tage seit 1970-01-01 des 31.12."""
+    return (np.asarray(years, dtype=np.int64) - 1969).astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64) - 1
+
+def known_end_years(store, field, ticker_ids, target_years):
+    """
+    Neuestes Jahr eines Feldes (höchstens das Zieljahr), dessen Bericht am 31.12. des Zieljahres
+    bereits veröffentlicht war; NO_YEAR wenn keines bekannt war.
+    """
+    latest = store.income_as_of.latest_period_as_of(field, ticker_ids, year_end_days(target_years))
+    return np.minimum(latest, target_years)
+
+def eps_history(store, ticker_ids, target_years, progression_years=EPS_PROGRESSION_YEARS, point_in_time=False):
+    """
+    EPS der letzten progression_years Jahre bis zum Zieljahr je Zeile (Zeilen x Jahre, ältestes zuerst)
+    und das jeweilige Endjahr; mit point_in_time wie in compute_metrics zum 31.12. des Zieljahres.
+    """
+    ticker_ids = np.asarray(ticker_ids, dtype=np.int64)
+    target_years = np.broadcast_to(np.asarray(target_years, dtype=np.int64), ticker_ids.shape)
+    window = np.arange(1 - progression_years, 1)
+    if not point_in_time:
+        return store.yearly.take("eps", ticker_ids[:, None], target_years[:, None] + window[None, :]), target_years
+    end_years = known_end_years(store, "eps", ticker_ids, target_years)
+    eps, _ = store.income_as_of.value_as_of("eps", ticker_ids[:, None], end_years[:, None] + window[None, :],
+                                            year_end_days(target_years)[:, None])
+    return eps, end_years
+
+@memoize_metric("year_metrics")
+def year_metrics(target_year, progression_years=EPS_PROGRESSION_YEARS, point_in_time=False):
+    """
+    Kennzahlen aller Ticker eines Jahres (CSV-Reihenfolge). Für die Standardparameter ein Ausschnitt
+    der einmal für alle METRICS_YEARS berechneten Kennzahlen; beide Strategien teilen sich das Ergebnis.
+    point_in_time: EPS und Umsatz nur aus am 31.12. veröffentlichten Berichten (compute_metrics).
+    """
+    store = get_store()
+    if progression_years == EPS_PROGRESSION_YEARS and target_year in METRICS_YEARS:
+        metrics = metric_cache.get(store, "all_metrics", None,
+                                   {"years": tuple(METRICS_YEARS), "point_in_time": point_in_time},
+                                   lambda: compute_metrics(store, METRICS_YEARS, point_in_time=point_in_time))
+        return metrics[metrics["Year"] == target_year].reset_index(drop=True)
+    return compute_metrics(store, [target_year], progression_years, point_in_time=point_in_time)
+
+def ttm_as_of(store, field, ticker_ids, quarters, as_of_days):
+    """
+    TTM-Summe eines Feldes bis einschließlich quarters aus den am Stichtag veröffentlichten
+    Quartalsberichten (store.income_quarter_as_of), NaN wenn eines der vier Quartale unbekannt war.
+    """
+    offsets = np.arange(1 - QUARTERS_PER_YEAR, 1)
+    values, _ = store.income_quarter_as_of.value_as_of(field, np.asarray(ticker_ids)[..., None],
+                                                       np.asarray(quarters)[..., None] + offsets,
+                                                       np.asarray(as_of_days)[..., None])
+    return values.sum(axis=-1)
+
+def ttm_end_quarters(store, field, ticker_ids, as_of_days):
+    """ Neuestes am Stichtag abgeschlossene und veröffentlichte Quartal eines Feldes (NO_YEAR = keines)"""
+    latest = store.income_quarter_as_of.latest_period_as_of(field, ticker_ids, as_of_days)
+    return np.minimum(latest, quarter_as_of(as_of_days))
+
+def compute_ttm_metrics(store, as_of_days, tickers, progression_years=EPS_PROGRESSION_YEARS, point_in_time=False):
+    """
+    EPS- und Umsatz-Kennzahlen aus den Trailing-Twelve-Months-Werten (store.quarterly) für Paare
+    (Stichtag, Ticker) auf einmal: je Zeile gilt das letzte am Stichtag abgeschlossene Quartal.
+    EPSGrowth und RevenueCAGR wie bei den Jahreswerten, nur mit TTM-Werten im Abstand ganzer Jahre.
+    Mit point_in_time gilt je Feld das letzte am Stichtag veröffentlichte Quartal.
+    """
+    ticker_ids = store.ticker_ids(tickers)
+    as_of_days = np.broadcast_to(np.asarray(as_of_days, dtype=np.int64), ticker_ids.shape)
+    quarters = quarter_as_of(as_of_days)
+    if point_in_time:
+        eps_quarters = ttm_end_quarters(store, "eps", ticker_ids, as_of_days)
+        revenue_quarters = ttm_end_quarters(store, "revenue", ticker_ids, as_of_days)
+        eps_start = ttm_as_of(store, "eps", ticker_ids, eps_quarters - (progression_years - 1) * QUARTERS_PER_YEAR, as_of_days)
+        eps_end = ttm_as_of(store, "eps", ticker_ids, eps_quarters, as_of_days)
+        revenue_start = ttm_as_of(store, "revenue", ticker_ids, revenue_quarters - REVENUE_CAGR_YEARS * QUARTERS_PER_YEAR, as_of_days)
+        revenue_end = ttm_as_of(store, "revenue", ticker_ids, revenue_quarters, as_of_days)
+        quarter_end = np.where(eps_quarters != NO_YEAR, quarter_end_days(eps_quarters), NO_DAY)
+    else:
+        quarterly = store.quarterly
+        eps_start = quarterly.take("eps_ttm", ticker_ids, quarters - (progression_years - 1) * QUARTERS_PER_YEAR)
+        eps_end = quarterly.take("eps_ttm", ticker_ids, quarters)
+        revenue_start = quarterly.take("revenue_ttm", ticker_ids, quarters - REVENUE_CAGR_YEARS * QUARTERS_PER_YEAR)
+        revenue_end = quarterly.take("revenue_ttm", ticker_ids, quarters)
+        quarter_end = quarter_end_days(quarters)
+    return pd.DataFrame({
+        "AsOf": days_to_str(as_of_days),
+        "Ticker": list(tickers),
+        "TickerId": ticker_ids,
+        "QuarterEnd": days_to_str(quarter_end),
+        "HasQuarterlyData": (ticker_ids >= 0) & store.income_quarter.present[np.maximum(ticker_ids, 0)],
+        "TTMEPSStart": eps_start,
+        "TTMEPSEnd": eps_end,
+        "TTMRevenueStart": revenue_start,
+        "TTMRevenueEnd": revenue_end,
+        "EPSGrowth": growth_rate(eps_end, eps_start, progression_years - 1),
+        "RevenueCAGR": growth_rate(revenue_end, revenue_start, REVENUE_CAGR_YEARS),
+    })
+
+def ttm_eps_history(store, ticker_ids, as_of_days, progression_years=EPS_PROGRESSION_YEARS, point_in_time=False):
+    """ TTM-EPS der letzten progression_years Jahre je Zeile (Zeilen x Jahre, ältestes zuerst), z. B. für eps_progression"""
+    ticker_ids = np.asarray(ticker_ids, dtype=np.int64)
+    as_of_days = np.broadcast_to(np.asarray(as_of_days, dtype=np.int64), ticker_ids.shape)
+    offsets = np.arange(1 - progression_years, 1) * QUARTERS_PER_YEAR
+    if point_in_time:
+        quarters = ttm_end_quarters(store, "eps", ticker_ids, as_of_days)
+        return ttm_as_of(store, "eps", ticker_ids[:, None], quarters[:, None] + offsets[None, :], as_of_days[:, None])
+    quarters = quarter_as_of(as_of_days)
+    return store.quarterly.take("eps_ttm", ticker_ids[:, None], quarters[:, None] + offsets[None, :])
+
+@memoize_metric("ttm_metrics")
+def ttm_metrics(as_of, progression_years=EPS_PROGRESSION_YEARS, point_in_time=False):
+    """
+    TTM-Kennzahlen aller Ticker der S&P-500-Zusammensetzung des Jahres von as_of ('YYYY-MM-DD'),
+    z. B. zu jedem Quartalsende statt nur zum Jahresende; Ergebnis in CSV-Reihenfolge.
+    """
+    as_of_day = str_to_day(as_of)
+    tickers = load_universe([int(as_of[:4])])["Ticker"].tolist()
+    return compute_ttm_metrics(get_store(), as_of_day, tickers, progression_years, point_in_time)
+
+@memoize_metric("quarter_metrics")
+def quarter_metrics(as_of, progression_years=EPS_PROGRESSION_YEARS, point_in_time=False):
+    """
+    Kennzahlen für die Portfoliobildung an einem Quartalsende as_of ('YYYY-MM-DD'): EPSGrowth und
+    RevenueCAGR aus den TTM-Werten (ttm_metrics), Dividendenrendite und Dividenden-CAGR aus dem
+    letzten abgeschlossenen Jahr (year_metrics). Zeilen wie ttm_metrics in CSV-Reihenfolge.
+    """
+    year = int(as_of[:4]) if as_of[5:] == "12-31" else int(as_of[:4]) - 1
+    dividends = year_metrics(year)[["Ticker", "DividendYield", "DividendCAGR"]].drop_duplicates("Ticker")
+    ttm = ttm_metrics(as_of, progression_years, point_in_time)
+    metrics = ttm[["AsOf", "Ticker", "TickerId", "HasQuarterlyData", "EPSGrowth", "RevenueCAGR"]].merge(
+        dividends, on="Ticker", how="left")
+    return metrics[["AsOf", "Ticker", "TickerId", "HasQuarterlyData", "DividendYield", "DividendCAGR", "EPSGrowth", "RevenueCAGR"]]
+
+def eps_progression(eps, threshold=25.0):
+    """
+    Prüft die EPS-Progression für viele Zeilen auf einmal (z. B. Ticker x Zieljahre übereinander),
+    eps: Matrix (Zeilen x Jahre) ohne Lücken. Regel wie bisher je Ticker: jedes Jahr wächst um
+    mindestens threshold %, einmal ist ein Rückgang erlaubt, wenn das Folgejahr über dem bisherigen
+    Höchststand liegt; Vorjahres-EPS <= 0 ist ungültig.
+    Ergebnis: (valid, rates) mit rates[i] = Wachstumsraten in % (auf 2 Stellen) bzw. NaN wenn ungültig.
+    """
+    eps = np.asarray(eps, dtype=np.float64)
+    n, years = eps.shape
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = ((eps[:, 1:] - eps[:, :-1]) / eps[:, :-1]) * 100
+
+    valid = np.ones(n, dtype=bool)
+    allowed_down = np.zeros(n, dtype=bool)
+    recovered = np.zeros(n, dtype=bool)
+    max_eps = eps[:, 0].copy() if years else np.zeros(n)
+    for j in range(years - 1):
+        # Zeilen, deren Jahr j nicht schon als Erholung nach einem Rückgang geprüft wurde
+        active = valid & ~recovered
+        up = growth[:, j] >= threshold
+        recovery = np.zeros(n, dtype=bool)
+        if j + 2 < years:
+            # Erholung nach Rückgang auf genau 0 ergibt keine Wachstumsrate -> ungültig
+            recovery = ((growth[:, j] < 0) & ~allowed_down & (eps[:, j + 2] > max_eps) & (eps[:, j + 1] != 0))
+        step_up = active & (eps[:, j] > 0) & up
+        step_recovery = active & (eps[:, j] > 0) & ~up & recovery
+        valid &= ~(active & ~step_up & ~step_recovery)
+
+        max_eps[step_up] = np.maximum(max_eps[step_up], eps[step_up, j + 1])
+        if j + 2 < years:
+            max_eps[step_recovery] = eps[step_recovery, j + 2]
+        allowed_down |= step_recovery
+        recovered = step_recovery
+
+    # Pythons round statt np.round: gleiche Rundung wie bisher
+    rates = np.full(growth.shape, np.nan)
+    rates[valid] = [[round(rate, 2) for rate in row] for row in growth[valid].tolist()]
+    return valid, rates
+
+def days_to_str(days):
+    """ Tage (Array) -> Liste von 'YYYY-MM-DD', None für NO_DAY"""
+    days = np.asarray(days)
+    strings = days.astype("datetime64[D]").astype(str)
+    return [None if day == NO_DAY else string for day, string in zip(days.tolist(), strings.tolist())]
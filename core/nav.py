@@ -0,0 +1,135 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+
+from core.benchmark import as_benchmark
+from core.data_store import days_to_years
+from core.simulation import RISK_COLUMNS, SimulationEngine
+
+# Handelstage je Jahr für die Annualisierung
+TRADING_DAYS = 252
+
+
+def risk_metrics(nav, risk_free=0.0):
+    """
+    Risikokennzahlen vieler Wertverläufe auf einmal; nav: (Verlauf x Handelstag), NaN nach dem Ende.
+    Ergebnis je Verlauf: annualisierte Volatilität (%), maximaler Drawdown (%) und Sharpe Ratio
+    (annualisierte mittlere Tagesrendite abzüglich risk_free (%) je Volatilität).
+    """
+    nav = np.atleast_2d(np.asarray(nav, dtype=np.float64))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        daily = nav[:, 1:] / nav[:, :-1] - 1
+        counts = np.sum(~np.isnan(daily), axis=1)
+        volatility = np.where(counts > 1, np.nanstd(np.where(counts[:, None] > 1, daily, 0.0), axis=1, ddof=1), np.nan)
+        volatility *= np.sqrt(TRADING_DAYS)
+        mean = np.where(counts > 0, np.nansum(daily, axis=1) / np.maximum(counts, 1), np.nan) * TRADING_DAYS
+        sharpe = np.where(volatility > 0, (mean - risk_free / 100) / volatility, np.nan)
+        # fmax ignoriert NaN: Höchststand bis zum jeweiligen Tag
+        drawdown = np.nanmin(np.where(np.isnan(nav), np.inf, nav / np.fmax.accumulate(nav, axis=1) - 1), axis=1)
+    drawdown = np.where(np.isinf(drawdown), np.nan, drawdown)
+    return volatility * 100, drawdown * 100, sharpe
+
+def risk_fields(volatility, drawdown, sharpe):
+    """ Spalten wie RISK_COLUMNS, gerundet wie die übrigen Ergebnisse; None wenn nicht berechenbar"""
+    def rounded(value):
+        return round(float(value), 2) if np.isfinite(value) else None
+    return {"Volatility (%)": rounded(volatility), "MaxDrawdown (%)": rounded(drawdown), "Sharpe": rounded(sharpe)}
+
+
+class NavEngine(SimulationEngine):
+    """
+    SimulationEngine mit täglicher Auflösung: zusätzlich zu den Jahresend-Werten wird je Startjahr der
+    tägliche Wertverlauf (NAV) jedes Portfolios aus der adjClose-Matrix berechnet. Die Tagesrenditen
+    aller Ticker werden als kumuliertes Produkt verkettet, die Verläufe aller Haltedauern sind ein
+    Matrixprodukt (Gewichte x Ticker-Verläufe). Die Zeilen erhalten zusätzlich die RISK_COLUMNS.
+    Gekauft wird wie bisher zum letzten Kurs des Startjahres, gleich gewichtet und ohne Umschichtung;
+    mit drip = True folgt der Verlauf close und den wieder angelegten Dividenden (store.reinvestment).
+    """
+
+    def __init__(self, store, symbol_changes, risk_free=0.0, drip=False):
+        super().__init__(store, symbol_changes, drip)
+        self.risk_free = risk_free
+        self.matrix = store.price_matrix
+        self.column_years = days_to_years(self.matrix.calendar)
+
+    def ticker_curves(self, start_year, tickers, last_year):
+        """
+        Wertverlauf je investierter Einheit (Ticker x Handelstag) vom letzten Handelstag des Startjahres
+        bis zum letzten Handelstag von last_year; je Tag gilt das in diesem Jahr aktive Symbol, Lücken
+        werden mit dem letzten Kurs aufgefüllt. NaN bis zum ersten Kurs.
+        """
+        first = self.matrix.year_last_column[start_year]
+        columns = np.arange(first, self.matrix.year_last_column[last_year] + 1)
+        hop_ids, hop_years = self.resolve_symbols(tickers)
+        ids = self.ids_in_years(hop_ids, hop_years, np.broadcast_to(self.column_years[columns], (len(tickers), len(columns))))
+        rows = np.maximum(ids, 0)
+        bars = np.asarray(self.matrix.last_bar[rows, columns[None, :]])
+        # DRIP: close statt adjClose, die Dividenden kommen über die wieder angelegten Anteile hinzu
+        closes = self.matrix.close if self.drip else self.matrix.adj_close
+        prices = np.where((ids >= 0) & (bars >= 0), closes[rows, np.maximum(bars, 0)], np.nan)
+
+        # Letzten gültigen Kurs übernehmen (ungültige Kurse)
+        positions = np.where(np.isnan(prices), 0, np.arange(len(columns)))
+        np.maximum.accumulate(positions, axis=1, out=positions)
+        prices = np.take_along_axis(prices, positions, axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            gross = prices[:, 1:] / prices[:, :-1]
+        curves = np.ones(prices.shape)
+        np.cumprod(np.where(np.isnan(gross), 1.0, gross), axis=1, out=curves[:, 1:])
+        if self.drip:
+            # Zuwachs der Anteile je Tag innerhalb des aktiven Symbols, Umbenennungen ändern die Anzahl nicht
+            shares = self.store.reinvestment.shares
+            with np.errstate(divide="ignore", invalid="ignore"):
+                share_gross = shares[rows[:, 1:], columns[None, 1:]] / shares[rows[:, 1:], columns[None, :-1]]
+            curves[:, 1:] *= np.cumprod(np.where(ids[:, 1:] >= 0, share_gross, 1.0), axis=1)
+        curves[np.isnan(prices[:, 0])] = np.nan
+        return curves
+
+    def simulate_start_year(self, start_year, tickers, horizons, max_tickers):
+        rows = super().simulate_start_year(start_year, tickers, horizons, max_tickers)
+        end_years, valid, _, _ = self.ticker_results(start_year, tickers, horizons)
+        included = self.included(valid, max_tickers)
+        calendar_years = self.matrix.year_last_column
+        known = np.array([start_year in calendar_years and year in calendar_years for year in end_years.tolist()])
+        held = np.flatnonzero(included[:, known].any(axis=1)) if known.any() else np.array([], dtype=np.int64)
+
+        nav = np.full((len(end_years), 1), np.nan)
+        if len(held):
+            last_year = int(end_years[known].max())
+            curves = self.ticker_curves(start_year, [tickers[i] for i in held], last_year)
+            weights = included[held].astype(np.float64)
+            counts = weights.sum(axis=0)
+            weights /= np.where(counts > 0, counts, 1)
+            nav = weights.T @ curves
+            nav[counts == 0] = np.nan
+            # Verlauf je Haltedauer endet am letzten Handelstag des Endjahres
+            first = calendar_years[start_year]
+            ends = np.array([calendar_years[year] - first if ok else -1 for year, ok in zip(end_years.tolist(), known)])
+            nav[np.arange(nav.shape[1])[None, :] > ends[:, None]] = np.nan
+
+        for row, volatility, drawdown, sharpe in zip(rows, *risk_metrics(nav, self.risk_free)):
+            row.update(risk_fields(volatility, drawdown, sharpe))
+        return rows
+
+
+def add_index_risk(index_simulations, index_data, risk_free=0.0, total_return=False):
+    """
+    Ergänzt die Index-Simulation ({Haltedauer: DataFrame} aus simulate_index_horizons) um die
+    RISK_COLUMNS des täglichen Verlaufs vom letzten Handelstag des Start- bis zu dem des Endjahres.
+    """
+    benchmark = as_benchmark(index_data)
+    values = benchmark.daily_values(total_return)
+    last_positions = benchmark.year_end_positions()
+    results = {}
+    for holding_years, frame in index_simulations.items():
+        frame = frame.copy()
+        fields = []
+        for start_year, end_year in zip(frame.get("StartYear", []), frame.get("EndYear", [])):
+            first, last = last_positions[int(start_year)], last_positions[int(end_year)]
+            nav = values[first:last + 1] / values[first]
+            fields.append(risk_fields(*(metric[0] for metric in risk_metrics(nav, risk_free))))
+        for column in RISK_COLUMNS:
+            frame[column] = [field[column] for field in fields]
+        results[holding_years] = frame
+    return results
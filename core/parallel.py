@@ -0,0 +1,21 @@
+#Copyright (C) 2025 Akram
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def run_parallel(func, items, jobs=1):
+    """
+    func(item) für alle items; mit jobs > 1 in einem Prozesspool. Die Ergebnisse kommen immer in
+    Eingabereihenfolge zurück, daher sind sie identisch mit dem seriellen Lauf.
+    Wo verfügbar werden die Worker per fork gestartet: sie erben den per Memory-Mapping geladenen
+    Datenspeicher und bereits berechnete Kennzahlen, statt Kopien davon zu erhalten.
+    func muss auf Modulebene definiert sein (picklebar).
+    """
+    items = list(items)
+    if jobs <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(max_workers=min(jobs, len(items)), mp_context=context) as executor:
+        return list(executor.map(func, items))
@@ -0,0 +1,93 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+
+from core.data_store import NO_DAY, NO_YEAR
+
+
+class FilingIndex:
+    """
+    Zeitpunktgenauer Index einer Berichtstabelle (income / income_quarter): je Feld sind die gültigen
+    Berichte nach (Ticker, Periode, Veröffentlichung, Originalreihenfolge) bzw. nach (Ticker,
+    Veröffentlichung, Originalreihenfolge) sortiert und als zusammengesetzte int64-Schlüssel abgelegt.
+    Jede Abfrage "Stand am Tag D" ist eine binäre Suche (np.searchsorted) für alle Anfragen auf einmal.
+    Veröffentlichung = filing_day, fehlt sie, gilt wie bisher das Periodenende (day).
+    periods: Feld -> Periode je Bericht (z. B. calendar_year für EPS, Jahr des Periodenendes für Umsatz).
+    """
+
+    def __init__(self, table, periods):
+        days = np.asarray(table["day"], dtype=np.int64)
+        filing_days = np.asarray(table["filing_day"], dtype=np.int64)
+        self.known_days = np.where(filing_days != NO_DAY, filing_days, days)
+        self.ticker_ids = np.asarray(table["ticker_id"], dtype=np.int64)
+        self.days = days
+        known = self.known_days[self.known_days != NO_DAY]
+        self.first_day = int(known.min()) if len(known) else 0
+        # Tages-Versatz 1..day_span - 1, 0 = vor allen Veröffentlichungen
+        self.day_span = (int(known.max()) - self.first_day + 2) if len(known) else 2
+        self.fields = {name: self._build(np.asarray(table[name]), np.asarray(field_periods, dtype=np.int64))
+                       for name, field_periods in periods.items()}
+
+    def _day_offsets(self, days):
+        return np.clip(np.asarray(days, dtype=np.int64) - self.first_day + 1, 0, self.day_span - 1)
+
+    def _build(self, values, periods):
+        valid = np.flatnonzero(~np.isnan(values) & (periods > 0) & (self.known_days != NO_DAY))
+        ticker_ids, field_periods = self.ticker_ids[valid], periods[valid]
+        first_period = int(field_periods.min()) if len(valid) else 0
+        period_span = (int(field_periods.max()) - first_period + 1) if len(valid) else 1
+        day_offsets = self._day_offsets(self.known_days[valid])
+
+        # Wert einer Periode: letzter Bericht (nach Veröffentlichung, dann Originalreihenfolge)
+        pairs = ticker_ids * period_span + (field_periods - first_period)
+        order = np.lexsort((valid, day_offsets, pairs))
+        by_period = pairs[order] * self.day_span + day_offsets[order]
+
+        # Neueste bekannte Periode: laufendes Maximum je Ticker in Reihenfolge der Veröffentlichung
+        latest_order = np.lexsort((valid, day_offsets, ticker_ids))
+        by_ticker = ticker_ids[latest_order] * self.day_span + day_offsets[latest_order]
+        ranked = ticker_ids[latest_order] * period_span + (field_periods[latest_order] - first_period)
+        # ranked steigt mit dem Ticker, das laufende Maximum beginnt daher je Ticker neu
+        latest = (np.maximum.accumulate(ranked) if len(valid) else ranked) - ticker_ids[latest_order] * period_span + first_period
+        return {
+            "first_period": first_period, "period_span": period_span,
+            "by_period": by_period, "period_rows": valid[order],
+            "by_ticker": by_ticker, "latest": latest, "latest_tickers": ticker_ids[latest_order],
+            "values": values,
+        }
+
+    def value_as_of(self, field, ticker_ids, periods, days):
+        """
+        Wert und Periodenende des letzten bis einschließlich days veröffentlichten Berichts je
+        (Ticker, Periode); Eingaben werden gebroadcastet. (NaN, NO_DAY) wenn keiner bekannt war.
+        """
+        index = self.fields[field]
+        ticker_ids, periods, days = np.broadcast_arrays(np.asarray(ticker_ids, dtype=np.int64),
+                                                        np.asarray(periods, dtype=np.int64),
+                                                        np.asarray(days, dtype=np.int64))
+        values = np.full(ticker_ids.shape, np.nan)
+        period_days = np.full(ticker_ids.shape, NO_DAY, dtype=np.int64)
+        if len(index["by_period"]) == 0:
+            return values, period_days
+        offsets = periods - index["first_period"]
+        pairs = np.maximum(ticker_ids, 0) * index["period_span"] + np.clip(offsets, 0, index["period_span"] - 1)
+        positions = np.searchsorted(index["by_period"], pairs * self.day_span + self._day_offsets(days), side="right") - 1
+        found = np.maximum(positions, 0)
+        valid = ((ticker_ids >= 0) & (offsets >= 0) & (offsets < index["period_span"]) & (days != NO_DAY) &
+                 (positions >= 0) & (index["by_period"][found] // self.day_span == pairs))
+        rows = index["period_rows"][found[valid]]
+        values[valid] = index["values"][rows]
+        period_days[valid] = self.days[rows]
+        return values, period_days
+
+    def latest_period_as_of(self, field, ticker_ids, days):
+        """ Neueste Periode, für die bis einschließlich days ein Bericht veröffentlicht war (NO_YEAR = keine)"""
+        index = self.fields[field]
+        ticker_ids, days = np.broadcast_arrays(np.asarray(ticker_ids, dtype=np.int64), np.asarray(days, dtype=np.int64))
+        if len(index["by_ticker"]) == 0:
+            return np.full(ticker_ids.shape, NO_YEAR, dtype=np.int64)
+        keys = np.maximum(ticker_ids, 0) * self.day_span + self._day_offsets(days)
+        positions = np.searchsorted(index["by_ticker"], keys, side="right") - 1
+        found = np.maximum(positions, 0)
+        valid = (ticker_ids >= 0) & (days != NO_DAY) & (positions >= 0) & (index["latest_tickers"][found] == ticker_ids)
+        return np.where(valid, index["latest"][found], NO_YEAR)
@@ -0,0 +1,96 @@
+#Copyright (C) 2025 Akram
+
+import os
+
+import numpy as np
+
+from core.data_store import NO_DAY, days_to_years
+
+
+def build_price_matrix(days, adj_closes, closes, ticker_ids, n_tickers, matrix_dir):
+    """
+    Legt die dichten Matrizen Ticker x Handelstag der adjClose- und close-Kurse an (NaN = kein Kurs);
+    close ist nur um Splits bereinigt und dient der Wiederanlage von Dividenden (core.reinvestment).
+    calendar enthält alle Handelstage aller Ticker, last_bar[t, c] die Spalte des letzten Kurses
+    von Ticker t an oder vor Spalte c (-1 = keiner). Ein Kurs mit ungültigem adjClose zählt
+    als vorhandener Handelstag mit Wert NaN, wie bisher bei der Suche in den Rohdaten.
+    """
+    valid = days != NO_DAY
+    days, adj_closes, closes, ticker_ids = days[valid], adj_closes[valid], closes[valid], ticker_ids[valid]
+    calendar = np.unique(days).astype(np.int32)
+    columns = np.searchsorted(calendar, days)
+
+    adj_close = np.full((n_tickers, len(calendar)), np.nan)
+    exists = np.zeros((n_tickers, len(calendar)), dtype=bool)
+    # Rückwärts zuweisen: bei doppelten Datumsangaben gilt der erste Datensatz
+    adj_close[ticker_ids[::-1], columns[::-1]] = adj_closes[::-1]
+    close = np.full((n_tickers, len(calendar)), np.nan)
+    close[ticker_ids[::-1], columns[::-1]] = closes[::-1]
+    exists[ticker_ids, columns] = True
+
+    last_bar = np.where(exists, np.arange(len(calendar), dtype=np.int32), np.int32(-1))
+    np.maximum.accumulate(last_bar, axis=1, out=last_bar)
+
+    os.makedirs(matrix_dir, exist_ok=True)
+    np.save(os.path.join(matrix_dir, "calendar.npy"), calendar)
+    np.save(os.path.join(matrix_dir, "adj_close.npy"), adj_close)
+    np.save(os.path.join(matrix_dir, "close.npy"), close)
+    np.save(os.path.join(matrix_dir, "last_bar.npy"), last_bar)
+
+
+class PriceMatrix:
+    """
+    adjClose- und close-Matrix (Ticker x Handelstag) per Memory-Mapping: mehrere Prozesse teilen sich die
+    Seiten im Page-Cache, statt die Kurse zu kopieren. Alle Abfragen sind reine Array-Indizierung.
+    Ticker-IDs dürfen Skalare (None = unbekannt) oder Arrays wie aus DataStore.ticker_ids (-1 = unbekannt) sein.
+    """
+
+    def __init__(self, matrix_dir):
+        self.calendar = np.load(os.path.join(matrix_dir, "calendar.npy"))
+        self.adj_close = np.load(os.path.join(matrix_dir, "adj_close.npy"), mmap_mode="r")
+        self.close = np.load(os.path.join(matrix_dir, "close.npy"), mmap_mode="r")
+        self.last_bar = np.load(os.path.join(matrix_dir, "last_bar.npy"), mmap_mode="r")
+
+        self.years, first_columns = np.unique(days_to_years(self.calendar), return_index=True)
+        self.year_first_column = dict(zip(self.years.tolist(), first_columns.tolist()))
+        last_columns = np.append(first_columns[1:], len(self.calendar)) - 1
+        self.year_last_column = dict(zip(self.years.tolist(), last_columns.tolist()))
+
+    def column_on_or_before(self, day):
+        """ Spalte des letzten Kalendertags <= day (-1 wenn day vor dem ersten Handelstag liegt)"""
+        return int(np.searchsorted(self.calendar, day, side="right")) - 1
+
+    def _lookup(self, ticker_ids, column, first_column=0):
+        ticker_ids = np.asarray(-1 if ticker_ids is None else ticker_ids, dtype=np.int64)
+        if column < 0:
+            return np.full(ticker_ids.shape, np.nan), np.full(ticker_ids.shape, NO_DAY, dtype=np.int64)
+        rows = np.maximum(ticker_ids, 0)
+        bars = self.last_bar[rows, column]
+        valid = (ticker_ids >= 0) & (bars >= first_column)
+        bars = np.where(valid, bars, 0)
+        closes = np.where(valid, self.adj_close[rows, bars], np.nan)
+        bar_days = np.where(valid, self.calendar[bars], NO_DAY)
+        return closes, bar_days
+
+    def closes_in_columns(self, ticker_ids, columns, first_columns):
+        """
+        adjClose je Ticker an vielen Stichtagen auf einmal: letzter Kurs an oder vor columns, gültig nur ab
+        first_columns (z. B. Monatsanfang). Alle Argumente werden gegeneinander gebroadcastet; NaN = kein Kurs.
+        """
+        ticker_ids, columns, first_columns = np.broadcast_arrays(np.asarray(ticker_ids, dtype=np.int64),
+                                                                 np.asarray(columns, dtype=np.int64),
+                                                                 np.asarray(first_columns, dtype=np.int64))
+        rows = np.maximum(ticker_ids, 0)
+        bars = np.where(columns >= 0, self.last_bar[rows, np.maximum(columns, 0)], -1)
+        valid = (ticker_ids >= 0) & (columns >= 0) & (bars >= first_columns)
+        return np.where(valid, self.adj_close[rows, np.where(valid, bars, 0)], np.nan)
+
+    def close_on_or_before(self, ticker_ids, day):
+        """ (adjClose, Tag) des letzten Kurses an oder vor day; NaN wenn es keinen gibt"""
+        return self._lookup(ticker_ids, self.column_on_or_before(day))
+
+    def last_close_of_year(self, ticker_ids, year):
+        """ (adjClose, Tag) des letzten Kurses im Jahr year; NaN wenn der Ticker im Jahr keinen Kurs hat"""
+        if year not in self.year_last_column:
+            return self._lookup(ticker_ids, -1)
+        return self._lookup(ticker_ids, self.year_last_column[year], self.year_first_column[year])
@@ -0,0 +1,92 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+
+from core.data_store import NO_DAY
+
+# Quartale je Jahr / im rollierenden Zeitraum (Trailing Twelve Months)
+QUARTERS_PER_YEAR = 4
+
+
+def day_quarters(days):
+    """ Tage seit 1970-01-01 -> Quartale seit 1970-Q1 (Quartal des Kalendertags)"""
+    months = np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return months // 3
+
+def quarter_end_days(quarters):
+    """ Quartale seit 1970-Q1 -> letzter Kalendertag des Quartals"""
+    months = (np.asarray(quarters, dtype=np.int64) + 1) * 3
+    return months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64) - 1
+
+def quarter_as_of(days):
+    """ Letztes am Stichtag abgeschlossene Quartal (Quartalsende an oder vor dem Tag)"""
+    return day_quarters(np.asarray(days, dtype=np.int64) + 1) - 1
+
+def quarter_end_calendar(first_year, last_year):
+    """ Letzte Kalendertage aller Quartale vom vierten Quartal first_year bis zum vierten Quartal last_year"""
+    first = (first_year - 1970) * QUARTERS_PER_YEAR + QUARTERS_PER_YEAR - 1
+    last = (last_year - 1970) * QUARTERS_PER_YEAR + QUARTERS_PER_YEAR - 1
+    return quarter_end_days(np.arange(first, last + 1))
+
+
+class QuarterlyAggregates:
+    """
+    Quartalswerte je (Ticker, Quartal) als Matrizen Ticker x Quartal aus income_statement_quarter.json;
+    das Quartal ergibt sich aus dem Periodenende (date). Gibt es je Quartal mehrere gültige Berichte,
+    gilt wie bei den Jahreswerten der letzte.
+    - eps / revenue: Werte des Quartals (NaN = kein Bericht)
+    - eps_ttm / revenue_ttm: Summe der letzten vier Quartale als rollierende Summe über kumulierte
+      Summen, NaN wenn eines der vier Quartale fehlt
+    """
+
+    def __init__(self, store):
+        income = store.income_quarter
+        days = np.asarray(income["day"], dtype=np.int64)
+        quarters = np.where(days == NO_DAY, -1, day_quarters(np.where(days == NO_DAY, 0, days)))
+        known = quarters[days != NO_DAY]
+        self.first_quarter = int(known.min()) if len(known) else 0
+        self.shape = (len(store.tickers), int(known.max()) - self.first_quarter + 1 if len(known) else 0)
+
+        ticker_ids = np.asarray(income["ticker_id"], dtype=np.int64)
+        self.eps = self._last_per_quarter(ticker_ids, quarters, np.asarray(income["eps"]), days != NO_DAY)
+        self.revenue = self._last_per_quarter(ticker_ids, quarters, np.asarray(income["revenue"]), days != NO_DAY)
+        self.eps_ttm = self._trailing_sum(self.eps)
+        self.revenue_ttm = self._trailing_sum(self.revenue)
+
+    def _last_per_quarter(self, ticker_ids, quarters, values, known):
+        valid = np.flatnonzero(known & ~np.isnan(values))
+        keys = ticker_ids[valid] * self.shape[1] + (quarters[valid] - self.first_quarter)
+        # letztes Vorkommen je Schlüssel: erstes Vorkommen in umgekehrter Reihenfolge
+        _, first_reversed = np.unique(keys[::-1], return_index=True)
+        last = valid[len(valid) - 1 - first_reversed]
+        result = np.full(self.shape[0] * self.shape[1], np.nan)
+        result[keys[len(valid) - 1 - first_reversed]] = values[last]
+        return result.reshape(self.shape)
+
+    @staticmethod
+    def _trailing_sum(values):
+        """ Rollierende Summe über QUARTERS_PER_YEAR Quartale, NaN wenn ein Quartal fehlt"""
+        present = ~np.isnan(values)
+        sums = np.zeros((values.shape[0], values.shape[1] + 1))
+        counts = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.int64)
+        np.cumsum(np.where(present, values, 0.0), axis=1, out=sums[:, 1:])
+        np.cumsum(present, axis=1, out=counts[:, 1:])
+        window = QUARTERS_PER_YEAR
+        result = np.full(values.shape, np.nan)
+        if values.shape[1] >= window:
+            complete = counts[:, window:] - counts[:, :-window] == window
+            result[:, window - 1:] = np.where(complete, sums[:, window:] - sums[:, :-window], np.nan)
+        return result
+
+    def take(self, field, ticker_ids, quarters):
+        """
+        Werte eines Feldes für Paare (Ticker-ID, Quartal seit 1970-Q1); ticker_ids und quarters werden
+        gegeneinander gebroadcastet. Unbekannte Ticker (-1) oder Quartale -> NaN.
+        """
+        values = getattr(self, field)
+        ticker_ids, columns = np.broadcast_arrays(np.asarray(ticker_ids, dtype=np.int64),
+                                                  np.asarray(quarters, dtype=np.int64) - self.first_quarter)
+        result = np.full(ticker_ids.shape, np.nan)
+        valid = (ticker_ids >= 0) & (columns >= 0) & (columns < self.shape[1])
+        result[valid] = values[ticker_ids[valid], columns[valid]]
+        return result
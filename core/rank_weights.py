@@ -0,0 +1,102 @@
+#Copyright (C) 2025 Akram
+
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import METRICS_YEARS, year_metrics
+from core.simulation import index_results_by_horizon, summarize_rows
+
+# Kennzahlen der Ranking-Strategie (Reihenfolge der Gewichte)
+RANK_METRICS = ["DividendYield", "DividendCAGR", "EPSGrowth", "RevenueCAGR"]
+
+
+class RankMatrix:
+    """
+    Dichte Ränge (absteigend, wie merge_and_rank) aller Zieljahre als ein Array
+    ranks[Jahr, Ticker, Kennzahl], einmal berechnet. Je Jahr zählen nur Ticker mit allen vier
+    Kennzahlen; kürzere Jahre werden aufgefüllt (valid = False).
+    """
+
+    def __init__(self, years=METRICS_YEARS, point_in_time=False):
+        self.years = list(years)
+        frames = [year_metrics(year, point_in_time=point_in_time)[["Ticker"] + RANK_METRICS].dropna(subset=RANK_METRICS) for year in self.years]
+        size = max((len(frame) for frame in frames), default=0)
+        self.ranks = np.zeros((len(self.years), size, len(RANK_METRICS)))
+        self.valid = np.zeros((len(self.years), size), dtype=bool)
+        self.tickers = np.full((len(self.years), size), None, dtype=object)
+        for i, frame in enumerate(frames):
+            n = len(frame)
+            self.ranks[i, :n] = np.column_stack([frame[metric].rank(method="dense", ascending=False).to_numpy()
+                                                 for metric in RANK_METRICS])
+            self.valid[i, :n] = True
+            self.tickers[i, :n] = frame["Ticker"].to_numpy()
+
+    def scores(self, weights):
+        """ Gewichtete Rangsummen für viele Gewichtungen (Gewichtung x Kennzahl) als ein Matrixprodukt: (Gewichtung, Jahr, Ticker)"""
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        scores = np.einsum("ytm,wm->wyt", self.ranks, weights)
+        scores[:, ~self.valid] = np.inf
+        return scores
+
+    def top_indices(self, weights, top_n):
+        """
+        Positionen der top_n Ticker je (Gewichtung, Jahr) nach aufsteigender Rangsumme per Teilsortierung
+        (argpartition) statt vollständiger Sortierung; gleiche Rangsummen in CSV-Reihenfolge wie die
+        stabile Sortierung in merge_and_rank.
+        Ergebnis (Gewichtung, Jahr, top_n), aufgefüllte Positionen haben die Rangsumme inf.
+        """
+        scores = self.scores(weights)
+        top_n = min(top_n, scores.shape[-1])
+        if top_n == 0:
+            return np.zeros(scores.shape[:2] + (0,), dtype=np.int64), scores
+        # Rangsumme an Position top_n; davor alle kleineren, bei Gleichstand die ersten in CSV-Reihenfolge
+        kth = np.take_along_axis(scores, np.argpartition(scores, top_n - 1, axis=-1)[..., top_n - 1:top_n], axis=-1)
+        less = scores < kth
+        ties = (scores == kth) & (np.cumsum(scores == kth, axis=-1) <= top_n - less.sum(axis=-1, keepdims=True))
+        chosen = np.nonzero(less | ties)[-1].reshape(scores.shape[:2] + (top_n,))
+        # nur die Ausgewählten sortieren: nach Rangsumme, bei Gleichstand nach CSV-Position
+        order = np.lexsort((chosen, np.take_along_axis(scores, chosen, axis=-1)), axis=-1)
+        return np.take_along_axis(chosen, order, axis=-1), scores
+
+    def portfolios(self, weights, top_n=30):
+        """ Je Gewichtung {Zieljahr: top_n Ticker} wie extract_top, direkt für SimulationEngine.simulate_rows"""
+        indices, scores = self.top_indices(weights, top_n)
+        portfolios = []
+        for w in range(indices.shape[0]):
+            portfolios.append({
+                year: [self.tickers[y, t] for t in indices[w, y].tolist() if np.isfinite(scores[w, y, t])]
+                for y, year in enumerate(self.years)
+            })
+        return portfolios
+
+
+def weight_grid(values):
+    """ Alle Gewichtungen der vier Kennzahlen aus values (ohne die reine Null-Gewichtung)"""
+    return [weights for weights in product(values, repeat=len(RANK_METRICS)) if any(weights)]
+
+def evaluate_weightings(rank_matrix, engine, sp500_index, weights, top_ns=(30,), horizons=range(1, 11), max_tickers=20):
+    """
+    Bewertet viele Gewichtungen und Portfoliogrößen: die Rangmatrix wird einmal berechnet, die Top-N
+    Ticker aller Gewichtungen kommen aus einem Matrixprodukt mit Teilsortierung, jede Auswahl wird über
+    alle Haltedauern simuliert. Ergebnis: eine Zeile je (Gewichtung, Top-N, Haltedauer).
+    """
+    weights = [tuple(w) for w in weights]
+    horizons = list(horizons)
+    index_results = index_results_by_horizon(sp500_index, horizons)
+    # Die Top-N eines kleineren N sind der Anfang der Top-N des größten N
+    largest = rank_matrix.portfolios(weights, max(top_ns))
+    results = []
+    for weight, portfolios in zip(weights, largest):
+        for top_n in top_ns:
+            selection = {year: tickers[:top_n] for year, tickers in portfolios.items()}
+            simulations = engine.simulate_rows(selection, horizons, max_tickers)
+            for holding_years in horizons:
+                results.append({
+                    **{f"Weight_{metric}": value for metric, value in zip(RANK_METRICS, weight)},
+                    "TopN": top_n,
+                    "HoldingYears": holding_years,
+                    **summarize_rows(simulations[holding_years], index_results[holding_years])
+                })
+    return pd.DataFrame(results)
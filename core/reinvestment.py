@@ -0,0 +1,73 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+
+from core.data_store import NO_DAY
+
+
+class DividendReinvestment:
+    """
+    Wiederanlage der Dividenden (DRIP) für alle Ticker auf einmal. Gerechnet wird mit close (nur um
+    Splits bereinigt) statt adjClose: adjClose enthält die Dividenden bereits, ihre Wiederanlage würde
+    sie doppelt zählen. Jede adjDividend (ebenfalls nur um Splits bereinigt) kauft am Zahltag zum
+    letzten close an oder vor diesem Tag neue Anteile, je Zahltag wächst die Anzahl der Anteile um den
+    Faktor 1 + Dividende / Kurs. shares[Ticker, Handelstag] ist das kumulierte Produkt dieser Faktoren
+    über die close-Matrix (1.0 vor der ersten Dividende), year_end_shares derselbe Wert je Jahresende,
+    year_end_close der letzte close des Jahres (NaN = kein Kurs im Jahr). Dividenden ohne Kurs an oder
+    vor dem Zahltag oder mit Zahltag nach dem letzten Handelstag werden nicht angelegt.
+    """
+
+    def __init__(self, store):
+        matrix = store.price_matrix
+        dividends = store.dividends
+        days = np.asarray(dividends["payment_day"], dtype=np.int64)
+        amounts = np.asarray(dividends["adj_dividend"])
+        ticker_ids = np.asarray(dividends["ticker_id"], dtype=np.int64)
+        columns = np.searchsorted(matrix.calendar, days, side="right") - 1
+        valid = (days != NO_DAY) & ~np.isnan(amounts) & (columns >= 0) & (days <= matrix.calendar[-1])
+        ticker_ids, columns, amounts = ticker_ids[valid], columns[valid], amounts[valid]
+
+        bars = np.asarray(matrix.last_bar[ticker_ids, columns])
+        closes = np.where(bars >= 0, matrix.close[ticker_ids, np.maximum(bars, 0)], np.nan)
+        reinvested = closes > 0
+        factors = np.ones(matrix.close.shape)
+        # Mehrere Dividenden am selben Tag: Faktoren multiplizieren (Anlage nacheinander zum selben Kurs)
+        np.multiply.at(factors, (ticker_ids[reinvested], columns[reinvested]),
+                       1 + amounts[reinvested] / closes[reinvested])
+        self.shares = np.cumprod(factors, axis=1)
+
+        self.first_year = int(matrix.years[0]) if len(matrix.years) else 0
+        last_columns = [matrix.year_last_column[year] for year in matrix.years.tolist()]
+        first_columns = [matrix.year_first_column[year] for year in matrix.years.tolist()]
+        self.year_end_shares = self.shares[:, last_columns]
+        year_bars = np.asarray(matrix.last_bar[:, last_columns])
+        in_year = year_bars >= np.array(first_columns)[None, :]
+        self.year_end_close = np.where(in_year, matrix.close[np.arange(len(year_bars))[:, None],
+                                                             np.maximum(year_bars, 0)], np.nan)
+
+    def closes(self, ticker_ids, years):
+        """ Letzter close je (Ticker-ID, Jahr), gegeneinander gebroadcastet; NaN für unbekannte Ticker und Jahre"""
+        ticker_ids, years = np.broadcast_arrays(np.asarray(ticker_ids, dtype=np.int64), np.asarray(years, dtype=np.int64))
+        columns = years - self.first_year
+        valid = (ticker_ids >= 0) & (columns >= 0) & (columns < self.year_end_close.shape[1])
+        result = np.full(ticker_ids.shape, np.nan)
+        result[valid] = self.year_end_close[ticker_ids[valid], columns[valid]]
+        return result
+
+    def growth(self, ticker_ids, first_years, last_years):
+        """
+        Wachstum der Anteile durch Wiederanlage vom Jahresende first_years bis zum Jahresende last_years
+        (Zahltage in den Jahren first_years + 1 .. last_years); 1.0 für leere Zeiträume und unbekannte Ticker.
+        """
+        ticker_ids, first_years, last_years = np.broadcast_arrays(np.asarray(ticker_ids, dtype=np.int64),
+                                                                  np.asarray(first_years, dtype=np.int64),
+                                                                  np.asarray(last_years, dtype=np.int64))
+        size = self.year_end_shares.shape[1]
+        first = first_years - self.first_year
+        last = last_years - self.first_year
+        valid = (ticker_ids >= 0) & (last > first) & (last >= 0) & (last < size)
+        rows = np.maximum(ticker_ids, 0)
+        # Vor dem ersten Jahr der Kursdaten gibt es noch keine angelegten Dividenden
+        start = np.where(first >= 0, self.year_end_shares[rows, np.clip(first, 0, size - 1)], 1.0)
+        end = self.year_end_shares[rows, np.clip(last, 0, size - 1)]
+        return np.where(valid, end / start, 1.0)
@@ -0,0 +1,263 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+import pandas as pd
+
+from core.benchmark import as_benchmark
+from core.data_store import day_to_str, str_to_day
+from core.simulation import END_YEAR_LIMIT
+
+
+def day_months(days):
+    """ Tage seit 1970-01-01 -> Monate seit 1970-01"""
+    return np.asarray(days, dtype=np.int64).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+def month_first_days(months):
+    """ Monate seit 1970-01 -> erster Kalendertag des Monats (Tage seit 1970-01-01)"""
+    return np.asarray(months, dtype=np.int64).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+
+def day_years(days):
+    return day_months(days) // 12 + 1970
+
+def shift_years(days, years):
+    """ Datum um years Jahre verschieben; gibt es den Tag nicht (29.02.), gilt der letzte Tag des Monats"""
+    months = day_months(days)
+    day_of_month = np.asarray(days, dtype=np.int64) - month_first_days(months)
+    shifted = months + 12 * years
+    month_length = month_first_days(shifted + 1) - month_first_days(shifted)
+    return month_first_days(shifted) + np.minimum(day_of_month, month_length - 1)
+
+def month_end_calendar(first_year, last_day):
+    """ Letzte Kalendertage aller Monate ab Dezember first_year bis einschließlich last_day"""
+    months = np.arange(day_months(str_to_day(f"{first_year}-12-01")), day_months(last_day) + 1)
+    return month_first_days(months + 1) - 1
+
+
+class RollingSimulation:
+    """
+    Simulation mit rollierenden Einstiegszeitpunkten (Standard: jedes Monatsende) statt nur zum
+    Jahresende. Zu jedem Einstieg gilt das zuletzt gebildete Portfolio (Zieljahr mit Jahresende am
+    oder vor dem Einstieg), verkauft wird am selben Kalendertag Haltedauer Jahre später. Kurse und
+    Dividenden kommen aus vorberechneten Arrays: adjClose an den Stichtagen (letzter Kurs im selben
+    Monat, sonst ungültig), die Jahressummen der Dividenden aus YearlyAggregates (wie in SimulationEngine
+    ab Beginn des Einstiegsjahres) und im Verkaufsjahr kumulierte Monatssummen. Einstiege am 31.12.
+    ergeben so bitgleich die Dividendensummen der Jahressimulation; alle Einstiege eines Portfolios werden
+    für alle Haltedauern gemeinsam ausgewertet. engine: SimulationEngine (Symbolauflösung).
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        store = engine.store
+        self.matrix = store.price_matrix
+        self.yearly = store.yearly
+        # Monatssummen je (Ticker, Jahr) mit denselben Jahren wie YearlyAggregates, kumuliert über die
+        # Monate: dividend_ytd[t, Jahr, m] = Dividenden von Januar bis einschließlich Monat m + 1
+        dividends = store.dividends
+        years = dividends["year"]
+        valid = (years >= self.yearly.first_year) & (years <= self.yearly.last_year) & ~np.isnan(dividends["adj_dividend"])
+        year_keys = dividends["ticker_id"][valid].astype(np.int64) * self.yearly.shape[1] + (years[valid] - self.yearly.first_year)
+        keys = year_keys * 12 + day_months(dividends["day"][valid]) % 12
+        monthly = np.bincount(keys, weights=dividends["adj_dividend"][valid],
+                              minlength=self.yearly.size * 12).reshape(self.yearly.shape + (12,))
+        self.dividend_ytd = np.cumsum(monthly, axis=2)
+
+    def closes(self, ticker_ids, days):
+        """ adjClose des letzten Kurses an oder vor days im selben Kalendermonat (NaN = keiner)"""
+        days = np.asarray(days, dtype=np.int64)
+        columns = np.searchsorted(self.matrix.calendar, days, side="right") - 1
+        first_columns = np.searchsorted(self.matrix.calendar, month_first_days(day_months(days)), side="left")
+        return self.matrix.closes_in_columns(ticker_ids, columns, first_columns)
+
+    def dividend_total(self, ticker_ids, first_years, last_years, exit_months):
+        """
+        Dividendensumme je Ticker für die Jahre first_years..last_years, im Jahr des Verkaufs nur bis
+        einschließlich Monat exit_months (1-12). Volle Jahre kommen aus YearlyAggregates.dividend_total,
+        bei Verkauf im Dezember ist die Summe damit dieselbe wie in SimulationEngine.
+        """
+        ticker_ids, first_years, last_years, exit_months = np.broadcast_arrays(
+            np.asarray(ticker_ids, dtype=np.int64), np.asarray(first_years, dtype=np.int64),
+            np.asarray(last_years, dtype=np.int64), np.asarray(exit_months, dtype=np.int64))
+        # das Verkaufsjahr (last_years) zählt nur bei Verkauf im Dezember als volles Jahr
+        partial = exit_months < 12
+        totals = self.yearly.dividend_total(ticker_ids, first_years, np.where(partial, last_years - 1, last_years))
+        columns = last_years - self.yearly.first_year
+        take = (partial & (ticker_ids >= 0) & (first_years <= last_years)
+                & (columns >= 0) & (columns < self.yearly.shape[1]))
+        totals[take] += self.dividend_ytd[ticker_ids[take], columns[take], exit_months[take] - 1]
+        return totals
+
+    def entry_rows(self, portfolio_year, tickers, entry_days, horizons, max_tickers):
+        """ Zeilen aller Einstiege eines Portfolios (Einstieg x Haltedauer) in einem Durchlauf"""
+        engine = self.engine
+        horizons = np.asarray(horizons, dtype=np.int64)
+        exit_days = shift_years(entry_days[:, None], horizons[None, :]).ravel()
+        starts = np.repeat(entry_days, len(horizons))
+        hop_ids, hop_years = engine.resolve_symbols(tickers)
+        n = len(tickers)
+        start_ids = engine.ids_in_years(hop_ids, hop_years, np.broadcast_to(day_years(starts), (n, len(starts))))
+        end_ids = engine.ids_in_years(hop_ids, hop_years, np.broadcast_to(day_years(exit_days), (n, len(starts))))
+        start_prices = self.closes(start_ids, starts[None, :])
+        end_prices = self.closes(end_ids, exit_days[None, :])
+        valid = ~np.isnan(start_prices) & ~np.isnan(end_prices) & (start_prices > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = ((end_prices - start_prices) / start_prices) * 100.0
+        included = engine.included(valid, max_tickers)
+        end_values = np.cumsum(np.where(included, 1 + (returns / 100.0), 0.0), axis=0)
+
+        # Dividenden wie in SimulationEngine ab Beginn des Einstiegsjahres, je Symbol der Kette für die
+        # Jahre, in denen es aktiv war; im Verkaufsjahr bis einschließlich Verkaufsmonat
+        start_years = day_years(starts)
+        exit_years = day_years(exit_days)
+        exit_months = day_months(exit_days) % 12 + 1
+        bounds = np.concatenate([np.full((n, 1), -np.inf), hop_years, np.full((n, 1), np.inf)], axis=1)
+        dividends = np.zeros(valid.shape)
+        for stage in range(hop_ids.shape[1]):
+            first_years = np.minimum(np.maximum(start_years[None, :], bounds[:, stage, None]), exit_years[None, :] + 1)
+            last_years = np.minimum(exit_years[None, :], bounds[:, stage + 1, None] - 1)
+            # Stufe endet vor dem Verkaufsjahr -> ihr letztes Jahr zählt voll
+            months = np.where(last_years < exit_years[None, :], 12, exit_months[None, :])
+            dividends += self.dividend_total(hop_ids[:, stage, None], first_years.astype(np.int64),
+                                             last_years.astype(np.int64), months)
+        total_dividends = np.cumsum(np.where(included, dividends, 0.0), axis=0)
+
+        rows = []
+        for column, (start, exit_day) in enumerate(zip(starts.tolist(), exit_days.tolist())):
+            holding_years = int(horizons[column % len(horizons)])
+            selected = np.flatnonzero(included[:, column]).tolist()
+            count = len(selected)
+            total_return, cagr = None, None
+            if count:
+                total_return = round(((float(end_values[-1, column]) - count) / count) * 100, 2)
+                try:
+                    cagr = round(((1 + total_return / 100.0) ** (1 / holding_years) - 1) * 100, 2)
+                except:
+                    cagr = None
+            rows.append({
+                "EntryDate": day_to_str(start),
+                "ExitDate": day_to_str(exit_day),
+                "HoldingYears": holding_years,
+                "PortfolioYear": portfolio_year,
+                "TotalReturn (%)": total_return,
+                "TotalCAGR (%)": cagr,
+                "TotalDividend": round(float(total_dividends[-1, column]) if count else 0.0, 2),
+                "IncludedTickersCount": count,
+                "IncludedTickers": [tickers[i] for i in selected],
+            })
+        return rows
+
+    def simulate_rows(self, portfolios_by_start_year, entry_days=None, horizons=range(1, 11), max_tickers=20):
+        """
+        {Haltedauer: Zeilen} für alle Einstiege. entry_days: Einstiegstage (Tage seit 1970-01-01 oder
+        'YYYY-MM-DD'), Standard: alle Monatsenden ab dem ersten Portfolio. Ausgewertet werden nur
+        Einstiege mit Verkauf bis zum letzten Handelstag und vor END_YEAR_LIMIT.
+        """
+        horizons = list(horizons)
+        if not portfolios_by_start_year:
+            return {holding_years: [] for holding_years in horizons}
+        last_day = int(self.matrix.calendar[-1])
+        if entry_days is None:
+            entry_days = month_end_calendar(min(portfolios_by_start_year), last_day)
+        entry_days = np.array([str_to_day(day) if isinstance(day, str) else int(day) for day in entry_days], dtype=np.int64)
+        entry_days = np.unique(entry_days)
+        # Portfolio mit dem letzten Jahresende am oder vor dem Einstieg
+        portfolio_years = day_years(entry_days + 1) - 1
+
+        rows_by_horizon = {holding_years: [] for holding_years in horizons}
+        for portfolio_year, tickers in portfolios_by_start_year.items():
+            days = entry_days[portfolio_years == portfolio_year]
+            if len(days) == 0:
+                continue
+            self._add_rows(rows_by_horizon, self.entry_rows(portfolio_year, list(tickers), days, horizons, max_tickers))
+        return self._sorted(rows_by_horizon)
+
+    def simulate_formations(self, portfolios_by_day, horizons=range(1, 11), max_tickers=20):
+        """
+        {Haltedauer: Zeilen} für Portfolios, die an beliebigen Stichtagen gebildet werden (z. B. zu jedem
+        Quartalsende); jedes Portfolio wird an seinem Bildungstag (Tage seit 1970-01-01 oder 'YYYY-MM-DD')
+        gekauft. PortfolioYear wie in simulate_rows: letztes Jahresende am oder vor dem Kauf.
+        """
+        horizons = list(horizons)
+        rows_by_horizon = {holding_years: [] for holding_years in horizons}
+        for day, tickers in portfolios_by_day.items():
+            day = str_to_day(day) if isinstance(day, str) else int(day)
+            portfolio_year = int(day_years(day + 1) - 1)
+            self._add_rows(rows_by_horizon, self.entry_rows(portfolio_year, list(tickers), np.array([day], dtype=np.int64),
+                                                            horizons, max_tickers))
+        return self._sorted(rows_by_horizon)
+
+    def _add_rows(self, rows_by_horizon, rows):
+        """ Nur Zeilen mit Verkauf bis zum letzten Handelstag und vor END_YEAR_LIMIT übernehmen"""
+        last_day = int(self.matrix.calendar[-1])
+        for row in rows:
+            exit_day = str_to_day(row["ExitDate"])
+            if exit_day <= last_day and day_years(exit_day) < END_YEAR_LIMIT:
+                rows_by_horizon[row["HoldingYears"]].append(row)
+
+    @staticmethod
+    def _sorted(rows_by_horizon):
+        for rows in rows_by_horizon.values():
+            rows.sort(key=lambda row: row["EntryDate"])
+        return rows_by_horizon
+
+    def simulate(self, portfolios_by_start_year, entry_days=None, horizons=range(1, 11), max_tickers=20):
+        """ Wie simulate_rows, aber {Haltedauer: DataFrame}"""
+        rows_by_horizon = self.simulate_rows(portfolios_by_start_year, entry_days, horizons, max_tickers)
+        return {holding_years: pd.DataFrame(rows) for holding_years, rows in rows_by_horizon.items()}
+
+
+def index_rolling_returns(index_data, rows_by_horizon, total_return=False):
+    """
+    Index-Rendite je Zeile der rollierenden Simulation: {Haltedauer: {(EntryDate, ExitDate): (Return (%), CAGR (%))}};
+    Kurse wie bei den Aktien: letzter Kurs an oder vor dem Stichtag im selben Kalendermonat.
+    """
+    benchmark = as_benchmark(index_data)
+    results = {}
+    for holding_years, rows in rows_by_horizon.items():
+        results[holding_years] = {}
+        if not rows:
+            continue
+        start_values = benchmark.values_in_month([str_to_day(row["EntryDate"]) for row in rows], total_return).tolist()
+        end_values = benchmark.values_in_month([str_to_day(row["ExitDate"]) for row in rows], total_return).tolist()
+        for row, start_price, end_price in zip(rows, start_values, end_values):
+            if np.isnan(start_price) or np.isnan(end_price) or start_price <= 0:
+                continue
+            total_return_pct = round(((end_price - start_price) / start_price) * 100.0, 2)
+            try:
+                cagr = round(((end_price / start_price) ** (1 / holding_years) - 1) * 100, 2)
+            except:
+                cagr = None
+            results[holding_years][(row["EntryDate"], row["ExitDate"])] = (total_return_pct, cagr)
+    return results
+
+def summarize_rolling(rows_by_horizon, index_returns):
+    """
+    Robustheit je Haltedauer über alle Einstiege: Verteilung von Rendite und CAGR sowie der Anteil
+    der Einstiege, in denen die Strategie den Index schlägt (Rendite und CAGR höher, wie compare_with_index).
+    """
+    results = []
+    for holding_years, rows in rows_by_horizon.items():
+        rows = [row for row in rows if row["TotalReturn (%)"] is not None and row["TotalCAGR (%)"] is not None]
+        if not rows:
+            continue
+        returns = np.array([row["TotalReturn (%)"] for row in rows])
+        cagrs = np.array([row["TotalCAGR (%)"] for row in rows])
+        compared = [(row, index_returns[holding_years][(row["EntryDate"], row["ExitDate"])]) for row in rows
+                    if (row["EntryDate"], row["ExitDate"]) in index_returns[holding_years]]
+        beats = sum(1 for row, (index_return, index_cagr) in compared if index_cagr is not None
+                    and row["TotalReturn (%)"] > index_return and row["TotalCAGR (%)"] > index_cagr)
+        results.append({
+            "HoldingYears": holding_years,
+            "Entries": len(rows),
+            "MeanReturn (%)": float(returns.mean()),
+            "MedianReturn (%)": float(np.median(returns)),
+            "MinReturn (%)": float(returns.min()),
+            "MaxReturn (%)": float(returns.max()),
+            "MeanCAGR (%)": float(cagrs.mean()),
+            "StdCAGR (%)": float(cagrs.std(ddof=1)) if len(cagrs) > 1 else np.nan,
+            "P10CAGR (%)": float(np.percentile(cagrs, 10)),
+            "P90CAGR (%)": float(np.percentile(cagrs, 90)),
+            "ComparedEntries": len(compared),
+            "BeatsIndex": beats,
+            "BeatsIndexShare": beats / len(compared) if compared else np.nan,
+        })
+    return pd.DataFrame(results)
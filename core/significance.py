@@ -0,0 +1,100 @@
+#Copyright (C) 2025 Akram
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import load_universe
+
+
+def sample_without_replacement(rng, population, size, replications):
+    """
+    Positionen von replications Stichproben der Größe size aus range(population), innerhalb einer
+    Stichprobe ohne Wiederholung: je Zeile die size kleinsten von population Zufallsschlüsseln.
+    """
+    keys = rng.random((replications, population))
+    return np.argpartition(keys, size - 1, axis=1)[:, :size]
+
+
+class SignificanceTest:
+    """
+    Resampling-Test der Strategie gegen Zufallsportfolios und den S&P 500 je Haltedauer.
+    Für jedes Startjahr werden die Endwerte (1 + Rendite / 100) aller Unternehmen der S&P-500-CSV
+    einmal als Matrix berechnet; alle Replikationen sind danach nur noch Array-Indizierung:
+    - Zufallsportfolios: gleich große Portfolios (ohne Zurücklegen) aus den Unternehmen des Startjahres
+    - Bootstrap: die Einzelrenditen der Strategie-Portfolios mit Zurücklegen neu gezogen
+    Statistik je Haltedauer ist die mittlere Gesamtrendite (%) über alle Startjahre.
+    """
+
+    def __init__(self, engine, start_years):
+        self.engine = engine
+        universe = load_universe(list(start_years))
+        self.universes = {year: group["Ticker"].tolist() for year, group in universe.groupby("Year", sort=False)}
+        self._pools = {}
+
+    def pool(self, start_year, holding_years):
+        """ Endwerte aller Unternehmen des Startjahres mit gültigem Start- und Endkurs"""
+        key = (start_year, holding_years)
+        if key not in self._pools:
+            tickers = self.universes.get(start_year, [])
+            _, valid, values, _ = self.engine.ticker_results(start_year, tickers, [holding_years])
+            self._pools[key] = values[valid[:, 0], 0]
+        return self._pools[key]
+
+    def strategy_values(self, row, holding_years):
+        """ Endwerte der Ticker eines Strategie-Portfolios (Zeile aus SimulationEngine.simulate_rows)"""
+        _, valid, values, _ = self.engine.ticker_results(row["StartYear"], row["IncludedTickers"], [holding_years])
+        return values[valid[:, 0], 0]
+
+    def run(self, strategy_rows, index_results, replications=10000, confidence=0.95, seed=0):
+        """
+        strategy_rows: {Haltedauer: Zeilen} aus SimulationEngine.simulate_rows, index_results aus
+        index_results_by_horizon. Ergebnis je Haltedauer: Mittelwerte, Konfidenzbänder und p-Werte
+        (Strategie vs. Zufallsportfolios, Strategie vs. Index), sowie der Durchsatz.
+        """
+        rng = np.random.default_rng(seed)
+        tail = (1 - confidence) / 2 * 100
+        results = []
+        for holding_years, rows in strategy_rows.items():
+            started = time.perf_counter()
+            random_sums = np.zeros(replications)
+            bootstrap_sums = np.zeros(replications)
+            strategy_returns, index_returns = [], []
+            for row in rows:
+                key = (row["StartYear"], row["EndYear"])
+                values = self.strategy_values(row, holding_years)
+                pool = self.pool(row["StartYear"], holding_years)
+                if len(values) == 0 or len(pool) == 0 or key not in index_results[holding_years]:
+                    continue
+                size = len(values)
+                strategy_returns.append((values.mean() - 1) * 100)
+                index_returns.append(index_results[holding_years][key][0])
+                random_sums += pool[sample_without_replacement(rng, len(pool), size, replications)].mean(axis=1)
+                bootstrap_sums += values[rng.integers(0, size, size=(replications, size))].mean(axis=1)
+
+            windows = len(strategy_returns)
+            if windows == 0:
+                continue
+            random_means = (random_sums / windows - 1) * 100
+            bootstrap_means = (bootstrap_sums / windows - 1) * 100
+            strategy_mean = float(np.mean(strategy_returns))
+            index_mean = float(np.mean(index_returns))
+            elapsed = time.perf_counter() - started
+            results.append({
+                "HoldingYears": holding_years,
+                "Windows": windows,
+                "StrategyMeanReturn (%)": strategy_mean,
+                "IndexMeanReturn (%)": index_mean,
+                "RandomMeanReturn (%)": float(random_means.mean()),
+                "RandomBandLow (%)": float(np.percentile(random_means, tail)),
+                "RandomBandHigh (%)": float(np.percentile(random_means, 100 - tail)),
+                "StrategyBandLow (%)": float(np.percentile(bootstrap_means, tail)),
+                "StrategyBandHigh (%)": float(np.percentile(bootstrap_means, 100 - tail)),
+                # Anteil der Zufallsportfolios mindestens so gut wie die Strategie
+                "PValueVsRandom": float((1 + np.sum(random_means >= strategy_mean)) / (replications + 1)),
+                # Anteil der Bootstrap-Replikationen, in denen die Strategie den Index nicht schlägt
+                "PValueVsIndex": float((1 + np.sum(bootstrap_means <= index_mean)) / (replications + 1)),
+                "PortfoliosPerSecond": round(2 * replications * windows / elapsed) if elapsed > 0 else None,
+            })
+        return pd.DataFrame(results)
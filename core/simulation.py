@@ -0,0 +1,296 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+import pandas as pd
+
+from core.benchmark import as_benchmark
+from core.symbol_index import SymbolIndex
+
+# Simulationen mit Endjahr ab hier werden nicht mehr ausgewertet (keine vollständigen Daten)
+END_YEAR_LIMIT = 2025
+# Risikokennzahlen der täglichen Simulation (core.nav), werden im Indexvergleich übernommen, falls vorhanden
+RISK_COLUMNS = ["Volatility (%)", "MaxDrawdown (%)", "Sharpe"]
+
+
+def result_row(start_year, end_year, holding_years, included_tickers, end_value, total_dividends):
+    """ Ergebniszeile eines gleich gewichteten Portfolios; end_value = Summe der Endwerte je investierter Einheit"""
+    n = len(included_tickers)
+    if n > 0:
+        start_value = n
+        total_return = ((end_value - start_value) / start_value) * 100
+        total_return = round(total_return, 2)
+        try:
+            cagr = ((1 + total_return / 100.0) ** (1 / holding_years) - 1) * 100
+            cagr = round(cagr, 2)
+        except:
+            cagr = None
+    else:
+        total_return = None
+        cagr = None
+
+    return {
+        "StartYear": start_year,
+        "EndYear": end_year,
+        "TotalReturn (%)": total_return,
+        "TotalCAGR (%)": cagr,
+        "TotalDividend": round(total_dividends, 2),
+        "IncludedTickersCount": n,
+        "IncludedTickers": included_tickers
+    }
+
+
+class SimulationEngine:
+    """
+    Simuliert die Portfolios je Startjahr für beliebig viele Haltedauern in einem Durchlauf:
+    Symbole werden einmal je Ticker über den SymbolIndex aufgelöst (auch mehrstufige Umbenennungen),
+    alle Kurse kommen aus der Jahresend-Matrix (store.yearly.year_end_close) für alle
+    Ticker x Haltedauern auf einmal. symbol_changes: Datensätze aus symbol_change.json oder ein SymbolIndex.
+    Mit drip = True werden die Dividenden zum Kurs am Zahltag wieder angelegt (store.reinvestment):
+    Rendite und CAGR sind dann Gesamtrenditen auf Basis von close, gültig ist ein Ticker dann mit
+    Start- und Endkurs in close.
+    """
+
+    def __init__(self, store, symbol_changes, drip=False):
+        self.store = store
+        self.drip = drip
+        self.symbol_index = symbol_changes if isinstance(symbol_changes, SymbolIndex) else SymbolIndex(symbol_changes)
+        self._start_year_rows = {}
+
+    def resolve_symbols(self, tickers):
+        """ Ticker-IDs je Stufe der Umbenennungskette (Ticker x Stufe, -1 = ohne Daten) und Jahre der Umbenennungen"""
+        hop_years, symbols = self.symbol_index.hops(tickers)
+        hop_ids = np.full((len(tickers), hop_years.shape[1] + 1), -1, dtype=np.int64)
+        for i, chain in enumerate(symbols):
+            hop_ids[i, :len(chain)] = self.store.ticker_ids(chain)
+        return hop_ids, hop_years
+
+    @staticmethod
+    def ids_in_years(hop_ids, hop_years, years):
+        """ Ticker-ID des im jeweiligen Jahr aktiven Symbols; years: Array (Ticker x Spalten)"""
+        stages = (hop_years[:, None, :] <= years[:, :, None]).sum(axis=2)
+        return np.take_along_axis(hop_ids, stages, axis=1)
+
+    def ticker_results(self, start_year, tickers, horizons):
+        """
+        Werte je Ticker x Haltedauer entlang der Portfolio-Reihenfolge: (Endjahre, gültig, Endwert je
+        investierter Einheit 1 + Rendite / 100, Dividenden). Gültig = Start- und Endkurs vorhanden, Startkurs > 0.
+        """
+        horizons = np.asarray(horizons, dtype=np.int64)
+        end_years = start_year + horizons
+        hop_ids, hop_years = self.resolve_symbols(tickers)
+
+        # Symbol beim Kauf bzw. Verkauf: alle Umbenennungen bis einschließlich Start- bzw. Endjahr sind erfolgt
+        start_ids = self.ids_in_years(hop_ids, hop_years, np.full((len(tickers), 1), start_year))
+        end_ids = self.ids_in_years(hop_ids, hop_years, np.broadcast_to(end_years, (len(tickers), len(end_years))))
+        yearly = self.store.yearly
+        if self.drip:
+            # close statt adjClose: die Dividenden kommen über die wieder angelegten Anteile hinzu
+            start_prices = self.store.reinvestment.closes(start_ids, start_year)
+            end_prices = self.store.reinvestment.closes(end_ids, end_years[None, :])
+        else:
+            start_prices = yearly.take("year_end_close", start_ids, start_year)
+            end_prices = yearly.take("year_end_close", end_ids, end_years[None, :])
+
+        valid = ~np.isnan(start_prices) & ~np.isnan(end_prices) & (start_prices > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = ((end_prices - start_prices) / start_prices) * 100.0
+
+        # Dividenden: jedes Symbol der Kette für die Jahre, in denen es aktiv war
+        bounds = np.concatenate([np.full((len(tickers), 1), -np.inf), hop_years,
+                                 np.full((len(tickers), 1), np.inf)], axis=1)
+        dividends = np.zeros(end_prices.shape)
+        growth = np.ones(end_prices.shape)
+        for stage in range(hop_ids.shape[1]):
+            first_years = np.minimum(np.maximum(start_year, bounds[:, stage, None]), end_years[None, :] + 1)
+            last_years = np.minimum(end_years[None, :], bounds[:, stage + 1, None] - 1)
+            dividends += yearly.dividend_total(hop_ids[:, stage, None], first_years.astype(np.int64),
+                                               last_years.astype(np.int64))
+            if self.drip:
+                # Wiederanlage nach dem Kauf: Dividenden ab dem Folgejahr des Startjahres
+                growth *= self.store.reinvestment.growth(hop_ids[:, stage, None],
+                                                         np.maximum(first_years, start_year + 1).astype(np.int64) - 1,
+                                                         last_years.astype(np.int64))
+        if self.drip:
+            return end_years, valid, (1 + (returns / 100.0)) * growth, dividends
+        return end_years, valid, 1 + (returns / 100.0), dividends
+
+    @staticmethod
+    def included(valid, max_tickers):
+        """ Wie bisher: die ersten max_tickers gültigen Ticker je Haltedauer (Ticker x Haltedauer)"""
+        return valid & (np.cumsum(valid, axis=0) <= max_tickers)
+
+    def simulate_start_year(self, start_year, tickers, horizons, max_tickers):
+        """ Zeilen (je Haltedauer) eines Startjahres; Ticker x Haltedauer werden gemeinsam ausgewertet"""
+        end_years, valid, values, dividends = self.ticker_results(start_year, tickers, horizons)
+        included = self.included(valid, max_tickers)
+        # cumsum addiert der Reihe nach -> gleiche Summe wie sum() über die Ticker
+        end_values = np.cumsum(np.where(included, values, 0.0), axis=0)
+        total_dividends = np.cumsum(np.where(included, dividends, 0.0), axis=0)
+
+        rows = []
+        for column, (holding_years, end_year) in enumerate(zip(list(horizons), end_years.tolist())):
+            selected = np.flatnonzero(included[:, column]).tolist()
+            n = len(selected)
+            rows.append(result_row(start_year, end_year, holding_years, [tickers[i] for i in selected],
+                                   float(end_values[-1, column]) if n else None,
+                                   float(total_dividends[-1, column]) if n else 0.0))
+        return rows
+
+    def simulate_sizes_start_year(self, start_year, tickers, horizons, max_size):
+        """
+        Zeilen eines Startjahres für alle Portfoliogrößen 1..max_size (je Haltedauer eine Liste): die
+        Renditen entlang der Reihenfolge werden einmal berechnet, jede Größe ist ein Präfix der
+        kumulierten Summen über die gültigen Ticker.
+        """
+        end_years, valid, values, dividends = self.ticker_results(start_year, tickers, horizons)
+        rows = []
+        for column, (holding_years, end_year) in enumerate(zip(list(horizons), end_years.tolist())):
+            selected = np.flatnonzero(valid[:, column])
+            end_values = np.cumsum(values[selected, column]).tolist()
+            total_dividends = np.cumsum(dividends[selected, column]).tolist()
+            size_rows = []
+            for size in range(1, max_size + 1):
+                n = min(size, len(selected))
+                size_rows.append(result_row(start_year, end_year, holding_years, [tickers[i] for i in selected[:n]],
+                                            end_values[n - 1] if n else None, total_dividends[n - 1] if n else 0.0))
+            rows.append(size_rows)
+        return rows
+
+    def simulate_rows(self, portfolios_by_start_year, horizons=range(1, 11), max_tickers=20):
+        """
+        Wie simulate, aber {Haltedauer: Liste der Zeilen}. Ergebnisse je Startjahr werden für gleiche
+        Portfolios wiederverwendet (z. B. bei vielen Parameterkombinationen mit denselben Tickern).
+        """
+        rows_by_horizon = {holding_years: [] for holding_years in horizons}
+        open_horizons = list(rows_by_horizon)
+        for start_year, tickers in portfolios_by_start_year.items():
+            if not open_horizons:
+                break
+            key = (start_year, tuple(tickers), tuple(open_horizons), max_tickers)
+            if key not in self._start_year_rows:
+                self._start_year_rows[key] = self.simulate_start_year(start_year, list(tickers), open_horizons, max_tickers)
+            for holding_years, row in zip(list(open_horizons), self._start_year_rows[key]):
+                if row["EndYear"] >= END_YEAR_LIMIT:
+                    open_horizons.remove(holding_years)
+                else:
+                    rows_by_horizon[holding_years].append(row)
+        return rows_by_horizon
+
+    def simulate_sizes(self, portfolios_by_start_year, max_size, horizons=range(1, 11)):
+        """
+        Simulation für alle Portfoliogrößen 1..max_size (max_tickers) in einem Durchlauf:
+        {Haltedauer: DataFrame} mit der Spalte PortfolioSize und sonst denselben Spalten wie simulate.
+        Jede Größe liefert dieselben Zeilen wie simulate mit max_tickers = Größe.
+        """
+        if max_size < 1:
+            raise ValueError("max_size muss mindestens 1 sein")
+        rows_by_horizon = {holding_years: [] for holding_years in horizons}
+        open_horizons = list(rows_by_horizon)
+        for start_year, tickers in portfolios_by_start_year.items():
+            if not open_horizons:
+                break
+            size_rows = self.simulate_sizes_start_year(start_year, list(tickers), open_horizons, max_size)
+            for holding_years, rows in zip(list(open_horizons), size_rows):
+                if rows[0]["EndYear"] >= END_YEAR_LIMIT:
+                    open_horizons.remove(holding_years)
+                    continue
+                for size, row in enumerate(rows, start=1):
+                    rows_by_horizon[holding_years].append({"PortfolioSize": size, **row})
+        return {holding_years: pd.DataFrame(sorted(rows, key=lambda row: row["PortfolioSize"]))
+                for holding_years, rows in rows_by_horizon.items()}
+
+    def simulate(self, portfolios_by_start_year, horizons=range(1, 11), max_tickers=20):
+        """
+        Simulationsergebnisse je Haltedauer: {Haltedauer: DataFrame} mit denselben Spalten wie
+        simulate_returns. Wie bisher endet die Auswertung einer Haltedauer beim ersten Startjahr,
+        dessen Endjahr END_YEAR_LIMIT erreicht.
+        """
+        rows_by_horizon = self.simulate_rows(portfolios_by_start_year, horizons, max_tickers)
+        return {holding_years: pd.DataFrame(rows) for holding_years, rows in rows_by_horizon.items()}
+
+
+def simulate_index_horizons(index_data, horizons=range(1, 11), total_return=False):
+    """
+    Index-Simulation (nur Startjahre ab INDEX_START_YEAR) für alle Haltedauern: {Haltedauer: DataFrame}.
+    index_data: IndexBenchmark oder Rohdaten aus sp500_index.json; total_return nur mit Dividendendaten sinnvoll.
+    """
+    return as_benchmark(index_data).simulate(horizons, total_return)
+
+def simulate_index_returns(index_data, holding_years=5, total_return=False):
+    return simulate_index_horizons(index_data, [holding_years], total_return)[holding_years]
+
+def compare_with_index(strategy_df, index_df):
+    """ Strategie- und Index-Simulation einer Haltedauer nach StartYear und EndYear zusammenführen"""
+    merged_df = pd.merge(strategy_df, index_df, on=["StartYear", "EndYear"], how="inner", suffixes=("_strategy", "_index"))
+    merged_df = merged_df.rename(columns={
+        "TotalReturn (%)": "Strategy_TotalReturn (%)",
+        "TotalCAGR (%)": "Strategy_TotalCAGR (%)",
+        "Return (%)": "Index_Return (%)",
+        "CAGR (%)": "Index_CAGR (%)"
+    })
+    merged_df["Strategy_Beats_Index"] = (
+        (merged_df["Strategy_TotalReturn (%)"] > merged_df["Index_Return (%)"]) &
+        (merged_df["Strategy_TotalCAGR (%)"] > merged_df["Index_CAGR (%)"])
+    )
+    risk_columns = []
+    for column in RISK_COLUMNS:
+        if column in strategy_df.columns and column in index_df.columns:
+            merged_df = merged_df.rename(columns={f"{column}_strategy": f"Strategy_{column}",
+                                                  f"{column}_index": f"Index_{column}"})
+            risk_columns += [f"Strategy_{column}", f"Index_{column}"]
+    final_df = merged_df[[
+        "StartYear",
+        "EndYear",
+        "Strategy_TotalReturn (%)",
+        "Strategy_TotalCAGR (%)",
+        "Index_Return (%)",
+        "Index_CAGR (%)",
+        "Strategy_Beats_Index"
+    ] + risk_columns]
+    return final_df
+
+def alpha_table(strategy_df, benchmark_results):
+    """
+    Strategie gegen mehrere Vergleichsmaßstäbe einer Haltedauer: benchmark_results {Name: {(StartYear, EndYear):
+    (Return (%), CAGR (%))}}. Alpha_<Name> (%) ist die Differenz der CAGR (Strategie - Vergleichsmaßstab).
+    """
+    rows = []
+    for row in strategy_df.to_dict(orient="records"):
+        key = (row["StartYear"], row["EndYear"])
+        result = {"StartYear": row["StartYear"], "EndYear": row["EndYear"],
+                  "Strategy_TotalReturn (%)": row["TotalReturn (%)"], "Strategy_TotalCAGR (%)": row["TotalCAGR (%)"]}
+        for name, results in benchmark_results.items():
+            benchmark_return, benchmark_cagr = results.get(key, (None, None))
+            result[f"{name}_Return (%)"] = benchmark_return
+            result[f"{name}_CAGR (%)"] = benchmark_cagr
+            result[f"Alpha_{name} (%)"] = (round(row["TotalCAGR (%)"] - benchmark_cagr, 2)
+                                           if pd.notna(row["TotalCAGR (%)"]) and pd.notna(benchmark_cagr) else None)
+        rows.append(result)
+    return pd.DataFrame(rows)
+
+def index_results_by_horizon(index_data, horizons=range(1, 11), total_return=False):
+    """ {Haltedauer: {(StartYear, EndYear): (Return (%), CAGR (%))}} der Index-Simulation"""
+    return as_benchmark(index_data).results_by_horizon(horizons, total_return)
+
+def summarize_rows(rows, index_results):
+    """
+    Kennzahlen der Simulationszeilen einer Haltedauer über alle Startjahre (für Parameter-Sweeps);
+    der Indexvergleich folgt compare_with_index (Rendite und CAGR müssen beide höher sein).
+    """
+    returns = [row["TotalReturn (%)"] for row in rows if row["TotalReturn (%)"] is not None]
+    cagrs = [row["TotalCAGR (%)"] for row in rows if row["TotalCAGR (%)"] is not None]
+    compared = [(row, index_results[(row["StartYear"], row["EndYear"])]) for row in rows
+                if (row["StartYear"], row["EndYear"]) in index_results]
+    beats = sum(1 for row, (index_return, index_cagr) in compared
+                if row["TotalReturn (%)"] is not None and row["TotalCAGR (%)"] is not None and index_cagr is not None
+                and row["TotalReturn (%)"] > index_return and row["TotalCAGR (%)"] > index_cagr)
+    return {
+        "StartYears": len(rows),
+        "MeanTickers": float(np.mean([row["IncludedTickersCount"] for row in rows])) if rows else np.nan,
+        "MeanReturn (%)": float(np.mean(returns)) if returns else np.nan,
+        "MeanCAGR (%)": float(np.mean(cagrs)) if cagrs else np.nan,
+        "MeanDividend": float(np.mean([row["TotalDividend"] for row in rows])) if rows else np.nan,
+        "ComparedYears": len(compared),
+        "BeatsIndex": beats,
+        "BeatsIndexShare": beats / len(compared) if compared else np.nan,
+    }
@@ -0,0 +1,76 @@
+#Copyright (C) 2025 Akram
+
+from bisect import bisect_right
+
+import numpy as np
+
+from core.data_store import NO_DAY, parse_day
+
+
+class SymbolIndex:
+    """
+    Umbenennungen aus symbol_change.json als Graph mit Gültigkeitszeiträumen. Ausgehend von einem
+    Ticker werden die Umbenennungen in zeitlicher Folge über beliebig viele Stufen verfolgt
+    (z. B. alt -> zwischen -> neu): jede Stufe ist die früheste Umbenennung des aktuellen Symbols
+    nach der vorherigen. Die Kette je Ticker wird einmal aufgebaut, Abfragen laufen per bisect in O(log n).
+    """
+
+    def __init__(self, symbol_changes):
+        # altes Symbol -> [(Tag, Jahr, neues Symbol)], nach Datum sortiert
+        self._changes = {}
+        for record in symbol_changes:
+            day = parse_day(record["date"])
+            if day == NO_DAY:
+                continue
+            old_symbol = record["oldSymbol"].strip()
+            self._changes.setdefault(old_symbol, []).append((day, int(record["date"][:4]), record["newSymbol"].strip()))
+        for changes in self._changes.values():
+            changes.sort(key=lambda change: change[0])
+        self._change_days = {symbol: [change[0] for change in changes] for symbol, changes in self._changes.items()}
+        # Kette je Ticker sowie Tage und Jahre ihrer Stufen (Schlüssel für bisect), beim ersten Zugriff aufgebaut
+        self._chains = {}
+        self._chain_days = {}
+        self._chain_years = {}
+
+    def chain(self, ticker):
+        """ Umbenennungen ab ticker als Liste (Tag, Jahr, neues Symbol) in zeitlicher Reihenfolge"""
+        if ticker not in self._chains:
+            hops = []
+            symbol, last_day = ticker, None
+            while symbol in self._changes:
+                # nur Umbenennungen nach der vorherigen Stufe (verhindert Zyklen bei Rücktausch)
+                i = 0 if last_day is None else bisect_right(self._change_days[symbol], last_day)
+                if i == len(self._changes[symbol]):
+                    break
+                last_day, year, symbol = self._changes[symbol][i]
+                hops.append((last_day, year, symbol))
+            self._chains[ticker] = hops
+            self._chain_days[ticker] = [hop[0] for hop in hops]
+            self._chain_years[ticker] = [hop[1] for hop in hops]
+        return self._chains[ticker]
+
+    def symbol_at(self, ticker, date):
+        """ Aktives Symbol von ticker am Datum date ('YYYY-MM-DD' oder Tage seit 1970-01-01)"""
+        day = parse_day(date) if isinstance(date, str) else date
+        hops = self.chain(ticker)
+        i = bisect_right(self._chain_days[ticker], day)
+        return hops[i - 1][2] if i else ticker
+
+    def symbol_in_year(self, ticker, year):
+        """ Symbol von ticker für das Jahr year: alle Umbenennungen bis einschließlich year sind erfolgt"""
+        hops = self.chain(ticker)
+        i = bisect_right(self._chain_years[ticker], year)
+        return hops[i - 1][2] if i else ticker
+
+    def hops(self, tickers):
+        """
+        Ketten mehrerer Ticker als Arrays für die Simulation: Jahre der Umbenennungen (Ticker x Stufe,
+        inf = keine weitere) und je Ticker die Symbole [ticker, nach Stufe 1, nach Stufe 2, ...].
+        """
+        chains = [self.chain(ticker) for ticker in tickers]
+        hop_years = np.full((len(tickers), max((len(hops) for hops in chains), default=0)), np.inf)
+        symbols = []
+        for i, (ticker, hops) in enumerate(zip(tickers, chains)):
+            hop_years[i, :len(hops)] = [hop[1] for hop in hops]
+            symbols.append([ticker] + [hop[2] for hop in hops])
+        return hop_years, symbols
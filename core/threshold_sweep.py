@@ -0,0 +1,100 @@
+#Copyright (C) 2025 Akram
+
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import METRICS_YEARS, eps_history, eps_progression, year_metrics
+from core.simulation import index_results_by_horizon, summarize_rows
+
+# Schwellenwerte der Filter-Strategie (wie in filtering_analysis)
+FILTER_DEFAULTS = {
+    "dividend_yield_min": 0.5,
+    "dividend_yield_max": 6.0,
+    "dividend_cagr_min": 5.0,
+    "revenue_cagr_min": 5.0,
+    "revenue_cagr_max": 25.0,
+    "eps_threshold": 1.0,
+    "progression_years": 5,
+}
+
+
+class FilterMasks:
+    """
+    Kennzahlen aller Zieljahre einmal geladen (Zeilen = Ticker x Zieljahr in CSV-Reihenfolge);
+    jedes Kriterium wird je Schwellenwert einmal als boolesche Maske berechnet und wiederverwendet.
+    """
+
+    def __init__(self, store, years=METRICS_YEARS, point_in_time=False):
+        self.store = store
+        self.years = list(years)
+        self.point_in_time = point_in_time
+        self.metrics = pd.concat([year_metrics(year, point_in_time=point_in_time) for year in self.years], ignore_index=True)
+        self.tickers = self.metrics["Ticker"].to_numpy()
+        self.row_years = self.metrics["Year"].to_numpy()
+        self._masks = {}
+
+    def _mask(self, key, compute):
+        if key not in self._masks:
+            self._masks[key] = compute()
+        return self._masks[key]
+
+    def dividend_yield(self, low, high):
+        values = self.metrics["DividendYield"]
+        return self._mask(("dividend_yield", low, high), lambda: (values.notna() & values.between(low, high)).to_numpy())
+
+    def dividend_cagr(self, low):
+        values = self.metrics["DividendCAGR"]
+        return self._mask(("dividend_cagr", low), lambda: (values.notna() & (values >= low)).to_numpy())
+
+    def revenue_cagr(self, low, high):
+        values = self.metrics["RevenueCAGR"]
+        return self._mask(("revenue_cagr", low, high), lambda: (values.notna() & values.between(low, high)).to_numpy())
+
+    def eps_growth(self, threshold, progression_years):
+        def compute():
+            eps, _ = eps_history(self.store, self.metrics["TickerId"].to_numpy(), self.row_years, progression_years,
+                                 self.point_in_time)
+            complete = self.metrics["HasIncomeData"].to_numpy() & ~np.isnan(eps).any(axis=1)
+            mask = np.zeros(len(self.metrics), dtype=bool)
+            mask[complete] = eps_progression(eps[complete], threshold)[0]
+            return mask
+        return self._mask(("eps_growth", threshold, progression_years), compute)
+
+    def combined(self, params):
+        return (self.revenue_cagr(params["revenue_cagr_min"], params["revenue_cagr_max"]) &
+                self.eps_growth(params["eps_threshold"], params["progression_years"]) &
+                self.dividend_yield(params["dividend_yield_min"], params["dividend_yield_max"]) &
+                self.dividend_cagr(params["dividend_cagr_min"]))
+
+    def portfolios(self, params):
+        """ Zieljahr -> Ticker, die alle Filter erfüllen (CSV-Reihenfolge), wie collect_top_tickers_per_year"""
+        mask = self.combined(params)
+        return {year: self.tickers[mask & (self.row_years == year)].tolist() for year in self.years}
+
+
+def parameter_grid(grid):
+    """ Alle Kombinationen aus grid (Parameter -> Werte); fehlende Parameter aus FILTER_DEFAULTS"""
+    unknown = set(grid) - set(FILTER_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unbekannte Parameter: {sorted(unknown)}")
+    names = list(FILTER_DEFAULTS)
+    values = [list(grid.get(name, [FILTER_DEFAULTS[name]])) for name in names]
+    return [dict(zip(names, combination)) for combination in product(*values)]
+
+def sweep_filter_thresholds(masks, engine, sp500_index, grid, horizons=range(1, 11), max_tickers=20):
+    """
+    Wertet alle Schwellenwert-Kombinationen aus grid aus: Kennzahlen und Masken werden nur einmal
+    berechnet (FilterMasks), je Kombination werden die Portfolios per Maske gebildet und mit der
+    SimulationEngine über alle Haltedauern simuliert. Ergebnis: eine Zeile je (Kombination, Haltedauer).
+    """
+    horizons = list(horizons)
+    index_results = index_results_by_horizon(sp500_index, horizons)
+    results = []
+    for params in parameter_grid(grid):
+        simulations = engine.simulate_rows(masks.portfolios(params), horizons, max_tickers)
+        for holding_years in horizons:
+            results.append({**params, "HoldingYears": holding_years,
+                            **summarize_rows(simulations[holding_years], index_results[holding_years])})
+    return pd.DataFrame(results)
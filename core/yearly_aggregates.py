@@ -0,0 +1,120 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+
+from core.data_store import NO_DAY
+
+
+class YearlyAggregates:
+    """
+    Jahreswerte je (Ticker, Jahr) als Matrizen Ticker x Jahr, einmal je Datensatz berechnet:
+    - year_end_close / year_end_day: letzter adjClose des Jahres (NaN = kein Kurs im Jahr)
+    - dividend_sum: Summe der adjDividend mit Zahltag im Jahr (0.0 = keine Zahlung),
+      dividend_first_day / dividend_last_day: erster bzw. letzter Zahltag (NO_DAY = keiner),
+      dividend_cumsum: kumulierte Jahressummen für Zeiträume (siehe dividend_total)
+    - revenue / revenue_day: Umsatz des Berichts mit Periodenende im Jahr
+    - eps: EPS des Berichts mit calendarYear im Jahr
+    Gibt es je Jahr mehrere gültige Berichte, gilt wie in den Rohdaten der letzte.
+    """
+
+    def __init__(self, store):
+        tables = (store.dividends, store.income)
+        years = np.concatenate([table["year"] for table in tables] + [store.income["calendar_year"],
+                                                                        store.price_matrix.years])
+        years = years[years > 0]
+        self.first_year = int(years.min()) if len(years) else 0
+        self.last_year = int(years.max()) if len(years) else -1
+        self.shape = (len(store.tickers), self.last_year - self.first_year + 1)
+
+        self.year_end_close = np.full(self.shape, np.nan)
+        self.year_end_day = np.full(self.shape, NO_DAY, dtype=np.int64)
+        all_ids = np.arange(len(store.tickers))
+        for year in store.price_matrix.years.tolist():
+            closes, days = store.price_matrix.last_close_of_year(all_ids, year)
+            self.year_end_close[:, year - self.first_year] = closes
+            self.year_end_day[:, year - self.first_year] = days
+
+        dividends = store.dividends
+        valid = self._in_range(dividends["year"]) & ~np.isnan(dividends["adj_dividend"])
+        keys = self._keys(dividends["ticker_id"][valid], dividends["year"][valid])
+        # bincount addiert in Originalreihenfolge -> gleiche Summen wie die bisherigen Schleifen
+        self.dividend_sum = np.bincount(keys, weights=dividends["adj_dividend"][valid],
+                                        minlength=self.size).reshape(self.shape)
+        self.dividend_first_day = np.full(self.size, np.iinfo(np.int64).max)
+        np.minimum.at(self.dividend_first_day, keys, dividends["day"][valid])
+        self.dividend_first_day[self.dividend_first_day == np.iinfo(np.int64).max] = NO_DAY
+        self.dividend_first_day = self.dividend_first_day.reshape(self.shape)
+        self.dividend_last_day = np.full(self.size, NO_DAY, dtype=np.int64)
+        np.maximum.at(self.dividend_last_day, keys, dividends["day"][valid])
+        self.dividend_last_day = self.dividend_last_day.reshape(self.shape)
+        # Spalte j = Summe der Jahre vor first_year + j -> Zeitraum = Differenz zweier Spalten
+        self.dividend_cumsum = np.zeros((self.shape[0], self.shape[1] + 1))
+        np.cumsum(self.dividend_sum, axis=1, out=self.dividend_cumsum[:, 1:])
+
+        income = store.income
+        self.revenue, self.revenue_day = self._last_per_year(
+            income["ticker_id"], income["year"], income["revenue"], income["day"])
+        self.eps, _ = self._last_per_year(
+            income["ticker_id"], income["calendar_year"], income["eps"], income["day"])
+
+    @property
+    def size(self):
+        return self.shape[0] * self.shape[1]
+
+    def _in_range(self, years):
+        return (years >= self.first_year) & (years <= self.last_year)
+
+    def _keys(self, ticker_ids, years):
+        return ticker_ids.astype(np.int64) * self.shape[1] + (years - self.first_year)
+
+    def _last_per_year(self, ticker_ids, years, values, days):
+        valid = np.flatnonzero(self._in_range(years) & ~np.isnan(values))
+        keys = self._keys(ticker_ids[valid], years[valid])
+        # letztes Vorkommen je Schlüssel: erstes Vorkommen in umgekehrter Reihenfolge
+        _, first_reversed = np.unique(keys[::-1], return_index=True)
+        last = valid[len(valid) - 1 - first_reversed]
+        last_keys = keys[len(valid) - 1 - first_reversed]
+        result = np.full(self.size, np.nan)
+        result[last_keys] = values[last]
+        result_days = np.full(self.size, NO_DAY, dtype=np.int64)
+        result_days[last_keys] = days[last]
+        return result.reshape(self.shape), result_days.reshape(self.shape)
+
+    def take(self, field, ticker_ids, years):
+        """
+        Werte eines Feldes für Paare (Ticker-ID, Jahr); ticker_ids und years werden gegeneinander
+        gebroadcastet. Unbekannte Ticker (None/-1) oder Jahre -> 0.0 (Summen), NO_DAY (Tage) bzw. NaN.
+        """
+        values = getattr(self, field)
+        ticker_ids = np.asarray(-1 if ticker_ids is None else ticker_ids, dtype=np.int64)
+        ticker_ids, columns = np.broadcast_arrays(ticker_ids, np.asarray(years, dtype=np.int64) - self.first_year)
+        fill = 0.0 if field == "dividend_sum" else (NO_DAY if values.dtype == np.int64 else np.nan)
+        result = np.full(ticker_ids.shape, fill, dtype=values.dtype)
+        valid = (ticker_ids >= 0) & (columns >= 0) & (columns < self.shape[1])
+        result[valid] = values[ticker_ids[valid], columns[valid]]
+        return result
+
+    def get(self, field, ticker_ids, year):
+        """ Werte eines Feldes für Ticker-ID(s) in einem Jahr, Füllwerte wie bei take"""
+        return self.take(field, ticker_ids, year)
+
+    def get_range(self, field, ticker_ids, year_start, year_end):
+        """ Werte für die Jahre year_start..year_end als Array (Ticker x Jahr), Füllwerte wie bei take"""
+        years = np.arange(year_start, year_end + 1)
+        return self.take(field, np.expand_dims(np.asarray(-1 if ticker_ids is None else ticker_ids), -1), years)
+
+    def dividend_total(self, ticker_ids, year_start, year_end):
+        """
+        Dividendensumme für die Jahre year_start..year_end (inklusive) je Ticker, als Differenz
+        zweier kumulierter Summen. Eingaben werden gebroadcastet; unbekannte Ticker und leere Zeiträume -> 0.0.
+        """
+        ticker_ids, year_start, year_end = np.broadcast_arrays(
+            np.asarray(-1 if ticker_ids is None else ticker_ids, dtype=np.int64),
+            np.asarray(year_start, dtype=np.int64), np.asarray(year_end, dtype=np.int64))
+        start_columns = np.clip(year_start - self.first_year, 0, self.shape[1])
+        end_columns = np.clip(year_end - self.first_year + 1, 0, self.shape[1])
+        result = np.zeros(ticker_ids.shape)
+        valid = (ticker_ids >= 0) & (end_columns > start_columns)
+        rows = ticker_ids[valid]
+        result[valid] = self.dividend_cumsum[rows, end_columns[valid]] - self.dividend_cumsum[rows, start_columns[valid]]
+        return result
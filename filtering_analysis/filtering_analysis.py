@@ -1,118 +1,79 @@
 #Copyright (C) 2025 Akram
 
+import argparse
 import json
+import os
+import sys
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from functools import cache, partial
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.benchmark import EqualWeightBenchmark, get_benchmark
+from core.data_store import get_store, day_to_str, str_to_day
+from core.metric_cache import memoize_metric
+from core.metrics import days_to_str, eps_history, eps_progression, quarter_metrics, ttm_eps_history, year_metrics
+from core.nav import NavEngine, add_index_risk
+from core.parallel import run_parallel
+from core.quarterly_aggregates import quarter_end_calendar
+from core.rolling import RollingSimulation, index_rolling_returns, summarize_rolling
+from core.significance import SignificanceTest
+from core.simulation import SimulationEngine, alpha_table, compare_with_index, index_results_by_horizon, simulate_index_horizons, simulate_index_returns
+from core.symbol_index import SymbolIndex
 
 
 def load_json_file(filepath):
     with open(filepath, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def load_sp500_data(target_year):
-    sp500_csv_path = f"data/s&p500/sp500_{target_year}.csv"
-    return pd.read_csv(sp500_csv_path)
+# Daten werden erst beim ersten Zugriff geladen und danach wiederverwendet
+@cache
+def get_symbol_change():
+    return load_json_file("data/symbol_change.json")
 
-def extract_year(date_str):
-    try:
-        return int(date_str.split("-")[0])
-    except Exception:
-        return None
-
-def parse_date(date_str):
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d")
-    except Exception:
-        return None
+@cache
+def get_symbol_index():
+    return SymbolIndex(get_symbol_change())
 
-dividend_data = load_json_file("data/stock_dividend.json")
-price_data    = load_json_file("data/historical_price_full.json")
-income_data   = load_json_file("data/income_statement_annual.json")
-symbol_change = load_json_file("data/symbol_change.json")
-sp500_index   = load_json_file("data/sp500_index.json")
+def get_sp500_index():
+    # IndexBenchmark (Kurs- und Gesamtrendite-Index), einmal je Prozess geladen und von beiden Strategien geteilt
+    return get_benchmark()
 
-holding_years = 5
 
+def dividend_dates_in_year(ticker_id, year):
+    dividends = get_store().dividends.rows(ticker_id)
+    in_year = (dividends["year"] == year) & ~np.isnan(dividends["adj_dividend"])
+    return [day_to_str(day) for day in dividends["day"][in_year]]
 
+@memoize_metric("filtering.dividend_yield")
 def analyze_dividend_yield(target_year, dividend_yield_min=0.5, dividend_yield_max=6):
-    companies_df = load_sp500_data(target_year)
+    companies_df = year_metrics(target_year)
     total_companies = len(companies_df)
 
-    count_dividend_not_found = 0
-    count_no_dividend_payment = 0
-    count_price_not_found = 0
-    count_price_missing_target_year = 0
-    count_successful_computation = 0
-    count_yield_criteria = 0
-    count_successful_non_filtered = 0
-
-    filtered_companies = []
-    successful_companies = []
-
-    for idx, row in companies_df.iterrows():
-        ticker = row["Ticker"]
-        if ticker not in dividend_data or "historical" not in dividend_data[ticker]:
-            count_dividend_not_found += 1
-            continue
-
-        total_dividends = 0.0
-        dividends_list = []
-        dividend_dates = []
-        for record in dividend_data[ticker]["historical"]:
-            try:
-                rec_year = extract_year(record["date"])
-            except Exception:
-                continue
-            if rec_year == target_year:
-                try:
-                    d = float(record["adjDividend"])
-                except Exception:
-                    continue
-                total_dividends += d
-                dividends_list.append(d)
-                dividend_dates.append(record["date"])
-        if total_dividends == 0:
-            count_no_dividend_payment += 1
-            continue
-
-        if ticker not in price_data or "historical" not in price_data[ticker]:
-            count_price_not_found += 1
-            continue
-
-        target_records = [record for record in price_data[ticker]["historical"]
-                          if record["date"].startswith(str(target_year))]
-        if not target_records:
-            count_price_missing_target_year += 1
-            continue
-
-        last_record_target = max(target_records,
-                                 key=lambda r: parse_date(r["date"]))
-        try:
-            target_date_price = float(last_record_target["adjClose"])
-        except Exception:
-            count_price_missing_target_year += 1
-            continue
-        price_date = last_record_target["date"]
-        trailing_yield = (total_dividends / target_date_price) * 100
-        count_successful_computation += 1
-
-        company_data = {
-            "Ticker": ticker,
-            "Total Dividends": f"{total_dividends:.3f}",
-        #    "Dividends List": dividends_list,
-            "Dividend Dates": dividend_dates,
-        #    "Target Date Price": target_date_price,
-            "Price Date": price_date,
-            "Trailing Yield": trailing_yield
-        }
-        successful_companies.append(company_data)
-
-        if dividend_yield_min <= trailing_yield <= dividend_yield_max:
-            count_yield_criteria += 1
-            company_data["Trailing Yield"] = float(f"{trailing_yield:.3f}")
-            filtered_companies.append(company_data)
-        else:
-            count_successful_non_filtered += 1
+    dividend_not_found = ~companies_df["HasDividendData"]
+    no_dividend_payment = ~dividend_not_found & (companies_df["DividendSum"] == 0)
+    price_not_found = ~dividend_not_found & ~no_dividend_payment & ~companies_df["HasPriceData"]
+    successful = companies_df["DividendYield"].notna()
+    price_missing_target_year = ~dividend_not_found & ~no_dividend_payment & ~price_not_found & ~successful
+    yield_criteria = successful & companies_df["DividendYield"].between(dividend_yield_min, dividend_yield_max)
+
+    count_dividend_not_found = int(dividend_not_found.sum())
+    count_no_dividend_payment = int(no_dividend_payment.sum())
+    count_price_not_found = int(price_not_found.sum())
+    count_price_missing_target_year = int(price_missing_target_year.sum())
+    count_successful_computation = int(successful.sum())
+    count_yield_criteria = int(yield_criteria.sum())
+    count_successful_non_filtered = count_successful_computation - count_yield_criteria
+
+    filtered_companies = [{
+        "Ticker": row.Ticker,
+        "Total Dividends": f"{row.DividendSum:.3f}",
+        "Dividend Dates": dividend_dates_in_year(row.TickerId, target_year),
+    #    "Target Date Price": row.YearEndClose,
+        "Price Date": day_to_str(row.YearEndDay),
+        "Trailing Yield": float(f"{row.DividendYield:.3f}")
+    } for row in companies_df[yield_criteria].itertuples()]
 
     sum_categories = (count_dividend_not_found + count_no_dividend_payment +
                       count_price_not_found + count_price_missing_target_year +
@@ -133,139 +94,57 @@ def analyze_dividend_yield(target_year, dividend_yield_min=0.5, dividend_yield_m
     df_dividend = pd.DataFrame(filtered_companies)
     return df_dividend
 
+@memoize_metric("filtering.dividend_cagr")
 def analyze_dividend_cagr(target_year):
     start_year = target_year - 10
-    companies_df = load_sp500_data(target_year)
-    successful_count = 0
-    filtered_companies = []
-
-    for idx, row in companies_df.iterrows():
-        ticker = row["Ticker"]
-        if ticker not in dividend_data or "historical" not in dividend_data[ticker]:
-            continue
-
-        dividends_target = 0.0
-        dividends_start = 0.0
-        target_dates = []
-        start_dates = []
-        dividends_target_values = []
-        dividends_start_values = []
-
-        for record in dividend_data[ticker]["historical"]:
-            try:
-                rec_date = datetime.strptime(record["date"], "%Y-%m-%d")
-            except Exception:
-                continue
-            rec_year = rec_date.year
-            try:
-                computed_adj_dividend = float(record["adjDividend"])
-            except Exception:
-                continue
-
-            if rec_year == target_year:
-                dividends_target += computed_adj_dividend
-                dividends_target_values.append(computed_adj_dividend)
-                target_dates.append(record["date"])
-            elif rec_year == start_year:
-                dividends_start += computed_adj_dividend
-                dividends_start_values.append(computed_adj_dividend)
-                start_dates.append(record["date"])
-
-        if dividends_target == 0 or dividends_start == 0:
-            continue
-
-        successful_count += 1
-        cagr = (dividends_target / dividends_start) ** (1 / 10) - 1
-        cagr_percentage = cagr * 100
-
-        if cagr_percentage >= 5:  # mindestens 5%
-            filtered_companies.append({
-                "Ticker": ticker,
-                f"Gesamte Dividenden im Startjahr ({start_year})": f"{dividends_start:.3f}",
-            #    f"Einzelne Dividenden im Startjahr ({start_year})": ", ".join(f"{x:.3f}" for x in dividends_start_values),
-                f"Gesamte Dividenden im Zieljahr ({target_year})": f"{dividends_target:.3f}",
-            #    f"Einzelne Dividenden im Zieljahr ({target_year})": ", ".join(f"{x:.3f}" for x in dividends_target_values),
-                "Dividend CAGR (%)": f"{cagr_percentage:.3f}",
-                "Start Datum": min(start_dates) if start_dates else None,
-                "End Datum": max(target_dates) if target_dates else None
-            })
+    companies_df = year_metrics(target_year)
+    successful = companies_df["DividendCAGR"].notna()
+    criteria = successful & (companies_df["DividendCAGR"] >= 5)  # mindestens 5%
+
+    filtered_companies = [{
+        "Ticker": row.Ticker,
+        f"Gesamte Dividenden im Startjahr ({start_year})": f"{row.DividendSumStart:.3f}",
+        f"Gesamte Dividenden im Zieljahr ({target_year})": f"{row.DividendSum:.3f}",
+        "Dividend CAGR (%)": f"{row.DividendCAGR:.3f}",
+        "Start Datum": day_to_str(row.DividendFirstDayStart),
+        "End Datum": day_to_str(row.DividendLastDay)
+    } for row in companies_df[criteria].itertuples()]
 
     df_cagr = pd.DataFrame(filtered_companies)
     print(f"\n--- Dividend CAGR Analyse (Zieljahr {target_year}) ---")
-    print(f"Erfolgreich berechnete Unternehmen: {successful_count}")
+    print(f"Erfolgreich berechnete Unternehmen: {int(successful.sum())}")
     print(f"Erfüllen das Kriterium (CAGR >= 5%): {len(filtered_companies)}")
     return df_cagr
 
-def analyze_eps_growth(target_year, progression_years=5):
-    start_year = target_year - progression_years + 1
-    companies_df = load_sp500_data(target_year)
-
-    def valid_growth(eps_list, threshold=25.0):
-        allowed_down = False
-        growth_rates = []
-        max_eps = eps_list[0]
-        i = 0
-        while i < len(eps_list) - 1:
-            prev = eps_list[i]
-            curr = eps_list[i+1]
-            if prev <= 0:
-                return False, []
-            growth = ((curr - prev) / prev) * 100
-            if growth >= threshold:
-                growth_rates.append(round(growth, 2))
-                max_eps = max(max_eps, curr)
-                i += 1
-            elif growth < 0 and not allowed_down and (i+2 < len(eps_list)):
-                next_val = eps_list[i+2]
-                if next_val > max_eps:
-                    growth_rates.append(round(growth, 2))
-                    recovery_growth = ((next_val - curr) / curr) * 100
-                    growth_rates.append(round(recovery_growth, 2))
-                    max_eps = next_val
-                    allowed_down = True
-                    i += 2
-                else:
-                    return False, []
-            else:
-                return False, []
-        if len(growth_rates) < (len(eps_list) - 1):
-            return False, []
-        return True, growth_rates
-
-    filtered_companies = []
+@memoize_metric("filtering.eps_growth")
+def analyze_eps_growth(target_year, progression_years=5, point_in_time=False):
+    companies_df = year_metrics(target_year, progression_years, point_in_time)
+
     missing_tickers = []
     insufficient_data = []
 
-    for idx, row in companies_df.iterrows():
-        ticker = row["Ticker"]
-        if ticker not in income_data:
+    # Endjahr je Ticker: das Zieljahr, mit --point-in-time das neueste am 31.12. bekannte Jahr
+    eps_matrix, end_years = eps_history(get_store(), companies_df["TickerId"].to_numpy(), target_year, progression_years,
+                                          point_in_time)
+    year_matrix = end_years[:, None] + np.arange(1 - progression_years, 1)[None, :]
+    has_income = companies_df["HasIncomeData"].to_numpy()
+    complete = has_income & ~np.isnan(eps_matrix).any(axis=1)
+
+    for ticker, income, eps_by_year, row_years in zip(companies_df["Ticker"][~complete], has_income[~complete],
+                                                      eps_matrix[~complete].tolist(), year_matrix[~complete].tolist()):
+        if not income:
             missing_tickers.append(ticker)
-            continue
-
-        eps_dict = {}
-        for record in income_data[ticker]:
-            try:
-                year = int(record.get("calendarYear", 0))
-            except Exception:
-                continue
-            if start_year <= year <= target_year and record.get("eps") is not None:
-                eps_dict[year] = record["eps"]
-        if len(eps_dict) < progression_years:
-            insufficient_data.append((ticker, list(eps_dict.keys())))
-            continue
-
-        sorted_years = sorted(eps_dict.keys())
-        if len(sorted_years) > progression_years:
-            sorted_years = sorted_years[-progression_years:]
-        eps_values = [eps_dict[yr] for yr in sorted_years]
-        valid, rates = valid_growth(eps_values, threshold=01.0)##5
-        if valid:
-            filtered_companies.append({
-                "Ticker": ticker,
-                "Jahre": sorted_years,
-            #    "Alle EPS": [round(e, 2) for e in eps_values],
-                "Wachstumsraten (%)": rates
-            })
+        else:
+            insufficient_data.append((ticker, [year for year, eps in zip(row_years, eps_by_year) if not np.isnan(eps)]))
+
+    valid, rates = eps_progression(eps_matrix[complete], threshold=01.0)##5
+    filtered_companies = [{
+        "Ticker": ticker,
+        "Jahre": row_years,
+    #    "Alle EPS": [round(e, 2) for e in eps_values],
+        "Wachstumsraten (%)": ticker_rates
+    } for ticker, ticker_rates, row_years in zip(companies_df["Ticker"].to_numpy()[complete][valid], rates[valid].tolist(),
+                                                 year_matrix[complete][valid].tolist())]
     df_eps = pd.DataFrame(filtered_companies)
     print(f"\n--- EPS-Wachstumsanalyse (Zieljahr {target_year}) ---")
     print(f"Gesamtzahl der Unternehmen in der CSV: {len(companies_df)}")
@@ -282,68 +161,31 @@ def analyze_eps_growth(target_year, progression_years=5):
     return df_eps
 
 
-def analyze_revenue_cagr(target_year):
-    start_year = target_year - 10
-    companies_df = load_sp500_data(target_year)
-    total_companies = len(companies_df)
+@memoize_metric("filtering.revenue_cagr")
+def analyze_revenue_cagr(target_year, point_in_time=False):
+    companies_df = year_metrics(target_year, point_in_time=point_in_time)
+    successful = companies_df["RevenueCAGR"].notna()
+    criteria = successful & companies_df["RevenueCAGR"].between(5, 25)
 
-    successful_count = 0
-    filtered_companies = []
-
-    for idx, row in companies_df.iterrows():
-        ticker = row["Ticker"]
-        if ticker not in income_data:
-            continue
-
-        revenue_target = None
-        revenue_start = None
-        date_target = None
-        date_start = None
-
-        for record in income_data[ticker]:
-            try:
-                rec_date = datetime.strptime(record["date"], "%Y-%m-%d")
-            except Exception:
-                continue
-            rec_year = rec_date.year
-            try:
-                revenue_val = float(record["revenue"])
-            except Exception:
-                continue
-
-            if rec_year == target_year:
-                revenue_target = revenue_val
-                date_target = record["date"]
-            elif rec_year == start_year:
-                revenue_start = revenue_val
-                date_start = record["date"]
-
-        if revenue_target is None or revenue_start is None or revenue_target <= 0 or revenue_start <= 0:
-            continue
-
-        successful_count += 1
-        cagr = (revenue_target / revenue_start) ** (1/10) - 1
-        cagr_percentage = cagr * 100
-
-        if 5 <= cagr_percentage <= 25:
-            filtered_companies.append({
-                "Ticker": ticker,
-                "Revenue CAGR (%)": f"{cagr_percentage:.3f}",
-                "Start Datum": date_start,
-                "End Datum": date_target
-            })
+    filtered_companies = [{
+        "Ticker": row.Ticker,
+        "Revenue CAGR (%)": f"{row.RevenueCAGR:.3f}",
+        "Start Datum": day_to_str(row.RevenueStartDay),
+        "End Datum": day_to_str(row.RevenueEndDay)
+    } for row in companies_df[criteria].itertuples()]
 
     df_cagr = pd.DataFrame(filtered_companies)
     print(f"\n--- Revenue CAGR Analyse (Zieljahr {target_year}) ---")
-    print(f"Erfolgreich berechnete Unternehmen: {successful_count}")
+    print(f"Erfolgreich berechnete Unternehmen: {int(successful.sum())}")
     print(f"Erfüllen das Kriterium (CAGR zwischen 5% und 25%): {len(filtered_companies)}")
     return df_cagr
 
-def merge_results(target):
+@memoize_metric("filtering.merged")
+def merge_results(target, point_in_time=False):
     dividend_df = analyze_dividend_yield(target)
     dividend_cagr_df = analyze_dividend_cagr(target)
-    eps_growth_df = analyze_eps_growth(target)
-    revenue_growth_df = analyze_revenue_cagr(target)
+    eps_growth_df = analyze_eps_growth(target, point_in_time=point_in_time)
+    revenue_growth_df = analyze_revenue_cagr(target, point_in_time)
 
     try:
         merged_df = (
@@ -357,254 +199,158 @@ def merge_results(target):
         return pd.DataFrame()
     return merged_df
 
-def collect_top_tickers_per_year(start_year=2011, end_year=2024):
+def filter_quarter(as_of, point_in_time=False):
+    """
+    Ticker, die an einem Quartalsende as_of ('YYYY-MM-DD') alle vier Filter erfüllen (Schwellenwerte wie
+    in den Jahresanalysen), mit TTM-Kennzahlen (quarter_metrics) und TTM-EPS-Progression; CSV-Reihenfolge.
+    """
+    metrics = quarter_metrics(as_of, point_in_time=point_in_time)
+    eps = ttm_eps_history(get_store(), metrics["TickerId"].to_numpy(), str_to_day(as_of), point_in_time=point_in_time)
+    complete = metrics["HasQuarterlyData"].to_numpy() & ~np.isnan(eps).any(axis=1)
+    eps_criteria = np.zeros(len(metrics), dtype=bool)
+    eps_criteria[complete] = eps_progression(eps[complete], threshold=1.0)[0]
+    criteria = (eps_criteria &
+                metrics["RevenueCAGR"].between(5, 25).to_numpy() &
+                metrics["DividendYield"].between(0.5, 6).to_numpy() &
+                (metrics["DividendCAGR"] >= 5).to_numpy())
+    return metrics["Ticker"][criteria].tolist()
+
+def collect_top_tickers_per_year(start_year=2011, end_year=2024, merged_tickers=None, point_in_time=False):
+    # merged_tickers: bereits ermittelte Ticker je Jahr (z. B. aus den Workern), sonst merge_results
     results_top_filtering = {}
     for target_year in range(start_year, end_year + 1):
         print(f"\n********** Analyse für das Jahr {target_year} **********")
-        merged_df = merge_results(target_year)
-        if not merged_df.empty:
-            tickers_ = merged_df["Ticker"].tolist()
-            results_top_filtering[target_year] = tickers_
-            print(f"Top Ticker ({target_year}): {tickers_}")
-            print(f"Anzahl der Unternehmen: {len(tickers_)}")
+        if merged_tickers is not None:
+            tickers_ = merged_tickers[target_year]
         else:
-            results_top_filtering[target_year] = []
-            print(f"Top Ticker ({target_year}): []")
-            print("Anzahl der Unternehmen: 0")
+            merged_df = merge_results(target_year, point_in_time)
+            tickers_ = [] if merged_df.empty else merged_df["Ticker"].tolist()
+        results_top_filtering[target_year] = tickers_
+        print(f"Top Ticker ({target_year}): {tickers_}")
+        print(f"Anzahl der Unternehmen: {len(tickers_)}")
     return results_top_filtering
 
-results_top_filtering = collect_top_tickers_per_year()
-
-
-def simulate_returns(price_data, dividend_data, portfolios_by_start_year, symbol_changes, max_tickers=20, holding_years=5):
-    symbol_mapping = {}
-    for record in symbol_changes:
-        old_symbol = record["oldSymbol"].strip()
-        symbol_mapping[old_symbol] = {
-            "newSymbol": record["newSymbol"].strip(),
-            "change_date": record["date"]
-        }
-    simulation_results = []
-
-    def get_historical(sym):
-        return price_data.get(sym, {}).get("historical", [])
-
-    def sum_dividends(ticker, year_start, year_end):
-        total = 0.0
-        if ticker not in dividend_data or "historical" not in dividend_data[ticker]:
-            return total
-        for record in dividend_data[ticker]["historical"]:
-            try:
-                rec_year = int(record["date"][:4])
-                if year_start <= rec_year <= year_end:
-                    total += float(record["adjDividend"])
-            except:
-                continue
-        return total
-
-    def get_total_dividends_for_ticker(ticker, start_year, end_year):
-        total = 0.0
-        if ticker in symbol_mapping:
-            change_info = symbol_mapping[ticker]
-            change_year = int(change_info["change_date"][:4])
-            if change_year <= start_year:
-                total += sum_dividends(symbol_mapping[ticker]["newSymbol"], start_year, end_year)
-            elif start_year < change_year <= end_year:
-                total += sum_dividends(ticker, start_year, change_year - 1)
-                total += sum_dividends(symbol_mapping[ticker]["newSymbol"], change_year, end_year)
-            else:
-                total += sum_dividends(ticker, start_year, end_year)
-        else:
-            total += sum_dividends(ticker, start_year, end_year)
-        return total
-
-    for start_year, tickers in portfolios_by_start_year.items():
-        end_year = start_year + holding_years
-        valid_tickers_info = []
-        portfolio_total_dividends = 0.0
-
-        for ticker in tickers:
-            if ticker in symbol_mapping:
-                change_info = symbol_mapping[ticker]
-                change_year = int(change_info["change_date"][:4])
-                if change_year <= start_year:
-                    symbol_start = change_info["newSymbol"]
-                    symbol_end = change_info["newSymbol"]
-                elif start_year < change_year <= end_year:
-                    symbol_start = ticker
-                    symbol_end = change_info["newSymbol"]
-                else:
-                    symbol_start = ticker
-                    symbol_end = ticker
-            else:
-                symbol_start = ticker
-                symbol_end = ticker
-
-            hist_start = get_historical(symbol_start)
-            hist_end = get_historical(symbol_end)
-
-            start_prices = [r for r in hist_start if r["date"].startswith(str(start_year))]
-            end_prices = [r for r in hist_end if r["date"].startswith(str(end_year))]
-
-            if not start_prices or not end_prices:
-                continue
-            try:
-                start_price = float(max(start_prices, key=lambda r: parse_date(r["date"]))["adjClose"])
-                end_price = float(max(end_prices, key=lambda r: parse_date(r["date"]))["adjClose"])
-            except:
-                continue
-            if start_price > 0:
-                ret = ((end_price - start_price) / start_price) * 100.0
-                valid_tickers_info.append((ticker, ret))
-                ticker_dividend = get_total_dividends_for_ticker(ticker, start_year, end_year)
-                portfolio_total_dividends += ticker_dividend
-            if len(valid_tickers_info) == max_tickers:
-                break
-
-        n = len(valid_tickers_info)
-        if n > 0:
-            start_value = n
-            end_value = sum(1 + (tup[1] / 100.0) for tup in valid_tickers_info)
-            total_return = ((end_value - start_value) / start_value) * 100
-            total_return = round(total_return, 2)
-            try:
-                cagr = ((1 + total_return / 100.0) ** (1 / holding_years) - 1) * 100
-                cagr = round(cagr, 2)
-            except:
-                cagr = None
-        else:
-            total_return = None
-            cagr = None
-        included_tickers = [tup[0] for tup in valid_tickers_info]
-        if end_year >= 2025:
-            break
-        simulation_results.append({
-            "StartYear": start_year,
-            "EndYear": end_year,
-            "TotalReturn (%)": total_return,
-            "TotalCAGR (%)": cagr,
-            "TotalDividend": round(portfolio_total_dividends, 2),
-            "IncludedTickersCount": n,
-            "IncludedTickers": included_tickers
-        })
-    return pd.DataFrame(simulation_results)
-
-def simulate_index_returns(index_data, holding_years=5):
-    from datetime import datetime
-    import pandas as pd
-
-    def parse_date_local(s):
-        return datetime.strptime(s, "%Y-%m-%d")
-    historical = index_data.get("historical", [])
-    records_by_year = {}
-    for record in historical:
-        try:
-            year = record["date"][:4]
-            records_by_year.setdefault(year, []).append(record)
-        except:
-            continue
-    simulation_results = []
-    for start_year in sorted(records_by_year.keys()):
-        start_year_int = int(start_year)
-        if start_year_int < 2011:
-            continue
-        end_year_int = start_year_int + holding_years
-        end_year_str = str(end_year_int)
-        if end_year_str not in records_by_year:
-            continue
-        try:
-            start_record = max(records_by_year[start_year], key=lambda r: parse_date_local(r["date"]))
-            end_record = max(records_by_year[end_year_str], key=lambda r: parse_date_local(r["date"]))
-        except:
-            continue
-        try:
-            start_price = float(start_record["adjClose"])
-            end_price = float(end_record["adjClose"])
-        except:
-            continue
-        if start_price <= 0:
-            continue
-        total_return = ((end_price - start_price) / start_price) * 100.0
-        total_return = round(total_return, 2)
-        try:
-            cagr = ((end_price / start_price) ** (1 / holding_years) - 1) * 100
-            cagr = round(cagr, 2)
-        except:
-            cagr = None
-        simulation_results.append({
-            "StartYear": start_year_int,
-            "EndYear": end_year_int,
-            "BuyPrice": round(start_price, 2),
-            "SellPrice": round(end_price, 2),
-            "Return (%)": total_return,
-            "CAGR (%)": cagr
-        })
-    return pd.DataFrame(simulation_results)
-
-def compare_simulations(price_data, dividend_data, portfolios_by_start_year, symbol_changes, sp500_index, max_tickers=20, holding_years=5):
-    import pandas as pd
-    strategy_df = simulate_returns(price_data, dividend_data, portfolios_by_start_year, symbol_changes, max_tickers, holding_years)
-    index_df = simulate_index_returns(sp500_index, holding_years)
-    merged_df = pd.merge(strategy_df, index_df, on=["StartYear", "EndYear"], how="inner", suffixes=("_strategy", "_index"))
-    merged_df = merged_df.rename(columns={
-        "TotalReturn (%)": "Strategy_TotalReturn (%)",
-        "TotalCAGR (%)": "Strategy_TotalCAGR (%)",
-        "Return (%)": "Index_Return (%)",
-        "CAGR (%)": "Index_CAGR (%)"
-    })
-    merged_df["Strategy_Beats_Index"] = (
-        (merged_df["Strategy_TotalReturn (%)"] > merged_df["Index_Return (%)"]) &
-        (merged_df["Strategy_TotalCAGR (%)"] > merged_df["Index_CAGR (%)"])
-    )
-    final_df = merged_df[[
-        "StartYear",
-        "EndYear",
-        "Strategy_TotalReturn (%)",
-        "Strategy_TotalCAGR (%)",
-        "Index_Return (%)",
-        "Index_CAGR (%)",
-        "Strategy_Beats_Index"
-    ]]
-    return final_df
-
+def simulate_returns(store, portfolios_by_start_year, symbol_changes, max_tickers=20, holding_years=5):
+    # Eine Haltedauer; für mehrere Haltedauern SimulationEngine.simulate direkt verwenden
+    engine = SimulationEngine(store, symbol_changes)
+    return engine.simulate(portfolios_by_start_year, [holding_years], max_tickers)[holding_years]
+
+def compare_simulations(store, portfolios_by_start_year, symbol_changes, sp500_index, max_tickers=20, holding_years=5,
+                        strategy_df=None, index_df=None):
+    # Bereits berechnete Simulationen (strategy_df / index_df) werden übernommen statt neu berechnet
+    if strategy_df is None:
+        strategy_df = simulate_returns(store, portfolios_by_start_year, symbol_changes, max_tickers, holding_years)
+    if index_df is None:
+        index_df = simulate_index_returns(sp500_index, holding_years)
+    return compare_with_index(strategy_df, index_df)
+
+
+def analyze_year(y, point_in_time=False):
+    """ Alle Filter eines Zieljahres als JSON-fähige Datensätze (Arbeitseinheit für --jobs)"""
+    return {
+        "dividend_yield": analyze_dividend_yield(y).to_dict(orient="records"),
+        "dividend_cagr": analyze_dividend_cagr(y).to_dict(orient="records"),
+        "eps_growth": analyze_eps_growth(y, progression_years=5, point_in_time=point_in_time).to_dict(orient="records"),
+        "revenue_cagr": analyze_revenue_cagr(y, point_in_time).to_dict(orient="records"),
+        "merged_filtering": merge_results(y, point_in_time).to_dict(orient="records")
+    }
 
 def main():
+    parser = argparse.ArgumentParser(description="Filter-Strategie: Analyse, Simulation und Indexvergleich")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Anzahl paralleler Prozesse für die Zieljahre (1 = seriell)")
+    parser.add_argument("--significance", type=int, default=0, metavar="N",
+                        help="zusätzlich Signifikanztests mit N Replikationen je Haltedauer (0 = aus)")
+    parser.add_argument("--risk", action="store_true",
+                        help="täglichen Wertverlauf simulieren und Volatilität, max. Drawdown und Sharpe Ratio ergänzen")
+    parser.add_argument("--drip", action="store_true",
+                        help="Dividenden zum Kurs am Zahltag wieder anlegen (Gesamtrendite statt Kursrendite)")
+    parser.add_argument("--rolling", action="store_true",
+                        help="zusätzlich mit rollierenden Einstiegen (jedes Monatsende) simulieren")
+    parser.add_argument("--entry-dates", nargs="+", default=None, metavar="YYYY-MM-DD",
+                        help="eigene Einstiegstage für --rolling statt der Monatsenden")
+    parser.add_argument("--point-in-time", action="store_true",
+                        help="EPS und Umsatz nur aus Berichten, die zum Stichtag bereits veröffentlicht waren")
+    parser.add_argument("--quarterly", action="store_true",
+                        help="zusätzlich zu jedem Quartalsende Portfolios aus TTM-Kennzahlen bilden und simulieren")
+    args = parser.parse_args()
+
+    # Vor dem Start der Worker laden: sie erben Speicher, Kennzahlen und Rohdaten per fork
+    store = get_store()
+    symbol_change = get_symbol_change()
+    sp500_index = get_sp500_index()
     years = range(2011, 2025)
-    filtering_results = {}
     for y in years:
-        df_div_yield = analyze_dividend_yield(y)
-        df_div_cagr = analyze_dividend_cagr(y)
-        df_eps = analyze_eps_growth(y, progression_years=5)
-        df_rev = analyze_revenue_cagr(y)
-        df_merge = merge_results(y)
-        filtering_results[y] = {
-            "dividend_yield": df_div_yield.to_dict(orient="records"),
-            "dividend_cagr": df_div_cagr.to_dict(orient="records"),
-            "eps_growth": df_eps.to_dict(orient="records"),
-            "revenue_cagr": df_rev.to_dict(orient="records"),
-            "merged_filtering": df_merge.to_dict(orient="records")
-        }
+        year_metrics(y, point_in_time=args.point_in_time)
+
+    filtering_results = dict(zip(years, run_parallel(partial(analyze_year, point_in_time=args.point_in_time), years, args.jobs)))
     with open("filtering_analysis/results/filtering_results.json", "w", encoding="utf-8") as f:
         json.dump(filtering_results, f, indent=2)
     print("Filter-Ergebnisse in 'filtering_results.json' gespeichert.")
 
-    # Simulationsergebnisse
-    simulation_results = {}
-    for hold in range(1, 11):
-        df_sim = simulate_returns(price_data, dividend_data, results_top_filtering, symbol_change, max_tickers=20, holding_years=hold)
-        simulation_results[hold] = df_sim.to_dict(orient="records")
+    merged_tickers = {y: [row["Ticker"] for row in filtering_results[y]["merged_filtering"]] for y in years}
+    results_top_filtering = collect_top_tickers_per_year(merged_tickers=merged_tickers)
+
+    holds = range(1, 11)
+    # Simulationsergebnisse: alle Haltedauern in einem Durchlauf
+    engine = (NavEngine if args.risk else SimulationEngine)(store, get_symbol_index(), drip=args.drip)
+    simulations = engine.simulate(results_top_filtering, holds, max_tickers=20)
+    simulation_results = {hold: simulations[hold].to_dict(orient="records") for hold in holds}
     with open("filtering_analysis/results/filtering_simulation.json", "w", encoding="utf-8") as f:
         json.dump(simulation_results, f, indent=2)
     print("Filtering-Simulation in 'filtering_simulation.json' gespeichert.")
 
-    # Vergleichsergebnisse
+    # Vergleichsergebnisse: Index einmal für alle Haltedauern simulieren, Strategie-Simulation wiederverwenden
+    index_simulations = simulate_index_horizons(sp500_index, holds, total_return=args.drip)
+    if args.risk:
+        index_simulations = add_index_risk(index_simulations, sp500_index, total_return=args.drip)
     comparison_results = {}
-    for hold in range(1, 11):
-        df_comp = compare_simulations(price_data, dividend_data, results_top_filtering, symbol_change, sp500_index, max_tickers=20, holding_years=hold)
+    for hold in holds:
+        df_comp = compare_simulations(store, results_top_filtering, symbol_change, sp500_index, max_tickers=20, holding_years=hold,
+                                      strategy_df=simulations[hold], index_df=index_simulations[hold])
         comparison_results[hold] = df_comp.to_dict(orient="records")
     with open("filtering_analysis/results/filtering_comparison.json", "w", encoding="utf-8") as f:
         json.dump(comparison_results, f, indent=2)
     print("Filtering-Vergleich in 'filtering_comparison.json' gespeichert.")
 
+    # Alpha gegen beide Vergleichsmaßstäbe: S&P 500 und gleich gewichtete S&P-500-Unternehmen (dieselbe Engine)
+    benchmark_results = {"Index": index_results_by_horizon(sp500_index, holds, total_return=args.drip),
+                         "EqualWeight": EqualWeightBenchmark(engine, years, holds).results_by_horizon()}
+    alpha_results = {hold: alpha_table(simulations[hold], {name: results[hold] for name, results in benchmark_results.items()})
+                     .to_dict(orient="records") for hold in holds}
+    with open("filtering_analysis/results/filtering_alpha.json", "w", encoding="utf-8") as f:
+        json.dump(alpha_results, f, indent=2)
+    print("Filtering-Alpha in 'filtering_alpha.json' gespeichert.")
+
+    if args.significance:
+        test = SignificanceTest(engine, results_top_filtering.keys())
+        significance = test.run(engine.simulate_rows(results_top_filtering, holds, max_tickers=20),
+                                index_results_by_horizon(sp500_index, holds, total_return=args.drip), replications=args.significance)
+        with open("filtering_analysis/results/filtering_significance.json", "w", encoding="utf-8") as f:
+            json.dump(significance.to_dict(orient="records"), f, indent=2)
+        print("Filtering-Signifikanztests in 'filtering_significance.json' gespeichert.")
+
+    if args.rolling:
+        rolling = RollingSimulation(engine).simulate_rows(results_top_filtering, args.entry_dates, holds, max_tickers=20)
+        # RollingSimulation rechnet ohne Wiederanlage: auch mit --drip gegen den Kursindex vergleichen
+        summary = summarize_rolling(rolling, index_rolling_returns(sp500_index, rolling, total_return=False))
+        with open("filtering_analysis/results/filtering_rolling.json", "w", encoding="utf-8") as f:
+            json.dump(rolling, f, indent=2)
+        with open("filtering_analysis/results/filtering_rolling_summary.json", "w", encoding="utf-8") as f:
+            json.dump(summary.to_dict(orient="records"), f, indent=2)
+        print("Rollierende Filtering-Simulation in 'filtering_rolling.json' und 'filtering_rolling_summary.json' gespeichert.")
+
+    if args.quarterly:
+        quarter_ends = days_to_str(quarter_end_calendar(min(years), max(years)))
+        quarterly_portfolios = {as_of: filter_quarter(as_of, args.point_in_time) for as_of in quarter_ends}
+        quarterly = RollingSimulation(engine).simulate_formations(quarterly_portfolios, holds, max_tickers=20)
+        # Wie --rolling ohne Wiederanlage: Vergleich mit dem Kursindex
+        summary = summarize_rolling(quarterly, index_rolling_returns(sp500_index, quarterly, total_return=False))
+        with open("filtering_analysis/results/filtering_quarterly.json", "w", encoding="utf-8") as f:
+            json.dump(quarterly, f, indent=2)
+        with open("filtering_analysis/results/filtering_quarterly_summary.json", "w", encoding="utf-8") as f:
+            json.dump(summary.to_dict(orient="records"), f, indent=2)
+        print("Quartalsweise Filtering-Portfolios in 'filtering_quarterly.json' und 'filtering_quarterly_summary.json' gespeichert.")
+
 if __name__ == "__main__":
     main()
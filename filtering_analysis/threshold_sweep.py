@@ -0,0 +1,46 @@
+#Copyright (C) 2025 Akram
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_store import get_store
+from core.simulation import SimulationEngine
+from core.threshold_sweep import FILTER_DEFAULTS, FilterMasks, parameter_grid, sweep_filter_thresholds
+from filtering_analysis import get_sp500_index, get_symbol_index
+
+RESULTS_PATH = "filtering_analysis/results/threshold_sweep.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Filter-Strategie für viele Schwellenwert-Kombinationen auswerten (je Parameter eine Werteliste)")
+    for name, default in FILTER_DEFAULTS.items():
+        value_type = int if isinstance(default, int) else float
+        parser.add_argument("--" + name.replace("_", "-"), dest=name, type=value_type, nargs="+", default=[default],
+                            help=f"Werte für {name} (Standard: {default})")
+    parser.add_argument("--max-tickers", type=int, default=20, help="maximale Anzahl Ticker je Portfolio")
+    parser.add_argument("--output", default=RESULTS_PATH, help="Ergebnistabelle (CSV)")
+    parser.add_argument("--point-in-time", action="store_true",
+                        help="EPS und Umsatz nur aus Berichten, die zum Stichtag bereits veröffentlicht waren")
+    args = parser.parse_args()
+
+    grid = {name: getattr(args, name) for name in FILTER_DEFAULTS}
+    store = get_store()
+    started = time.perf_counter()
+    masks = FilterMasks(store, point_in_time=args.point_in_time)
+    engine = SimulationEngine(store, get_symbol_index())
+    results = sweep_filter_thresholds(masks, engine, get_sp500_index(), grid, max_tickers=args.max_tickers)
+    results.to_csv(args.output, index=False)
+
+    print(f"{len(parameter_grid(grid))} Kombinationen in {time.perf_counter() - started:.1f} s ausgewertet, "
+          f"Ergebnisse in '{args.output}' gespeichert.")
+    best = results[results["HoldingYears"] == 5].sort_values("MeanCAGR (%)", ascending=False)
+    print("\nBeste Kombinationen (Haltedauer 5 Jahre, nach mittlerer CAGR):")
+    print(best.head(10).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
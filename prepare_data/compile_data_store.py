@@ -0,0 +1,20 @@
+#Copyright (C) 2025 Akram
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_store import RAW_DIR, STORE_DIR, compile_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FMP-Rohdaten (JSON) in den spaltenorientierten Datenspeicher umwandeln")
+    parser.add_argument("--raw-dir", default=RAW_DIR, help="Verzeichnis mit den JSON-Rohdaten")
+    parser.add_argument("--store-dir", default=STORE_DIR, help="Zielverzeichnis des Datenspeichers")
+    args = parser.parse_args()
+    compile_store(args.raw_dir, args.store_dir)
+
+if __name__ == "__main__":
+    main()
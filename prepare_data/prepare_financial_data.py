@@ -1,8 +1,16 @@
 #Copyright (C) 2025 Akram
 
-import requests
+import argparse
 import json
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
 
 # API Key einfügen
 API_KEY = ""
@@ -17,9 +25,66 @@ sp500_11to25_unique = ['A', 'AA', 'AAL', 'AAP', 'AAPL', 'ABBV', 'ABC', 'ABMD', '
 DATA_DIR = "data/s&p500"
 os.makedirs(DATA_DIR, exist_ok=True)
 
-def fetch_url(url):
+# Endpunkte je Ticker: Dateiname -> Pfad (relativ zu BASE_URL)
+FINANCIAL_ENDPOINTS = {
+    "stock_dividend": "historical-price-full/stock_dividend/{ticker}",
+    "stock_split": "historical-price-full/stock_split/{ticker}",
+    "income_statement_annual": "income-statement/{ticker}?period=annual",
+    "income_statement_quarter": "income-statement/{ticker}?period=quarter",
+    "historical_price_full": "historical-price-full/{ticker}",
+}
+
+PRICE_START_DATE = "2010-12-31"
+
+# Inkrementeller Abruf: Anzahl der neuesten Berichte, die bei vorhandener Historie angefragt werden
+INCOME_STATEMENT_LIMITS = {
+    "income_statement_annual": 2,
+    "income_statement_quarter": 5,
+}
+
+# Unterordner von data_dir für die Checkpoints je Endpunkt und Ticker
+CHECKPOINT_SUBDIR = "checkpoints"
+# Wird nach vollständigem Aufteilen einer Gesamtdatei im Checkpoint-Ordner des Endpunkts angelegt
+SEEDED_MARKER = ".seeded"
+
+# Standardwerte für den parallelen Abruf (FMP Starter-Plan: 300 Aufrufe pro Minute)
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+DEFAULT_MAX_IN_FLIGHT = 8
+
+
+class RateLimiter:
+    """Verteilt Anfragen threadsicher gleichmäßig auf höchstens `requests_per_second` pro Sekunde."""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def create_session(pool_size=DEFAULT_MAX_IN_FLIGHT):
+    # Eine Session mit Connection-Pool: TCP/TLS-Verbindungen werden wiederverwendet
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_url(url, session=None, rate_limiter=None):
+    if rate_limiter is not None:
+        rate_limiter.wait()
     try:
-        response = requests.get(url)
+        response = (session or requests).get(url)
         if response.status_code == 200:
             return response.json()
         else:
@@ -29,36 +94,179 @@ def fetch_url(url):
         print(f"Exception {e} beim Abrufen von {url}")
         return None
 
-def fetch_all_financial_data():
-    stock_dividend_data = {}
-    stock_split_data = {}
-    income_statement_annual_data = {}
-    income_statement_quarter_data = {}
-    historical_price_full_data = {}
+def build_url(base_url, name, ticker, api_key, params=None):
+    path = FINANCIAL_ENDPOINTS[name].format(ticker=ticker)
+    query = urlencode({**(params or {}), "apikey": api_key})
+    return f"{base_url}{path}{'&' if '?' in path else '?'}{query}"
 
-    for ticker in sp500_11to25_unique:
-        print(f"Lade Daten für {ticker}...")
+def get_records(name, data):
+    if not data:
+        return []
+    if name.startswith("income_statement"):
+        return data
+    return data.get("historical", [])
 
-        stock_dividend_data[ticker] = fetch_url(f"{BASE_URL}historical-price-full/stock_dividend/{ticker}?apikey={API_KEY}")
-        stock_split_data[ticker] = fetch_url(f"{BASE_URL}historical-price-full/stock_split/{ticker}?apikey={API_KEY}")
-        income_statement_annual_data[ticker] = fetch_url(f"{BASE_URL}income-statement/{ticker}?period=annual&apikey={API_KEY}")
-        income_statement_quarter_data[ticker] = fetch_url(f"{BASE_URL}income-statement/{ticker}?period=quarter&apikey={API_KEY}")
-        historical_price_full_data[ticker] = fetch_url(f"{BASE_URL}historical-price-full/{ticker}?from=2010-12-31&to=2025-02-28&apikey={API_KEY}")
+def record_key(name, record):
+    if name.startswith("income_statement"):
+        return record.get("date"), record.get("period")
+    return record.get("date")
 
-    with open(os.path.join(DATA_DIR, "stock_dividend.json"), "w") as f:
-        json.dump(stock_dividend_data, f, indent=4)
+def last_record_date(name, data):
+    dates = [r["date"] for r in get_records(name, data) if r.get("date")]
+    return max(dates) if dates else None
 
-    with open(os.path.join(DATA_DIR, "stock_split.json"), "w") as f:
-        json.dump(stock_split_data, f, indent=4)
+def merge_records(name, old_data, new_data):
+    """ Neue Datensätze in die vorhandenen einfügen (neuere überschreiben gleiche Schlüssel) -> (Daten, Anzahl neuer Datensätze)"""
+    if not old_data:
+        return new_data, len(get_records(name, new_data))
+    merged = {record_key(name, r): r for r in get_records(name, old_data)}
+    added = 0
+    for record in get_records(name, new_data):
+        key = record_key(name, record)
+        if key not in merged:
+            added += 1
+        merged[key] = record
+    records = sorted(merged.values(), key=lambda r: r.get("date") or "", reverse=True)
+    if name.startswith("income_statement"):
+        return records, added
+    return {**old_data, **(new_data or {}), "historical": records}, added
 
-    with open(os.path.join(DATA_DIR, "income_statement_annual.json"), "w") as f:
-        json.dump(income_statement_annual_data, f, indent=4)
+def checkpoint_path(checkpoint_dir, name, ticker):
+    return os.path.join(checkpoint_dir, name, f"{ticker}.json")
+
+def load_checkpoint(checkpoint_dir, name, ticker):
+    path = checkpoint_path(checkpoint_dir, name, ticker)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-    with open(os.path.join(DATA_DIR, "income_statement_quarter.json"), "w") as f:
-        json.dump(income_statement_quarter_data, f, indent=4)
+def save_checkpoint(checkpoint_dir, name, ticker, checkpoint):
+    # Erst in eine temporäre Datei schreiben, damit ein Abbruch keinen halben Checkpoint hinterlässt
+    path = checkpoint_path(checkpoint_dir, name, ticker)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
 
-    with open(os.path.join(DATA_DIR, "historical_price_full.json"), "w") as f:
-        json.dump(historical_price_full_data, f, indent=4)
+def seed_checkpoints(data_dir, checkpoint_dir, name):
+    """
+    Einmalig: eine vorhandene Gesamtdatei in Checkpoints je Ticker aufteilen, damit nur noch das Delta geladen wird.
+    Ticker mit Checkpoint bleiben unverändert; erst nach dem letzten Ticker wird SEEDED_MARKER geschrieben,
+    ein abgebrochenes Aufteilen wird daher beim nächsten Lauf fortgesetzt.
+    """
+    endpoint_dir = os.path.join(checkpoint_dir, name)
+    marker_path = os.path.join(endpoint_dir, SEEDED_MARKER)
+    if os.path.exists(marker_path):
+        return
+    os.makedirs(endpoint_dir, exist_ok=True)
+    combined_path = os.path.join(data_dir, f"{name}.json")
+    if os.path.exists(combined_path):
+        with open(combined_path, "r", encoding="utf-8") as f:
+            combined = json.load(f)
+        for ticker, data in combined.items():
+            if data is None or os.path.exists(checkpoint_path(checkpoint_dir, name, ticker)):
+                continue
+            save_checkpoint(checkpoint_dir, name, ticker, {
+                "refreshed_to": None,
+                "last_date": last_record_date(name, data),
+                "data": data
+            })
+    with open(marker_path, "w", encoding="utf-8"):
+        pass
+
+def request_params(name, checkpoint, end_date):
+    """ Query-Parameter des Abrufs; None wenn die gespeicherten Kurse bereits bis end_date reichen"""
+    if name == "historical_price_full":
+        if checkpoint is None or checkpoint.get("full_reload") or not checkpoint["last_date"]:
+            return {"from": PRICE_START_DATE, "to": end_date}
+        start_date = next_day(checkpoint["last_date"])
+        if start_date > end_date:
+            return None
+        return {"from": start_date, "to": end_date}
+    if checkpoint is None or not checkpoint["last_date"]:
+        return {}
+    if name in INCOME_STATEMENT_LIMITS:
+        return {"limit": INCOME_STATEMENT_LIMITS[name]}
+    return {"from": next_day(checkpoint["last_date"])}
+
+def next_day(date_str):
+    return (datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+def refresh_ticker(ticker, fetch, checkpoint_dir, end_date):
+    """
+    Aktualisiert alle Endpunkte eines Tickers inkrementell.
+    Checkpoints mit refreshed_to == end_date sind bereits aktuell und werden übersprungen (Resume).
+    """
+    for name in FINANCIAL_ENDPOINTS:
+        checkpoint = load_checkpoint(checkpoint_dir, name, ticker)
+        if checkpoint is not None and checkpoint["refreshed_to"] == end_date:
+            continue
+
+        params = request_params(name, checkpoint, end_date)
+        if params is None:
+            # Nichts Neues abzurufen: nur als aktuell markieren
+            checkpoint["refreshed_to"] = end_date
+            save_checkpoint(checkpoint_dir, name, ticker, checkpoint)
+            continue
+
+        data = fetch(name, params)
+        if data is None:
+            # Fehler: beim nächsten Lauf erneut versuchen
+            continue
+
+        full_reload = checkpoint is None or checkpoint.get("full_reload")
+        merged, added = merge_records(name, None if full_reload else checkpoint["data"], data)
+        save_checkpoint(checkpoint_dir, name, ticker, {
+            "refreshed_to": end_date,
+            "last_date": last_record_date(name, merged),
+            "data": merged
+        })
+
+        # Neue Dividenden oder Splits verändern adjClose der gesamten Historie -> Kurse komplett neu laden
+        if name in ("stock_dividend", "stock_split") and checkpoint is not None and added:
+            price_checkpoint = load_checkpoint(checkpoint_dir, "historical_price_full", ticker)
+            if price_checkpoint is not None:
+                price_checkpoint.update(refreshed_to=None, full_reload=True)
+                save_checkpoint(checkpoint_dir, "historical_price_full", ticker, price_checkpoint)
+
+def fetch_all_financial_data(tickers=sp500_11to25_unique, base_url=BASE_URL, api_key=API_KEY, data_dir=DATA_DIR,
+                             max_in_flight=DEFAULT_MAX_IN_FLIGHT, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                             end_date=None, checkpoint_dir=None):
+    """
+    Lädt alle Endpunkte aus FINANCIAL_ENDPOINTS für jeden Ticker.
+    max_in_flight begrenzt die gleichzeitig offenen Anfragen (1 = seriell),
+    requests_per_second das Tempo über alle Threads (None/0 = unbegrenzt).
+    Jeder Ticker/Endpunkt wird sofort als Checkpoint gespeichert (Standard: data_dir/checkpoints);
+    vorhandene Daten werden nur um neuere Datensätze bis end_date (Standard: heute) ergänzt,
+    ein abgebrochener Lauf setzt dort fort.
+    """
+    if end_date is None:
+        end_date = date.today().strftime("%Y-%m-%d")
+    if checkpoint_dir is None:
+        checkpoint_dir = os.path.join(data_dir, CHECKPOINT_SUBDIR)
+    for name in FINANCIAL_ENDPOINTS:
+        seed_checkpoints(data_dir, checkpoint_dir, name)
+    rate_limiter = RateLimiter(requests_per_second)
+
+    def refresh(ticker):
+        print(f"Lade Daten für {ticker}...")
+
+        def fetch(name, params):
+            return fetch_url(build_url(base_url, name, ticker, api_key, params), session=session, rate_limiter=rate_limiter)
+
+        refresh_ticker(ticker, fetch, checkpoint_dir, end_date)
+
+    with create_session(max_in_flight) as session, ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        list(executor.map(refresh, tickers))
+
+    for name in FINANCIAL_ENDPOINTS:
+        combined = {}
+        for ticker in tickers:
+            checkpoint = load_checkpoint(checkpoint_dir, name, ticker)
+            combined[ticker] = checkpoint["data"] if checkpoint is not None else None
+        with open(os.path.join(data_dir, f"{name}.json"), "w") as f:
+            json.dump(combined, f, indent=4)
 
     print("Alle Unternehmensdaten wurden gespeichert.")
 
@@ -89,7 +297,16 @@ def fetch_symbol_changes():
         print("symbol_change.json gespeichert.")
 
 def main():
-    fetch_all_financial_data()
+    parser = argparse.ArgumentParser(description="Finanzdaten von der FMP API laden")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="maximal gleichzeitig offene Anfragen (1 = seriell)")
+    parser.add_argument("--rps", type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help="maximale Anfragen pro Sekunde (0 = unbegrenzt)")
+    parser.add_argument("--end-date", default=None,
+                        help="Kurse bis zu diesem Datum laden (YYYY-MM-DD, Standard: heute)")
+    args = parser.parse_args()
+
+    fetch_all_financial_data(max_in_flight=args.max_in_flight, requests_per_second=args.rps, end_date=args.end_date)
     fetch_sp500_index_and_dividends()
     fetch_symbol_changes()
     print("Datenabruf abgeschlossen.")
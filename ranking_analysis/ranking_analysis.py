@@ -1,411 +1,77 @@
 #Copyright (C) 2025 Akram
 
+import argparse
+import os
+import sys
 import streamlit as st
 import json
-import pandas as pd
-import numpy as np
-from datetime import datetime
+from functools import cache, partial
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.benchmark import EqualWeightBenchmark, get_benchmark
+from core.data_store import get_store
+from core.metric_cache import memoize_metric
+from core.metrics import days_to_str, quarter_metrics, year_metrics
+from core.nav import NavEngine, add_index_risk
+from core.parallel import run_parallel
+from core.quarterly_aggregates import quarter_end_calendar
+from core.rolling import RollingSimulation, index_rolling_returns, summarize_rolling
+from core.significance import SignificanceTest
+from core.simulation import SimulationEngine, alpha_table, compare_with_index, index_results_by_horizon, simulate_index_horizons, simulate_index_returns
+from core.symbol_index import SymbolIndex
 
 @st.cache_data
 def load_json_file(filepath):
     with open(filepath, "r", encoding="utf-8") as f:
         return json.load(f)
 
-@st.cache_data
-def load_sp500_data(target_year):
-    sp500_csv_path = f"data/s&p500/sp500_{target_year}.csv"
-    return pd.read_csv(sp500_csv_path)
-
-
-def extract_year(date_str):
-    try:
-        return int(date_str.split("-")[0])
-    except Exception:
-        return None
-
-def parse_date(date_str):
-    try:
-        return datetime.strptime(date_str, "%Y-%m-%d")
-    except Exception:
-        return None
-
-def calculate_dividend_yield_rank(ticker, target_year):
-    if ticker not in dividend_data or "historical" not in dividend_data[ticker]:
-        return None
-
-    total_dividends = 0.0
-    for record in dividend_data[ticker]["historical"]:
-        try:
-            rec_year = extract_year(record["date"])
-            if rec_year == target_year:
-                d = float(record["adjDividend"])
-                total_dividends += d
-        except:
-            pass
-
-    if total_dividends == 0:
-        return None
-
-    if ticker not in price_data or "historical" not in price_data[ticker]:
-        return None
-
-    target_records = [r for r in price_data[ticker]["historical"] if r["date"].startswith(str(target_year))]
-    if not target_records:
-        return None
-
-    last_record_target = max(target_records, key=lambda r: parse_date(r["date"]))
-    try:
-        target_date_price = float(last_record_target["adjClose"])
-        if target_date_price > 0:
-            return (total_dividends / target_date_price) * 100.0
-    except:
-        pass
-    return None
-
-def analyze_dividend_yield_rank(target_year):
-    companies_df = load_sp500_data(target_year)
-    results = []
-    for idx, row in companies_df.iterrows():
-        ticker = row["Ticker"]
-        dy = calculate_dividend_yield_rank(ticker, target_year)
-        results.append({
-            "Ticker": ticker,
-            "DividendYield": dy if dy is not None else np.nan
-        })
-    return pd.DataFrame(results)
-
-def analyze_dividend_cagr_rank(target_year):
-    start_year = target_year - 10
-    companies_df = load_sp500_data(target_year)
-    results = []
-
-    for idx, row in companies_df.iterrows():
-        ticker = row["Ticker"]
-        div_cagr = np.nan
-
-        if ticker in dividend_data and "historical" in dividend_data[ticker]:
-            dividends_target = 0.0
-            dividends_start  = 0.0
-
-            for record in dividend_data[ticker]["historical"]:
-                try:
-                    rec_date = datetime.strptime(record["date"], "%Y-%m-%d")
-                    rec_year = rec_date.year
-                    adj_div = float(record["adjDividend"])
-                except:
-                    continue
-
-                if rec_year == target_year:
-                    dividends_target += adj_div
-                elif rec_year == start_year:
-                    dividends_start += adj_div
-
-            if dividends_target > 0 and dividends_start > 0:
-                try:
-                    cagr = (dividends_target / dividends_start) ** (1/10) - 1
-                    div_cagr = cagr * 100.0
-                except:
-                    pass
-
-        results.append({
-            "Ticker": ticker,
-            "DividendCAGR": div_cagr
-        })
-
-    return pd.DataFrame(results)
-
-def analyze_eps_growth_rank(target_year, progression_years=5):
-    start_year = target_year - progression_years + 1
-    companies_df = load_sp500_data(target_year)
-    results = []
-    for idx, row in companies_df.iterrows():
-        ticker = row["Ticker"]
-        eps_growth_value = np.nan
-        if ticker in income_data:
-            eps_dict = {}
-            for record in income_data[ticker]:
-                try:
-                    year = int(record.get("calendarYear", 0))
-                    eps_val = float(record["eps"])
-                except:
-                    continue
-                if start_year <= year <= target_year:
-                    eps_dict[year] = eps_val
-            if start_year in eps_dict and target_year in eps_dict:
-                eps_start = eps_dict[start_year]
-                eps_end   = eps_dict[target_year]
-                if eps_start > 0 and eps_end > 0:
-                    n = target_year - start_year
-                    try:
-                        growth = (eps_end / eps_start) ** (1/n) - 1
-                        eps_growth_value = growth * 100.0
-                    except:
-                        pass
-        results.append({
-            "Ticker": ticker,
-            "EPSGrowth": eps_growth_value
-        })
-    return pd.DataFrame(results)
-
-def analyze_revenue_cagr_rank(target_year):
-    start_year = target_year - 10
-    companies_df = load_sp500_data(target_year)
-    results = []
-    for idx, row in companies_df.iterrows():
-        ticker = row["Ticker"]
-        rev_cagr = np.nan
-        if ticker in income_data:
-            revenue_target = None
-            revenue_start  = None
-            for record in income_data[ticker]:
-                try:
-                    rec_date = datetime.strptime(record["date"], "%Y-%m-%d")
-                    rec_year = rec_date.year
-                    revenue_val = float(record["revenue"])
-                except:
-                    continue
-                if rec_year == target_year:
-                    revenue_target = revenue_val
-                elif rec_year == start_year:
-                    revenue_start = revenue_val
-            if revenue_target and revenue_start and revenue_target > 0 and revenue_start > 0:
-                try:
-                    cagr = (revenue_target / revenue_start) ** (1/10) - 1
-                    rev_cagr = cagr * 100.0
-                except:
-                    pass
-        results.append({
-            "Ticker": ticker,
-            "RevenueCAGR": rev_cagr
-        })
-    return pd.DataFrame(results)
-
-def simulate_index_returns(index_data, holding_years=5):
-
-    def parse_date_local(s):
-        return datetime.strptime(s, "%Y-%m-%d")
-
-    historical = index_data.get("historical", [])
-    records_by_year = {}
-
-    # Gruppiere nach Jahr
-    for record in historical:
-        try:
-            year = record["date"][:4]
-            records_by_year.setdefault(year, []).append(record)
-        except:
-            continue
+# Daten werden erst beim ersten Zugriff geladen und danach wiederverwendet
+@cache
+def get_symbol_change():
+    return load_json_file("data/symbol_change.json")
 
-    simulation_results = []
-
-    for start_year in sorted(records_by_year.keys()):
-        start_year_int = int(start_year)
-        if start_year_int < 2011:
-            continue
+@cache
+def get_symbol_index():
+    return SymbolIndex(get_symbol_change())
 
-        end_year_int = start_year_int + holding_years
-        end_year_str = str(end_year_int)
+def get_sp500_index():
+    # IndexBenchmark (Kurs- und Gesamtrendite-Index), einmal je Prozess geladen und von beiden Strategien geteilt
+    return get_benchmark()
 
-        if end_year_str not in records_by_year:
-            continue
-
-        try:
-            start_record = max(records_by_year[start_year], key=lambda r: parse_date_local(r["date"]))
-            end_record = max(records_by_year[end_year_str], key=lambda r: parse_date_local(r["date"]))
-        except:
-            continue
-
-        try:
-            start_price = float(start_record["adjClose"])
-            end_price = float(end_record["adjClose"])
-        except:
-            continue
-
-        if start_price <= 0:
-            continue
+@memoize_metric("ranking.dividend_yield")
+def analyze_dividend_yield_rank(target_year):
+    return year_metrics(target_year)[["Ticker", "DividendYield"]]
 
-        total_return = ((end_price - start_price) / start_price) * 100.0
-        total_return = round(total_return, 2)
-
-        try:
-            cagr = ((end_price / start_price) ** (1 / holding_years) - 1) * 100
-            cagr = round(cagr, 2)
-        except:
-            cagr = None
-
-        simulation_results.append({
-            "StartYear": start_year_int,
-            "EndYear": end_year_int,
-            "BuyPrice": round(start_price, 2),
-            "SellPrice": round(end_price, 2),
-            "Return (%)": total_return,
-            "CAGR (%)": cagr
-        })
-
-    return pd.DataFrame(simulation_results)
-
-def simulate_returns(price_data, dividend_data, portfolios_by_start_year, symbol_changes, max_tickers=20, holding_years=5):
-    # Symbolwechsel-Mapping vorbereiten
-    symbol_mapping = {}
-    for record in symbol_changes:
-        old_symbol = record["oldSymbol"].strip()
-        symbol_mapping[old_symbol] = {
-            "newSymbol": record["newSymbol"].strip(),
-            "change_date": record["date"]
-        }
-
-    simulation_results = []
-
-    def get_historical(sym):
-        return price_data.get(sym, {}).get("historical", [])
-
-    def sum_dividends(ticker, year_start, year_end):
-        total = 0.0
-        if ticker not in dividend_data or "historical" not in dividend_data[ticker]:
-            return total
-        for record in dividend_data[ticker]["historical"]:
-            try:
-                rec_year = int(record["date"][:4])
-                if year_start <= rec_year <= year_end:
-                    total += float(record["adjDividend"])
-            except:
-                continue
-        return total
-
-    def get_total_dividends_for_ticker(ticker, start_year, end_year):
-        total = 0.0
-        if ticker in symbol_mapping:
-            change_info = symbol_mapping[ticker]
-            change_year = int(change_info["change_date"][:4])
-            if change_year <= start_year:
-                total += sum_dividends(symbol_mapping[ticker]["newSymbol"], start_year, end_year)
-            elif start_year < change_year <= end_year:
-                total += sum_dividends(ticker, start_year, change_year - 1)
-                total += sum_dividends(symbol_mapping[ticker]["newSymbol"], change_year, end_year)
-            else:
-                total += sum_dividends(ticker, start_year, end_year)
-        else:
-            total += sum_dividends(ticker, start_year, end_year)
-        return total
-
-    for start_year, tickers in portfolios_by_start_year.items():
-        end_year = start_year + holding_years
-        valid_tickers_info = []
-        portfolio_total_dividends = 0.0
-
-        for ticker in tickers:
-            if ticker in symbol_mapping:
-                change_info = symbol_mapping[ticker]
-                change_year = int(change_info["change_date"][:4])
-                if change_year <= start_year:
-                    symbol_start = change_info["newSymbol"]
-                    symbol_end = change_info["newSymbol"]
-                elif start_year < change_year <= end_year:
-                    symbol_start = ticker
-                    symbol_end = change_info["newSymbol"]
-                else:
-                    symbol_start = ticker
-                    symbol_end = ticker
-            else:
-                symbol_start = ticker
-                symbol_end = ticker
-
-            hist_start = get_historical(symbol_start)
-            hist_end = get_historical(symbol_end)
-
-            start_prices = [r for r in hist_start if r["date"].startswith(str(start_year))]
-            end_prices = [r for r in hist_end if r["date"].startswith(str(end_year))]
-
-            if not start_prices or not end_prices:
-                continue
-
-            try:
-                start_price = max(start_prices, key=lambda r: parse_date(r["date"]))["adjClose"]
-                end_price = max(end_prices, key=lambda r: parse_date(r["date"]))["adjClose"]
-                start_price = float(start_price)
-                end_price = float(end_price)
-            except:
-                continue
-
-            if start_price > 0:
-                ret = ((end_price - start_price) / start_price) * 100.0
-                valid_tickers_info.append((ticker, ret))
-                ticker_dividend = get_total_dividends_for_ticker(ticker, start_year, end_year)
-                portfolio_total_dividends += ticker_dividend
-
-            if len(valid_tickers_info) == max_tickers:
-                break
-
-        n = len(valid_tickers_info)
-        if n > 0:
-            start_value = n
-            end_value = sum(1 + (tup[1] / 100.0) for tup in valid_tickers_info)
-            total_return = ((end_value - start_value) / start_value) * 100
-            total_return = round(total_return, 2)
-            try:
-                cagr = ((1 + total_return / 100.0) ** (1 / holding_years) - 1) * 100
-                cagr = round(cagr, 2)
-            except:
-                cagr = None
-        else:
-            total_return = None
-            cagr = None
-
-        included_tickers = [tup[0] for tup in valid_tickers_info]
-        if end_year >= 2025:
-            break
-
-        simulation_results.append({
-            "StartYear": start_year,
-            "EndYear": end_year,
-            "TotalReturn (%)": total_return,
-            "TotalCAGR (%)": cagr,
-            "TotalDividend": round(portfolio_total_dividends, 2),
-            "IncludedTickersCount": n,
-            "IncludedTickers": included_tickers
-        })
-
-    return pd.DataFrame(simulation_results)
-
-def compare_simulations(price_data, dividend_data, portfolios_by_start_year, symbol_changes, sp500_index, max_tickers=20, holding_years=5):
-    # Strategie-Simulation (inkl. Dividenden etc.)
-    strategy_df = simulate_returns(price_data, dividend_data, portfolios_by_start_year, symbol_changes, max_tickers, holding_years)
-    # Index-Simulation (nur für Jahre ab 2011)
-    index_df = simulate_index_returns(sp500_index, holding_years)
-    # Zusammenführen der Ergebnisse anhand von StartYear und EndYear
-    merged_df = pd.merge(strategy_df, index_df, on=["StartYear", "EndYear"], how="inner", suffixes=("_strategy", "_index"))
-    merged_df = merged_df.rename(columns={
-        "TotalReturn (%)": "Strategy_TotalReturn (%)",
-        "TotalCAGR (%)": "Strategy_TotalCAGR (%)",
-        "Return (%)": "Index_Return (%)",
-        "CAGR (%)": "Index_CAGR (%)"
-    })
-    merged_df["Strategy_Beats_Index"] = (
-        (merged_df["Strategy_TotalReturn (%)"] > merged_df["Index_Return (%)"]) &
-        (merged_df["Strategy_TotalCAGR (%)"] > merged_df["Index_CAGR (%)"])
-    )
-    final_df = merged_df[[
-        "StartYear",
-        "EndYear",
-        "Strategy_TotalReturn (%)",
-        "Strategy_TotalCAGR (%)",
-        "Index_Return (%)",
-        "Index_CAGR (%)",
-        "Strategy_Beats_Index"
-    ]]
-    return final_df
-
-def merge_and_rank(target_year):
-    df_yield    = analyze_dividend_yield_rank(target_year)
-    df_div_cagr = analyze_dividend_cagr_rank(target_year)
-    df_eps      = analyze_eps_growth_rank(target_year, progression_years=5)
-    df_rev      = analyze_revenue_cagr_rank(target_year)
-
-    sp500_df = load_sp500_data(target_year)[["Ticker"]]
-    merged = sp500_df.merge(df_yield, on="Ticker", how="inner")
-    merged = merged.merge(df_div_cagr, on="Ticker", how="inner")
-    merged = merged.merge(df_eps, on="Ticker", how="inner")
-    merged = merged.merge(df_rev, on="Ticker", how="inner")
+@memoize_metric("ranking.dividend_cagr")
+def analyze_dividend_cagr_rank(target_year):
+    return year_metrics(target_year)[["Ticker", "DividendCAGR"]]
+
+@memoize_metric("ranking.eps_growth")
+def analyze_eps_growth_rank(target_year, progression_years=5, point_in_time=False):
+    return year_metrics(target_year, progression_years, point_in_time)[["Ticker", "EPSGrowth"]]
+
+@memoize_metric("ranking.revenue_cagr")
+def analyze_revenue_cagr_rank(target_year, point_in_time=False):
+    return year_metrics(target_year, point_in_time=point_in_time)[["Ticker", "RevenueCAGR"]]
+
+def simulate_returns(store, portfolios_by_start_year, symbol_changes, max_tickers=20, holding_years=5):
+    # Eine Haltedauer; für mehrere Haltedauern SimulationEngine.simulate direkt verwenden
+    engine = SimulationEngine(store, symbol_changes)
+    return engine.simulate(portfolios_by_start_year, [holding_years], max_tickers)[holding_years]
+
+def compare_simulations(store, portfolios_by_start_year, symbol_changes, sp500_index, max_tickers=20, holding_years=5,
+                        strategy_df=None, index_df=None):
+    # Bereits berechnete Simulationen (strategy_df / index_df) werden übernommen statt neu berechnet
+    if strategy_df is None:
+        strategy_df = simulate_returns(store, portfolios_by_start_year, symbol_changes, max_tickers, holding_years)
+    if index_df is None:
+        index_df = simulate_index_returns(sp500_index, holding_years)
+    return compare_with_index(strategy_df, index_df)
+
+def rank_metrics(metrics):
+    """ Dichte Ränge der vier Kennzahlen und Rangsumme für alle Ticker mit allen vier Kennzahlen, nach Rangsumme sortiert"""
+    merged = metrics[["Ticker", "DividendYield", "DividendCAGR", "EPSGrowth", "RevenueCAGR"]].copy()
     merged.dropna(subset=["DividendYield", "DividendCAGR", "EPSGrowth", "RevenueCAGR"], inplace=True)
     merged["Rank_DividendYield"] = merged["DividendYield"].rank(method="dense", ascending=False)
     merged["Rank_DividendCAGR"]  = merged["DividendCAGR"].rank(method="dense", ascending=False)
@@ -417,83 +83,148 @@ def merge_and_rank(target_year):
         merged["Rank_EPSGrowth"]     +
         merged["Rank_RevenueCAGR"]
     )
-    merged.sort_values("Rank_Sum", inplace=True)
+    # stabil sortieren: gleiche Rangsummen bleiben in CSV-Reihenfolge
+    merged.sort_values("Rank_Sum", inplace=True, kind="stable")
     merged.reset_index(drop=True, inplace=True)
     return merged
 
-def extract_top():
+@memoize_metric("ranking.merged_rank")
+def merge_and_rank(target_year, point_in_time=False):
+    return rank_metrics(year_metrics(target_year, point_in_time=point_in_time))
+
+def extract_top(ranking_results=None, top_n=30, point_in_time=False):
+    # ranking_results: bereits berechnete Rangliste je Jahr (z. B. aus den Workern), sonst merge_and_rank
     top30_ticker_dict_ranking = {}
     for target_year in range(2011, 2025):
-        final_df = merge_and_rank(target_year)
-        top30_ticker_dict_ranking[target_year] = final_df["Ticker"].head(30).tolist()
+        if ranking_results is not None:
+            top30_ticker_dict_ranking[target_year] = [row["Ticker"] for row in ranking_results[target_year]["merged_rank"][:top_n]]
+            continue
+        final_df = merge_and_rank(target_year, point_in_time)
+        top30_ticker_dict_ranking[target_year] = final_df["Ticker"].head(top_n).tolist()
     return top30_ticker_dict_ranking
 
+def extract_quarterly_top(quarter_ends, top_n=30, point_in_time=False):
+    """ {Quartalsende 'YYYY-MM-DD': top_n Ticker} aus den TTM-Kennzahlen (quarter_metrics), Rangliste wie merge_and_rank"""
+    return {as_of: rank_metrics(quarter_metrics(as_of, point_in_time=point_in_time))["Ticker"].head(top_n).tolist()
+            for as_of in quarter_ends}
 
 
-dividend_data = load_json_file("data/stock_dividend.json")
-price_data    = load_json_file("data/historical_price_full.json")
-income_data   = load_json_file("data/income_statement_annual.json")
-symbol_change = load_json_file("data/symbol_change.json")
-sp500_index   = load_json_file("data/sp500_index.json")
-
+def rank_year(y, point_in_time=False):
+    """ Alle Kennzahlen und die Rangliste eines Zieljahres als JSON-fähige Datensätze (Arbeitseinheit für --jobs)"""
+    return {
+        "dividend_yield": analyze_dividend_yield_rank(y).to_dict(orient="records"),
+        "dividend_cagr":  analyze_dividend_cagr_rank(y).to_dict(orient="records"),
+        "eps_growth":     analyze_eps_growth_rank(y, progression_years=5, point_in_time=point_in_time).to_dict(orient="records"),
+        "revenue_cagr":   analyze_revenue_cagr_rank(y, point_in_time).to_dict(orient="records"),
+        "merged_rank":    merge_and_rank(y, point_in_time).to_dict(orient="records")
+    }
 
 def main():
+    parser = argparse.ArgumentParser(description="Ranking-Strategie: Rangliste, Simulation und Indexvergleich")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Anzahl paralleler Prozesse für die Zieljahre (1 = seriell)")
+    parser.add_argument("--significance", type=int, default=0, metavar="N",
+                        help="zusätzlich Signifikanztests mit N Replikationen je Haltedauer (0 = aus)")
+    parser.add_argument("--risk", action="store_true",
+                        help="täglichen Wertverlauf simulieren und Volatilität, max. Drawdown und Sharpe Ratio ergänzen")
+    parser.add_argument("--drip", action="store_true",
+                        help="Dividenden zum Kurs am Zahltag wieder anlegen (Gesamtrendite statt Kursrendite)")
+    parser.add_argument("--rolling", action="store_true",
+                        help="zusätzlich mit rollierenden Einstiegen (jedes Monatsende) simulieren")
+    parser.add_argument("--entry-dates", nargs="+", default=None, metavar="YYYY-MM-DD",
+                        help="eigene Einstiegstage für --rolling statt der Monatsenden")
+    parser.add_argument("--point-in-time", action="store_true",
+                        help="EPS und Umsatz nur aus Berichten, die zum Stichtag bereits veröffentlicht waren")
+    parser.add_argument("--quarterly", action="store_true",
+                        help="zusätzlich zu jedem Quartalsende Portfolios aus TTM-Kennzahlen bilden und simulieren")
+    args = parser.parse_args()
+
+    # Vor dem Start der Worker laden: sie erben Speicher, Kennzahlen und Rohdaten per fork
+    store = get_store()
+    symbol_change = get_symbol_change()
+    sp500_index = get_sp500_index()
     years = range(2011, 2025)
-
-    ranking_results = {}
     for y in years:
-        df_div_yield = analyze_dividend_yield_rank(y)
-        df_div_cagr  = analyze_dividend_cagr_rank(y)
-        df_eps       = analyze_eps_growth_rank(y, progression_years=5)
-        df_rev       = analyze_revenue_cagr_rank(y)
-        df_merged    = merge_and_rank(y)
-        ranking_results[y] = {
-            "dividend_yield": df_div_yield.to_dict(orient="records"),
-            "dividend_cagr":  df_div_cagr.to_dict(orient="records"),
-            "eps_growth":     df_eps.to_dict(orient="records"),
-            "revenue_cagr":   df_rev.to_dict(orient="records"),
-            "merged_rank":    df_merged.to_dict(orient="records")
-        }
+        year_metrics(y, point_in_time=args.point_in_time)
+
+    ranking_results = dict(zip(years, run_parallel(partial(rank_year, point_in_time=args.point_in_time), years, args.jobs)))
 
     with open("ranking_analysis/results/ranking_results.json", "w", encoding="utf-8") as f:
         json.dump(ranking_results, f, indent=2)
     print("Ranking-Daten wurden in 'ranking_results.json' gespeichert.")
 
 
-    top_portfolios = extract_top()
-    simulation_results = {}
-    for holding_years in range(1, 11):
-        df_sim = simulate_returns(
-            price_data=price_data,
-            dividend_data=dividend_data,
-            portfolios_by_start_year=top_portfolios,
-            symbol_changes=symbol_change,
-            max_tickers=20,
-            holding_years=holding_years
-        )
-        simulation_results[holding_years] = df_sim.to_dict(orient="records")
-
+    top_portfolios = extract_top(ranking_results)
+    holding_periods = range(1, 11)
+    # Alle Haltedauern in einem Durchlauf
+    engine = (NavEngine if args.risk else SimulationEngine)(store, get_symbol_index(), drip=args.drip)
+    simulations = engine.simulate(top_portfolios, holding_periods, max_tickers=20)
+    simulation_results = {holding_years: simulations[holding_years].to_dict(orient="records")
+                          for holding_years in holding_periods}
     with open("ranking_analysis/results/simulation_results.json", "w", encoding="utf-8") as f:
         json.dump(simulation_results, f, indent=2)
     print("Simulationsdaten wurden in 'simulation_results.json' gespeichert.")
 
 
+    # Index einmal für alle Haltedauern simulieren, Strategie-Simulation wiederverwenden
+    index_simulations = simulate_index_horizons(sp500_index, holding_periods, total_return=args.drip)
+    if args.risk:
+        index_simulations = add_index_risk(index_simulations, sp500_index, total_return=args.drip)
     comparison_results = {}
-    for holding_years in range(1, 11):
+    for holding_years in holding_periods:
         df_compare = compare_simulations(
-            price_data=price_data,
-            dividend_data=dividend_data,
+            store=store,
             portfolios_by_start_year=top_portfolios,
             symbol_changes=symbol_change,
             sp500_index=sp500_index,
             max_tickers=20,
-            holding_years=holding_years
+            holding_years=holding_years,
+            strategy_df=simulations[holding_years],
+            index_df=index_simulations[holding_years]
         )
         comparison_results[holding_years] = df_compare.to_dict(orient="records")
-
     with open("ranking_analysis/results/comparison_results.json", "w", encoding="utf-8") as f:
         json.dump(comparison_results, f, indent=2)
     print("Vergleichsdaten wurden in 'comparison_results.json' gespeichert.")
 
+    # Alpha gegen beide Vergleichsmaßstäbe: S&P 500 und gleich gewichtete S&P-500-Unternehmen (dieselbe Engine)
+    benchmark_results = {"Index": index_results_by_horizon(sp500_index, holding_periods, total_return=args.drip),
+                         "EqualWeight": EqualWeightBenchmark(engine, years, holding_periods).results_by_horizon()}
+    alpha_results = {holding_years: alpha_table(simulations[holding_years], {name: results[holding_years] for name, results in benchmark_results.items()})
+                     .to_dict(orient="records") for holding_years in holding_periods}
+    with open("ranking_analysis/results/alpha_results.json", "w", encoding="utf-8") as f:
+        json.dump(alpha_results, f, indent=2)
+    print("Alpha-Vergleich wurde in 'alpha_results.json' gespeichert.")
+
+    if args.significance:
+        test = SignificanceTest(engine, top_portfolios.keys())
+        significance = test.run(engine.simulate_rows(top_portfolios, holding_periods, max_tickers=20),
+                                index_results_by_horizon(sp500_index, holding_periods, total_return=args.drip), replications=args.significance)
+        with open("ranking_analysis/results/significance_results.json", "w", encoding="utf-8") as f:
+            json.dump(significance.to_dict(orient="records"), f, indent=2)
+        print("Signifikanztests wurden in 'significance_results.json' gespeichert.")
+
+    if args.rolling:
+        rolling = RollingSimulation(engine).simulate_rows(top_portfolios, args.entry_dates, holding_periods, max_tickers=20)
+        # RollingSimulation rechnet ohne Wiederanlage: auch mit --drip gegen den Kursindex vergleichen
+        summary = summarize_rolling(rolling, index_rolling_returns(sp500_index, rolling, total_return=False))
+        with open("ranking_analysis/results/rolling_results.json", "w", encoding="utf-8") as f:
+            json.dump(rolling, f, indent=2)
+        with open("ranking_analysis/results/rolling_summary.json", "w", encoding="utf-8") as f:
+            json.dump(summary.to_dict(orient="records"), f, indent=2)
+        print("Rollierende Simulation in 'rolling_results.json' und 'rolling_summary.json' gespeichert.")
+
+    if args.quarterly:
+        quarter_ends = days_to_str(quarter_end_calendar(min(years), max(years)))
+        quarterly_portfolios = extract_quarterly_top(quarter_ends, point_in_time=args.point_in_time)
+        quarterly = RollingSimulation(engine).simulate_formations(quarterly_portfolios, holding_periods, max_tickers=20)
+        # Wie --rolling ohne Wiederanlage: Vergleich mit dem Kursindex
+        summary = summarize_rolling(quarterly, index_rolling_returns(sp500_index, quarterly, total_return=False))
+        with open("ranking_analysis/results/quarterly_results.json", "w", encoding="utf-8") as f:
+            json.dump(quarterly, f, indent=2)
+        with open("ranking_analysis/results/quarterly_summary.json", "w", encoding="utf-8") as f:
+            json.dump(summary.to_dict(orient="records"), f, indent=2)
+        print("Quartalsweise Portfoliobildung in 'quarterly_results.json' und 'quarterly_summary.json' gespeichert.")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,51 @@
+#Copyright (C) 2025 Akram
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_store import get_store
+from core.simulation import SimulationEngine, index_results_by_horizon, summarize_rows
+from ranking_analysis import extract_top, get_sp500_index, get_symbol_index
+
+RESULTS_PATH = "ranking_analysis/results/size_sweep.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ranking-Strategie für alle Portfoliogrößen 1..N in einem Durchlauf auswerten")
+    parser.add_argument("--pool", type=int, default=30, help="Länge der Rangliste je Jahr (wie extract_top)")
+    parser.add_argument("--max-size", type=int, default=None, help="größte Portfoliogröße (Standard: --pool)")
+    parser.add_argument("--output", default=RESULTS_PATH, help="Ergebnistabelle (CSV)")
+    parser.add_argument("--point-in-time", action="store_true",
+                        help="EPS und Umsatz nur aus Berichten, die zum Stichtag bereits veröffentlicht waren")
+    args = parser.parse_args()
+    max_size = args.max_size or args.pool
+    horizons = range(1, 11)
+
+    store = get_store()
+    started = time.perf_counter()
+    engine = SimulationEngine(store, get_symbol_index())
+    simulations = engine.simulate_sizes(extract_top(top_n=args.pool, point_in_time=args.point_in_time), max_size, horizons)
+    index_results = index_results_by_horizon(get_sp500_index(), horizons)
+
+    results = []
+    for holding_years, frame in simulations.items():
+        if frame.empty:
+            continue
+        for size, size_frame in frame.groupby("PortfolioSize"):
+            results.append({"PortfolioSize": size, "HoldingYears": holding_years,
+                            **summarize_rows(size_frame.to_dict(orient="records"), index_results[holding_years])})
+    results = pd.DataFrame(results)
+    results.to_csv(args.output, index=False)
+
+    print(f"Portfoliogrößen 1..{max_size} in {time.perf_counter() - started:.1f} s ausgewertet, "
+          f"Ergebnisse in '{args.output}' gespeichert.")
+    print(results[results["HoldingYears"] == 5].to_string(index=False))
+
+if __name__ == "__main__":
+    main()
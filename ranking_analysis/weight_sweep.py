@@ -0,0 +1,43 @@
+#Copyright (C) 2025 Akram
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_store import get_store
+from core.rank_weights import RankMatrix, evaluate_weightings, weight_grid
+from core.simulation import SimulationEngine
+from ranking_analysis import get_sp500_index, get_symbol_index
+
+RESULTS_PATH = "ranking_analysis/results/weight_sweep.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ranking-Strategie für viele Gewichtungen und Portfoliogrößen auswerten")
+    parser.add_argument("--weight-values", type=float, nargs="+", default=[0, 1, 2],
+                        help="mögliche Gewichte je Kennzahl; ausgewertet werden alle Kombinationen der vier Kennzahlen")
+    parser.add_argument("--top-n", type=int, nargs="+", default=[30], help="Anzahl der Ticker je Rangliste")
+    parser.add_argument("--max-tickers", type=int, default=20, help="maximale Anzahl Ticker je Portfolio")
+    parser.add_argument("--output", default=RESULTS_PATH, help="Ergebnistabelle (CSV)")
+    parser.add_argument("--point-in-time", action="store_true",
+                        help="EPS und Umsatz nur aus Berichten, die zum Stichtag bereits veröffentlicht waren")
+    args = parser.parse_args()
+
+    store = get_store()
+    started = time.perf_counter()
+    weights = weight_grid(args.weight_values)
+    engine = SimulationEngine(store, get_symbol_index())
+    results = evaluate_weightings(RankMatrix(point_in_time=args.point_in_time), engine, get_sp500_index(), weights, args.top_n, max_tickers=args.max_tickers)
+    results.to_csv(args.output, index=False)
+
+    print(f"{len(weights)} Gewichtungen x {len(args.top_n)} Portfoliogrößen in {time.perf_counter() - started:.1f} s "
+          f"ausgewertet, Ergebnisse in '{args.output}' gespeichert.")
+    best = results[results["HoldingYears"] == 5].sort_values("MeanCAGR (%)", ascending=False)
+    print("\nBeste Gewichtungen (Haltedauer 5 Jahre, nach mittlerer CAGR):")
+    print(best.head(10).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#Copyright (C) 2025 Akram
+
+import json
+import math
+import os
+import runpy
+import shutil
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DATA_DIR = os.path.join(REPO_DIR, "tests", "data")
+EXPECTED_DIR = os.path.join(REPO_DIR, "tests", "expected")
+RESULT_DIRS = ("filtering_analysis/results", "ranking_analysis/results")
+
+sys.path.append(REPO_DIR)
+
+from core.benchmark import get_benchmark
+from core.data_store import get_store
+from core.metric_cache import metric_cache
+
+
+def reset_caches():
+    """ Leert die prozessweiten Caches, die Pfade relativ zum aktuellen Verzeichnis auflösen"""
+    get_store.cache_clear()
+    get_benchmark.cache_clear()
+    metric_cache.invalidate()
+
+
+def make_workdir(path):
+    """ Arbeitsverzeichnis mit einer Kopie des Mini-Datensatzes (tests/data) und leeren Ergebnisordnern"""
+    shutil.copytree(TEST_DATA_DIR, os.path.join(path, "data"))
+    for results_dir in RESULT_DIRS:
+        os.makedirs(os.path.join(path, results_dir), exist_ok=True)
+    return str(path)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """ Frisches Arbeitsverzeichnis je Test, die Analysen lesen data/ relativ zum aktuellen Verzeichnis"""
+    make_workdir(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    reset_caches()
+    yield str(tmp_path)
+    reset_caches()
+
+
+def run_analysis(script, *args):
+    """
+    Führt ein Skript wie 'python <script> <args>' im aktuellen Verzeichnis aus: sein Verzeichnis steht
+    vorn in sys.path, dort importierte Module (z. B. filtering_analysis) werden danach wieder entfernt.
+    """
+    path = os.path.join(REPO_DIR, script)
+    script_dir = os.path.dirname(path)
+    argv, modules = sys.argv, set(sys.modules)
+    sys.argv = [script, *args]
+    sys.path.insert(0, script_dir)
+    try:
+        return runpy.run_path(path, run_name="__main__")
+    finally:
+        sys.argv = argv
+        sys.path.remove(script_dir)
+        for name in set(sys.modules) - modules:
+            if os.path.dirname(getattr(sys.modules[name], "__file__", None) or "") == script_dir:
+                del sys.modules[name]
+
+
+@pytest.fixture(scope="session")
+def analysis_results(tmp_path_factory):
+    """ Beide Analysen einmal auf dem Mini-Datensatz; Dateiname -> gelesenes Ergebnis-JSON"""
+    path = make_workdir(tmp_path_factory.mktemp("analyses"))
+    cwd = os.getcwd()
+    os.chdir(path)
+    reset_caches()
+    try:
+        run_analysis("filtering_analysis/filtering_analysis.py")
+        run_analysis("ranking_analysis/ranking_analysis.py")
+    finally:
+        reset_caches()
+        os.chdir(cwd)
+    results = {}
+    for results_dir in RESULT_DIRS:
+        for name in os.listdir(os.path.join(path, results_dir)):
+            results[name] = load_json(os.path.join(path, results_dir, name))
+    return results
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_expected(name):
+    return load_json(os.path.join(EXPECTED_DIR, name))
+
+def assert_same(actual, expected, path="", rel=1e-9):
+    """ Vergleicht verschachtelte JSON-Werte; Gleitkommazahlen bis auf Rundungsfehler, NaN == NaN"""
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and actual.keys() == expected.keys(), path
+        for key in expected:
+            assert_same(actual[key], expected[key], f"{path}/{key}", rel)
+    elif isinstance(expected, list):
+        assert isinstance(actual, list) and len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            assert_same(a, e, f"{path}[{i}]", rel)
+    elif isinstance(expected, float) and not isinstance(actual, str):
+        assert actual is not None, path
+        assert (math.isnan(actual) and math.isnan(expected)) or math.isclose(actual, expected, rel_tol=rel, abs_tol=1e-12), \
+            f"{path}: {actual} != {expected}"
+    else:
+        assert actual == expected, path
@@ -0,0 +1,26 @@
+#Copyright (C) 2025 Akram
+
+import pytest
+
+from conftest import assert_same, load_expected
+
+RESULT_FILES = [
+    "filtering_results.json", "filtering_simulation.json", "filtering_comparison.json",
+    "ranking_results.json", "simulation_results.json", "comparison_results.json",
+]
+
+
+@pytest.mark.parametrize("name", RESULT_FILES)
+def test_results_match_expected(analysis_results, name):
+    # tests/expected: Ergebnisse der Analysen vor der Umstellung auf den Datenspeicher,
+    # berechnet ohne die doppelte Zeile in sp500_2015.csv
+    assert_same(analysis_results[name], load_expected(name))
+
+
+def test_duplicate_index_rows_count_once(analysis_results):
+    # T06 steht in sp500_2015.csv doppelt, ausgewertet wird nur die erste Zeile
+    ranking = analysis_results["ranking_results.json"]["2015"]
+    assert [row["Ticker"] for row in ranking["dividend_yield"]].count("T06") == 1
+    filtering = analysis_results["filtering_results.json"]["2015"]
+    assert [row["Ticker"] for row in filtering["dividend_yield"]].count("T06") == 1
+    assert [row["Ticker"] for row in filtering["merged_filtering"]].count("T06") == 1
@@ -0,0 +1,58 @@
+#Copyright (C) 2025 Akram
+
+import os
+
+import numpy as np
+import pytest
+
+from conftest import load_json
+from core.benchmark import get_benchmark
+from core.data_store import str_to_day
+
+
+def reference_year_end_totals(index_data, dividend_data):
+    """ Jahr -> Gesamtrendite-Indexwert am letzten Handelstag, Dividende für Dividende aus den Rohdaten"""
+    prices = sorted((r["date"], r["adjClose"]) for r in index_data["historical"])
+    dividends = sorted((r["date"], r["adjDividend"]) for r in dividend_data["historical"])
+    totals = {}
+    for year in sorted({date[:4] for date, _ in prices}):
+        date, price = max(p for p in prices if p[0].startswith(year))
+        shares = 1.0
+        for dividend_date, amount in dividends:
+            before = [p for p in prices if p[0] <= dividend_date]
+            if dividend_date <= date and before:
+                shares *= 1 + amount / before[-1][1]
+        totals[int(year)] = price * shares
+    return totals
+
+
+def test_total_return_series_matches_reinvestment_loop(workdir):
+    index_data, dividend_data = load_json("data/sp500_index.json"), load_json("data/sp500_dividends.json")
+    benchmark = get_benchmark()
+    assert get_benchmark() is benchmark
+    totals = reference_year_end_totals(index_data, dividend_data)
+    years = sorted(totals)
+    np.testing.assert_allclose(benchmark.year_end_values(years, total_return=True), [totals[y] for y in years], rtol=1e-12)
+    for holding_years, frame in benchmark.simulate([1, 5], total_return=True).items():
+        for row in frame.to_dict(orient="records"):
+            start, end = totals[row["StartYear"]], totals[row["EndYear"]]
+            assert row["Return (%)"] == round((end - start) / start * 100, 2)
+            assert row["Return (%)"] > benchmark.returns(row["StartYear"], holding_years) - 0.01
+
+
+def test_values_in_month_match_raw_records(workdir):
+    index_data = load_json("data/sp500_index.json")
+    benchmark = get_benchmark()
+    dates = ["2010-01-31", "2012-02-29", "2015-06-15", "2018-12-31", "2024-12-31", "2030-01-31"]
+    values = benchmark.values_in_month([str_to_day(date) for date in dates])
+    for date, value in zip(dates, values):
+        records = [r for r in index_data["historical"] if r["date"] <= date and r["date"][:7] == date[:7]]
+        expected = max(records, key=lambda r: r["date"])["adjClose"] if records else np.nan
+        np.testing.assert_equal(value, expected, err_msg=date)
+
+
+def test_missing_dividend_file_gives_price_index(workdir):
+    os.remove("data/sp500_dividends.json")
+    benchmark = get_benchmark()
+    np.testing.assert_array_equal(benchmark.daily_values(total_return=True), benchmark.daily_values())
+    assert benchmark.returns(2012, 5, total_return=True) == pytest.approx(benchmark.returns(2012, 5))
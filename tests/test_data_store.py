@@ -0,0 +1,45 @@
+#Copyright (C) 2025 Akram
+
+import json
+import os
+
+import numpy as np
+
+from conftest import load_json
+from core.data_store import COLUMNS, SOURCE_FILES, days_to_years, get_records, load_store
+
+
+def assert_column(actual, expected):
+    np.testing.assert_array_equal(np.asarray(actual), np.asarray(expected, dtype=np.asarray(actual).dtype))
+
+
+def test_store_rows_match_raw_json(workdir):
+    store = load_store()
+    raw = {table: load_json(os.path.join("data", filename)) for table, filename in SOURCE_FILES.items()}
+    assert store.tickers == sorted(set().union(*(data.keys() for data in raw.values())))
+
+    for table, columns in COLUMNS.items():
+        for ticker in store.tickers:
+            rows = getattr(store, table).rows(store.ticker_id(ticker))
+            records = get_records(table, raw[table], ticker)
+            if records is None:
+                assert rows is None, (table, ticker)
+                continue
+            for name, (_, getter) in columns.items():
+                assert_column(rows[name], [getter(record) for record in records])
+            assert_column(rows["year"], days_to_years([columns["day"][1](record) for record in records]))
+            assert (rows["ticker_id"] == store.ticker_id(ticker)).all()
+
+
+def test_store_is_recompiled_when_raw_data_changes(workdir):
+    store = load_store()
+    ticker_id = store.ticker_id("T01")
+    assert store.prices.rows(ticker_id)["adj_close"][0] != 12345.5
+
+    path = os.path.join("data", SOURCE_FILES["prices"])
+    raw = load_json(path)
+    raw["T01"]["historical"][0]["adjClose"] = 12345.5
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(raw, f)
+
+    assert load_store().prices.rows(ticker_id)["adj_close"][0] == 12345.5
@@ -0,0 +1,61 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+import pytest
+
+from core.metrics import eps_progression
+
+
+def valid_growth(eps_list, threshold=25.0):
+    """ Bisherige Prüfung je Ticker (verschachtelte Funktion in analyze_eps_growth)"""
+    allowed_down = False
+    growth_rates = []
+    max_eps = eps_list[0]
+    i = 0
+    while i < len(eps_list) - 1:
+        prev = eps_list[i]
+        curr = eps_list[i+1]
+        if prev <= 0:
+            return False, []
+        growth = ((curr - prev) / prev) * 100
+        if growth >= threshold:
+            growth_rates.append(round(growth, 2))
+            max_eps = max(max_eps, curr)
+            i += 1
+        elif growth < 0 and not allowed_down and (i+2 < len(eps_list)):
+            next_val = eps_list[i+2]
+            if next_val > max_eps:
+                growth_rates.append(round(growth, 2))
+                recovery_growth = ((next_val - curr) / curr) * 100
+                growth_rates.append(round(recovery_growth, 2))
+                max_eps = next_val
+                allowed_down = True
+                i += 2
+            else:
+                return False, []
+        else:
+            return False, []
+    if len(growth_rates) < (len(eps_list) - 1):
+        return False, []
+    return True, growth_rates
+
+
+@pytest.mark.parametrize("years", [2, 3, 5, 8])
+@pytest.mark.parametrize("threshold", [1.0, 25.0])
+def test_matches_previous_function(years, threshold):
+    rng = np.random.default_rng(years)
+    # kleine ganzzahlige Stufen erzeugen viele Gleichstände, Rückgänge, Nullen und negative Werte
+    eps = np.round(rng.normal(0.8, 1.0, (20000, years)).cumsum(axis=1), 1)
+    valid, rates = eps_progression(eps, threshold)
+    for row, row_valid, row_rates in zip(eps.tolist(), valid.tolist(), rates.tolist()):
+        try:
+            expected_valid, expected_rates = valid_growth(row, threshold)
+        except ZeroDivisionError:
+            # Erholung nach einem Rückgang auf genau 0: bisher ein Absturz, jetzt ungültig
+            assert not row_valid
+            continue
+        assert row_valid == expected_valid, row
+        if row_valid:
+            assert row_rates == expected_rates, row
+        else:
+            assert np.isnan(row_rates).all()
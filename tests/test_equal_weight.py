@@ -0,0 +1,59 @@
+#Copyright (C) 2025 Akram
+
+import csv
+
+import numpy as np
+import pandas as pd
+
+from conftest import load_json
+from core.benchmark import EqualWeightBenchmark
+from core.data_store import load_store
+from core.simulation import SimulationEngine, alpha_table
+from test_simulation import reference_simulation
+
+
+def csv_tickers(year):
+    """ Ticker der S&P-500-CSV eines Jahres in Dateireihenfolge, doppelte Zeilen nur einmal"""
+    with open(f"data/s&p500/sp500_{year}.csv", "r", encoding="utf-8") as f:
+        return list(dict.fromkeys(row["Ticker"] for row in csv.DictReader(f)))
+
+
+def test_equal_weight_rows_match_reference_loop(workdir):
+    raw = (load_json("data/historical_price_full.json"), load_json("data/stock_dividend.json"),
+           load_json("data/symbol_change.json"))
+    years = range(2011, 2025)
+    benchmark = EqualWeightBenchmark(SimulationEngine(load_store(), raw[2]), years, [1, 5])
+    portfolios = {year: csv_tickers(year) for year in years}
+    assert benchmark.portfolios == portfolios
+    for holding_years, frame in benchmark.simulate().items():
+        expected = reference_simulation(raw, portfolios, holding_years, max_tickers=len(raw[0]) + 100)
+        assert frame["StartYear"].tolist() == [row["StartYear"] for row in expected]
+        assert frame["Return (%)"].tolist() == [row["TotalReturn (%)"] for row in expected]
+        assert frame["IncludedTickersCount"].tolist() == [row["IncludedTickersCount"] for row in expected]
+        results = benchmark.results_by_horizon()[holding_years]
+        assert results == {(row["StartYear"], row["EndYear"]): (row["TotalReturn (%)"], row["TotalCAGR (%)"])
+                           for row in expected if row["TotalReturn (%)"] is not None}
+
+
+def test_alpha_is_cagr_difference():
+    strategy = pd.DataFrame([{"StartYear": 2012, "EndYear": 2015, "TotalReturn (%)": 30.0, "TotalCAGR (%)": 9.14},
+                             {"StartYear": 2013, "EndYear": 2016, "TotalReturn (%)": np.nan, "TotalCAGR (%)": np.nan}])
+    benchmarks = {"Index": {(2012, 2015): (20.0, 6.27), (2013, 2016): (10.0, 3.23)}, "EqualWeight": {}}
+    rows = alpha_table(strategy, benchmarks).to_dict(orient="records")
+    assert rows[0]["Alpha_Index (%)"] == 2.87 and rows[0]["Index_CAGR (%)"] == 6.27
+    # DataFrame-Spalten speichern None als NaN
+    assert pd.isna(rows[0]["Alpha_EqualWeight (%)"]) and pd.isna(rows[0]["EqualWeight_Return (%)"])
+    assert pd.isna(rows[1]["Alpha_Index (%)"])
+
+
+def test_alpha_results_follow_simulation(analysis_results):
+    simulation = analysis_results["simulation_results.json"]
+    comparison = analysis_results["comparison_results.json"]
+    for holding_years, rows in analysis_results["alpha_results.json"].items():
+        index = {(row["StartYear"], row["EndYear"]): row for row in comparison[holding_years]}
+        assert len(rows) == len(simulation[holding_years])
+        for row, strategy in zip(rows, simulation[holding_years]):
+            assert row["Strategy_TotalCAGR (%)"] == strategy["TotalCAGR (%)"]
+            compared = index.get((row["StartYear"], row["EndYear"]))
+            if compared is not None and row["Alpha_Index (%)"] is not None:
+                assert row["Alpha_Index (%)"] == round(strategy["TotalCAGR (%)"] - compared["Index_CAGR (%)"], 2)
@@ -0,0 +1,25 @@
+#Copyright (C) 2025 Akram
+
+import os
+import runpy
+
+import pytest
+
+from conftest import REPO_DIR
+from core.data_store import get_store
+
+
+@pytest.mark.parametrize("script", ["filtering_analysis/filtering_analysis.py", "ranking_analysis/ranking_analysis.py"])
+def test_import_does_not_load_data(tmp_path, monkeypatch, script):
+    # ohne data/ im Arbeitsverzeichnis schlägt jeder Zugriff auf die Daten fehl
+    monkeypatch.chdir(tmp_path)
+    get_store.cache_clear()
+    module = runpy.run_path(os.path.join(REPO_DIR, script), run_name="analysis")
+    assert get_store.cache_info().currsize == 0
+    assert "main" in module
+    with pytest.raises(FileNotFoundError):
+        get_store()
+
+
+def test_get_store_returns_one_instance(workdir):
+    assert get_store() is get_store()
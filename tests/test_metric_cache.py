@@ -0,0 +1,48 @@
+#Copyright (C) 2025 Akram
+
+import json
+
+import pandas as pd
+
+from core.data_store import get_store
+from core.metric_cache import invalidate_dataset, memoize_metric, metric_cache
+from core.metrics import compute_metrics, year_metrics
+
+
+def test_results_are_computed_once_per_year_and_parameters(workdir):
+    calls = []
+
+    @memoize_metric("test_metric")
+    def metric(target_year, factor=2):
+        calls.append((target_year, factor))
+        return target_year * factor
+
+    assert metric(2015) == metric(2015) == metric(2015, factor=2) == metric(target_year=2015) == 4030
+    assert metric(2015, 3) == 6045
+    assert metric(2016) == 4032
+    assert calls == [(2015, 2), (2015, 3), (2016, 2)]
+
+
+def test_changed_dataset_is_recomputed(workdir):
+    before = year_metrics(2015)
+    assert year_metrics(2015) is before
+
+    with open("data/stock_dividend.json", "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    for record in raw["T01"]["historical"]:
+        record["adjDividend"] *= 2
+    with open("data/stock_dividend.json", "w", encoding="utf-8") as f:
+        json.dump(raw, f)
+
+    invalidate_dataset()
+    after = year_metrics(2015)
+    t01 = lambda df: df[df["Ticker"] == "T01"]["DividendYield"].iloc[0]
+    assert t01(after) == 2 * t01(before)
+
+
+def test_year_metrics_is_a_slice_of_all_metrics(workdir):
+    for year in (2011, 2018, 2024):
+        pd.testing.assert_frame_equal(year_metrics(year), compute_metrics(get_store(), [year]))
+    misses = metric_cache.misses
+    year_metrics(2018)
+    assert metric_cache.misses == misses
@@ -0,0 +1,58 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+
+from conftest import load_json
+from core.data_store import load_store
+from core.metrics import compute_metrics, growth_rate, load_universe
+
+
+def cagr(end, start, years):
+    if end is None or start is None or end <= 0 or start <= 0:
+        return np.nan
+    return ((end / start) ** (1 / years) - 1) * 100
+
+
+def test_metrics_match_record_loops(workdir):
+    store = load_store()
+    prices = load_json("data/historical_price_full.json")
+    dividends = load_json("data/stock_dividend.json")
+    incomes = load_json("data/income_statement_annual.json")
+
+    def dividend_sum(ticker, year):
+        total = 0.0
+        for record in dividends.get(ticker, {"historical": []})["historical"]:
+            if record["date"].startswith(str(year)):
+                total += record["adjDividend"]
+        return total
+
+    def last_value(ticker, field, year, by_calendar_year=False):
+        value = None
+        for record in incomes.get(ticker, []):
+            record_year = int(record["calendarYear"]) if by_calendar_year else int(record["date"][:4])
+            if record_year == year and record[field] is not None:
+                value = record[field]
+        return value
+
+    metrics = compute_metrics(store, range(2011, 2025))
+    assert len(metrics) == len(load_universe(range(2011, 2025)))
+    for row in metrics.itertuples():
+        ticker, year = row.Ticker, row.Year
+        closes = [r for r in prices.get(ticker, {"historical": []})["historical"] if r["date"].startswith(str(year))]
+        close = max(closes, key=lambda r: r["date"])["adjClose"] if closes else None
+        total = dividend_sum(ticker, year)
+        expected_yield = total / close * 100 if total != 0 and close else np.nan
+        np.testing.assert_equal(row.DividendYield, expected_yield, err_msg=f"{ticker} {year}")
+        np.testing.assert_equal(row.DividendCAGR, cagr(total, dividend_sum(ticker, year - 10), 10))
+        np.testing.assert_equal(row.EPSGrowth, cagr(last_value(ticker, "eps", year, True),
+                                                    last_value(ticker, "eps", year - 4, True), 4))
+        np.testing.assert_equal(row.RevenueCAGR, cagr(last_value(ticker, "revenue", year),
+                                                      last_value(ticker, "revenue", year - 10), 10))
+
+
+def test_growth_rate_uses_python_pow():
+    rng = np.random.default_rng(0)
+    end, start = rng.uniform(0.1, 10, 1000), rng.uniform(0.1, 10, 1000)
+    expected = [((e / s) ** (1 / 7) - 1) * 100 for e, s in zip(end.tolist(), start.tolist())]
+    np.testing.assert_array_equal(growth_rate(end, start, 7), expected)
+    assert np.isnan(growth_rate([1.0, -1.0], [0.0, 1.0], 5)).all()
@@ -0,0 +1,97 @@
+#Copyright (C) 2025 Akram
+
+import math
+
+import numpy as np
+import pytest
+
+from conftest import load_json
+from core.data_store import days_to_years, load_store, str_to_day
+from core.nav import TRADING_DAYS, NavEngine, risk_fields, risk_metrics
+
+
+def reference_risk(nav):
+    """ Volatilität, Drawdown und Sharpe eines Verlaufs Tag für Tag (NaN am Ende wird ignoriert)"""
+    values = [value for value in nav if not math.isnan(value)]
+    daily = [b / a - 1 for a, b in zip(values, values[1:])]
+    volatility = float(np.std(daily, ddof=1)) * math.sqrt(TRADING_DAYS) if len(daily) > 1 else math.nan
+    mean = sum(daily) / len(daily) * TRADING_DAYS if daily else math.nan
+    drawdown, peak = 0.0, -math.inf
+    for value in values:
+        peak = max(peak, value)
+        drawdown = min(drawdown, value / peak - 1)
+    sharpe = mean / volatility if volatility > 0 else math.nan
+    return volatility * 100, drawdown * 100 if values else math.nan, sharpe
+
+
+def test_risk_metrics_match_daily_loops():
+    rng = np.random.default_rng(19)
+    nav = np.cumprod(1 + rng.normal(0, 0.02, (40, 60)), axis=1)
+    for i, length in enumerate(rng.integers(0, 60, 40)):
+        nav[i, length:] = np.nan
+    for row, *metrics in zip(nav, *risk_metrics(nav)):
+        for actual, expected in zip(metrics, reference_risk(row)):
+            assert actual == pytest.approx(expected, rel=1e-9, nan_ok=True)
+
+
+def test_constant_curve_has_no_sharpe():
+    volatility, drawdown, sharpe = risk_metrics(np.ones(10))
+    assert (volatility[0], drawdown[0]) == (0.0, 0.0) and np.isnan(sharpe[0])
+    assert risk_fields(np.nan, -12.345, np.inf) == {"Volatility (%)": None, "MaxDrawdown (%)": -12.35, "Sharpe": None}
+
+
+def reference_curve(raw, calendar, ticker, start_year, last_year):
+    """
+    Tagesverlauf je investierter Einheit direkt aus den Rohdaten: letzter Kurs des im jeweiligen Jahr
+    aktiven Symbols, aufgefüllt mit dem zuletzt bekannten Kurs, geteilt durch den Kurs am Starttag.
+    """
+    prices, changes = raw
+    mapping = {c["oldSymbol"]: (c["date"], c["newSymbol"]) for c in changes}
+    segments, date, symbol = [(0, ticker)], "", ticker
+    while symbol in mapping and mapping[symbol][0] > date:
+        date, symbol = mapping[symbol]
+        segments.append((int(date[:4]), symbol))
+
+    years = days_to_years(calendar)
+    first = np.flatnonzero(years == start_year)[-1]
+    last = np.flatnonzero(years == last_year)[-1]
+    curve, price = [], math.nan
+    for day, year in zip(calendar[first:last + 1].tolist(), years[first:last + 1].tolist()):
+        active = [s for start, s in segments if start <= year][-1]
+        records = [r for r in prices.get(active, {"historical": []})["historical"] if str_to_day(r["date"]) <= day]
+        if records:
+            price = max(records, key=lambda r: r["date"])["adjClose"]
+        curve.append(price)
+    return np.array(curve) / curve[0]
+
+
+def test_ticker_curves_follow_raw_prices(workdir):
+    raw = (load_json("data/historical_price_full.json"), load_json("data/symbol_change.json"))
+    engine = NavEngine(load_store(), raw[1])
+    tickers = ["T01", "T07", "T12", "T14", "OLD", "MID", "ZZZ", "GONE"]
+    for start_year, last_year in [(2012, 2015), (2013, 2020), (2017, 2019)]:
+        curves = engine.ticker_curves(start_year, tickers, last_year)
+        for ticker, curve in zip(tickers, curves):
+            expected = reference_curve(raw, engine.matrix.calendar, ticker, start_year, last_year)
+            np.testing.assert_allclose(curve, expected, rtol=1e-12, err_msg=f"{ticker} {start_year}")
+
+
+def test_nav_rows_end_at_total_return(workdir):
+    raw = (load_json("data/historical_price_full.json"), load_json("data/symbol_change.json"))
+    engine = NavEngine(load_store(), raw[1])
+    calendar = engine.matrix.calendar
+    portfolios = {2012: ["T01", "T02", "OLD", "GONE"], 2014: ["T05", "T12", "MID", "ZZZ", "T14"], 2016: ["GONE"]}
+    results = engine.simulate(portfolios, horizons=[1, 4], max_tickers=3)
+    for holding_years, frame in results.items():
+        for row in frame.to_dict(orient="records"):
+            if not row["IncludedTickers"]:
+                assert row["Volatility (%)"] is None or np.isnan(row["Volatility (%)"])
+                continue
+            curves = [reference_curve(raw, calendar, ticker, row["StartYear"], row["EndYear"])
+                      for ticker in row["IncludedTickers"]]
+            nav = np.mean(curves, axis=0)
+            # gleich gewichtet ohne Umschichtung: der letzte Tageswert ist die Gesamtrendite
+            assert (nav[-1] - 1) * 100 == pytest.approx(row["TotalReturn (%)"], abs=0.005 + 1e-9)
+            expected = risk_fields(*reference_risk(nav))
+            for column, value in expected.items():
+                assert row[column] == pytest.approx(value, abs=0.01 + 1e-9), (holding_years, row["StartYear"], column)
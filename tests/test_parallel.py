@@ -0,0 +1,26 @@
+#Copyright (C) 2025 Akram
+
+import os
+
+from conftest import RESULT_DIRS, assert_same, load_json, run_analysis
+from core.parallel import run_parallel
+
+
+def square(x):
+    return x * x
+
+
+def test_run_parallel_keeps_input_order():
+    items = list(range(20))
+    assert run_parallel(square, items, jobs=4) == run_parallel(square, items, jobs=1) == [x * x for x in items]
+
+
+def test_jobs_give_the_serial_results(workdir, analysis_results):
+    run_analysis("filtering_analysis/filtering_analysis.py", "--jobs", "3")
+    run_analysis("ranking_analysis/ranking_analysis.py", "--jobs", "3")
+    names = []
+    for results_dir in RESULT_DIRS:
+        for name in os.listdir(results_dir):
+            assert_same(load_json(os.path.join(results_dir, name)), analysis_results[name], rel=0)
+            names.append(name)
+    assert sorted(names) == sorted(analysis_results)
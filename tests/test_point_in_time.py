@@ -0,0 +1,77 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+
+from conftest import load_json
+from core.data_store import NO_DAY, NO_YEAR, load_store, str_to_day
+from core.metrics import compute_metrics
+
+FIELDS = {"eps": lambda r: int(r["calendarYear"]), "revenue": lambda r: int(r["date"][:4])}
+
+
+def known_day(record):
+    """ Veröffentlichung wie filing_day, ohne beide Angaben das Periodenende"""
+    date = record.get("fillingDate") or (record.get("acceptedDate") or "")[:10] or record["date"]
+    return str_to_day(date)
+
+
+def reference_value(records, field, period, day):
+    """ (Wert, Periodenende) des letzten bis day veröffentlichten Berichts der Periode, Gleichstand -> Dateireihenfolge"""
+    best = None
+    for position, record in enumerate(records):
+        if record[field] is None or FIELDS[field](record) != period or known_day(record) > day:
+            continue
+        key = (known_day(record), position)
+        if best is None or key > best[0]:
+            best = (key, record)
+    return (np.nan, NO_DAY) if best is None else (best[1][field], str_to_day(best[1]["date"]))
+
+
+def reference_latest(records, field, day):
+    periods = [FIELDS[field](r) for r in records if r[field] is not None and known_day(r) <= day]
+    return max(periods) if periods else NO_YEAR
+
+
+def test_filing_index_matches_record_loops(workdir):
+    store = load_store()
+    raw = load_json("data/income_statement_annual.json")
+    index = store.income_as_of
+    tickers = sorted(raw) + ["GONE"]
+    ids = store.ticker_ids(tickers)
+    days = [str_to_day(d) for d in ("2010-12-31", "2013-02-20", "2016-12-31", "2017-03-01", "2020-06-30", "2025-12-31")]
+    for field in FIELDS:
+        for day in days:
+            latest = index.latest_period_as_of(field, ids, day)
+            for ticker, ticker_id, period in zip(tickers, ids, latest.tolist()):
+                assert period == reference_latest(raw.get(ticker, []), field, day), (field, ticker, day)
+            for period in range(2000, 2026):
+                values, period_days = index.value_as_of(field, ids, period, day)
+                for ticker, value, period_day in zip(tickers, values, period_days):
+                    expected = reference_value(raw.get(ticker, []), field, period, day)
+                    np.testing.assert_equal((value, period_day), expected, err_msg=f"{field} {ticker} {period} {day}")
+
+
+def test_restatement_is_used_from_its_filing_date(workdir):
+    # T03 veröffentlicht 2017-03-01 einen korrigierten Bericht für 2015
+    store = load_store()
+    raw = [r for r in load_json("data/income_statement_annual.json")["T03"] if r["date"] == "2015-12-31"]
+    original, restated = sorted(raw, key=known_day)
+    ticker_id = store.ticker_id("T03")
+    for date, record in (("2016-12-31", original), ("2017-02-28", original), ("2017-03-01", restated)):
+        value, _ = store.income_as_of.value_as_of("eps", ticker_id, 2015, str_to_day(date))
+        assert value == record["eps"], date
+
+
+def test_point_in_time_metrics_use_reports_known_at_year_end(workdir):
+    store = load_store()
+    raw = load_json("data/income_statement_annual.json")
+    metrics = compute_metrics(store, range(2012, 2025), point_in_time=True)
+    for row in metrics.itertuples():
+        records = raw.get(row.Ticker, [])
+        as_of = str_to_day(f"{row.Year}-12-31")
+        end_year = min(reference_latest(records, "eps", as_of), row.Year)
+        eps_end = reference_value(records, "eps", end_year, as_of)[0] if end_year != NO_YEAR else np.nan
+        eps_start = reference_value(records, "eps", end_year - 4, as_of)[0] if end_year != NO_YEAR else np.nan
+        np.testing.assert_equal((row.EPSEnd, row.EPSStart), (eps_end, eps_start), err_msg=f"{row.Ticker} {row.Year}")
+        # Berichte für das Zieljahr erscheinen erst im Folgejahr
+        assert end_year < row.Year or end_year == NO_YEAR
@@ -0,0 +1,163 @@
+#Copyright (C) 2025 Akram
+
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "prepare_data"))
+
+TICKERS = ["AAA", "BBB", "CCC"]
+
+
+class StubFMP:
+    """ Lokaler Ersatz für die FMP API: merkt sich jede Anfrage und die Zahl gleichzeitig offener Anfragen"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        self.failing = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, handler):
+        url = urlparse(handler.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        ticker = url.path.rsplit("/", 1)[-1]
+        with self.lock:
+            self.requests.append((time.monotonic(), url.path, params))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        if ticker in self.failing:
+            body, status = {}, 500
+        elif url.path.startswith("/income-statement/"):
+            body, status = [{"date": "2019-12-31", "period": "FY" if params.get("period") == "annual" else "Q4", "eps": 1.0}], 200
+        elif url.path.startswith("/historical-price-full/stock_"):
+            body, status = {"symbol": ticker, "historical": [{"date": "2019-06-03", "adjDividend": 0.5}]}, 200
+        else:
+            body, status = {"symbol": ticker, "historical": [{"date": params["to"], "adjClose": 10.0}]}, 200
+        with self.lock:
+            self.in_flight -= 1
+        payload = json.dumps(body).encode("utf-8")
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def requests_for(self, path_prefix):
+        return [params for _, path, params in self.requests if path.startswith(path_prefix)]
+
+
+@pytest.fixture
+def fetcher(tmp_path, monkeypatch):
+    # Das Modul legt beim Import seinen Datenordner relativ zum Arbeitsverzeichnis an
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module("prepare_financial_data")
+
+@pytest.fixture
+def stub():
+    server = StubFMP()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+def fetch(fetcher, stub, data_dir, **kwargs):
+    kwargs = {"max_in_flight": 4, "requests_per_second": 0, "end_date": "2020-01-10", **kwargs}
+    os.makedirs(data_dir, exist_ok=True)
+    fetcher.fetch_all_financial_data(tickers=TICKERS, base_url=stub.url, api_key="test", data_dir=str(data_dir), **kwargs)
+
+
+def test_max_in_flight_bounds_concurrent_requests(fetcher, stub, tmp_path):
+    stub.delay = 0.05
+    fetch(fetcher, stub, tmp_path / "out", max_in_flight=2)
+    assert len(stub.requests) == len(TICKERS) * len(fetcher.FINANCIAL_ENDPOINTS)
+    assert stub.max_in_flight == 2
+
+def test_rate_limit_spaces_requests(fetcher, stub, tmp_path):
+    requests_per_second = 20.0
+    fetch(fetcher, stub, tmp_path / "out", requests_per_second=requests_per_second)
+    times = sorted(t for t, _, _ in stub.requests)
+    # n Anfragen belegen mindestens n - 1 Intervalle (etwas Spielraum für Zeitmessung im Server)
+    assert times[-1] - times[0] >= 0.9 * (len(times) - 1) / requests_per_second
+
+def test_results_are_combined_per_endpoint(fetcher, stub, tmp_path):
+    fetch(fetcher, stub, tmp_path / "out", max_in_flight=3)
+    for name in fetcher.FINANCIAL_ENDPOINTS:
+        with open(tmp_path / "out" / f"{name}.json", "r", encoding="utf-8") as f:
+            combined = json.load(f)
+        assert list(combined) == TICKERS
+        assert all(combined[ticker] for ticker in TICKERS)
+
+def test_checkpoints_live_under_data_dir(fetcher, stub, tmp_path):
+    fetch(fetcher, stub, tmp_path / "out")
+    for name in fetcher.FINANCIAL_ENDPOINTS:
+        for ticker in TICKERS:
+            assert os.path.exists(tmp_path / "out" / "checkpoints" / name / f"{ticker}.json")
+    assert not os.path.exists(tmp_path / "data" / "s&p500" / "checkpoints")
+
+def test_resume_only_fetches_unfinished_tickers(fetcher, stub, tmp_path):
+    stub.failing = {"BBB"}
+    fetch(fetcher, stub, tmp_path / "out")
+    stub.failing = set()
+    stub.requests.clear()
+    fetch(fetcher, stub, tmp_path / "out")
+    assert {path.rsplit("/", 1)[-1] for _, path, _ in stub.requests} == {"BBB"}
+    assert len(stub.requests) == len(fetcher.FINANCIAL_ENDPOINTS)
+
+    with open(tmp_path / "out" / "historical_price_full.json", "r", encoding="utf-8") as f:
+        combined = json.load(f)
+    assert all(combined[ticker]["historical"][0]["date"] == "2020-01-10" for ticker in TICKERS)
+
+def test_incremental_requests_continue_after_last_record(fetcher, stub, tmp_path):
+    fetch(fetcher, stub, tmp_path / "out")
+    stub.requests.clear()
+    fetch(fetcher, stub, tmp_path / "out", end_date="2020-01-20")
+
+    assert all(params["from"] == "2020-01-11" and params["to"] == "2020-01-20"
+               for params in stub.requests_for("/historical-price-full/AAA") + stub.requests_for("/historical-price-full/BBB"))
+    assert all(params["from"] == "2019-06-04" for params in stub.requests_for("/historical-price-full/stock_dividend/"))
+    assert all(params["limit"] == "2" for params in stub.requests_for("/income-statement/") if params["period"] == "annual")
+    assert all(params["limit"] == "5" for params in stub.requests_for("/income-statement/") if params["period"] == "quarter")
+
+    # Kurse reichen bereits bis end_date: kein Kursabruf mit from > to
+    stub.requests.clear()
+    fetch(fetcher, stub, tmp_path / "out", end_date="2020-01-15")
+    assert len(stub.requests) == len(TICKERS) * (len(fetcher.FINANCIAL_ENDPOINTS) - 1)
+    assert all(not path.startswith("/historical-price-full/" + ticker) for _, path, _ in stub.requests for ticker in TICKERS)
+
+def test_interrupted_seeding_resumes(fetcher, tmp_path):
+    data_dir, checkpoint_dir = tmp_path / "out", tmp_path / "out" / "checkpoints"
+    os.makedirs(data_dir)
+    name = "stock_dividend"
+    combined = {ticker: {"historical": [{"date": "2019-06-03"}]} for ticker in TICKERS}
+    with open(data_dir / f"{name}.json", "w", encoding="utf-8") as f:
+        json.dump(combined, f)
+    # Abbruch nach dem ersten Ticker: Ordner existiert, Marker fehlt
+    os.makedirs(checkpoint_dir / name)
+    fetcher.save_checkpoint(str(checkpoint_dir), name, "AAA", {"refreshed_to": "2020-01-10", "last_date": "2019-06-03", "data": {}})
+
+    fetcher.seed_checkpoints(str(data_dir), str(checkpoint_dir), name)
+    assert fetcher.load_checkpoint(str(checkpoint_dir), name, "AAA")["refreshed_to"] == "2020-01-10"
+    assert all(fetcher.load_checkpoint(str(checkpoint_dir), name, ticker)["last_date"] == "2019-06-03" for ticker in TICKERS[1:])
+    assert os.path.exists(checkpoint_dir / name / fetcher.SEEDED_MARKER)
@@ -0,0 +1,43 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+
+from conftest import load_json
+from core.data_store import load_store, str_to_day
+
+
+def last_record(records, accept):
+    """ Datensatz mit dem spätesten Datum unter den akzeptierten, wie früher beim Durchsuchen der Rohdaten"""
+    best = None
+    for record in records:
+        if accept(record["date"]) and (best is None or record["date"] > best["date"]):
+            best = record
+    return best
+
+
+def test_last_close_of_year_matches_raw_records(workdir):
+    store = load_store()
+    raw = load_json("data/historical_price_full.json")
+    tickers = sorted(raw) + ["GONE"]
+    ids = store.ticker_ids(tickers)
+    for year in range(2009, 2026):
+        closes, days = store.price_matrix.last_close_of_year(ids, year)
+        for ticker, close, day in zip(tickers, closes, days):
+            record = last_record(raw.get(ticker, {"historical": []})["historical"], lambda d: d.startswith(str(year)))
+            if record is None:
+                assert np.isnan(close), (ticker, year)
+            else:
+                assert (close, day) == (record["adjClose"], str_to_day(record["date"])), (ticker, year)
+
+
+def test_close_on_or_before_matches_raw_records(workdir):
+    store = load_store()
+    raw = load_json("data/historical_price_full.json")
+    for date in ("2010-01-01", "2012-12-31", "2014-07-01", "2018-04-15", "2030-01-01"):
+        for ticker, entry in raw.items():
+            close, day = store.price_matrix.close_on_or_before(store.ticker_id(ticker), str_to_day(date))
+            record = last_record(entry["historical"], lambda d: d <= date)
+            if record is None:
+                assert np.isnan(close), (ticker, date)
+            else:
+                assert (float(close), int(day)) == (record["adjClose"], str_to_day(record["date"])), (ticker, date)
@@ -0,0 +1,72 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+import pytest
+
+from conftest import load_json, run_analysis
+from core.data_store import load_store, str_to_day
+from core.metrics import compute_ttm_metrics, quarter_metrics, year_metrics
+from core.quarterly_aggregates import quarter_as_of
+
+TICKERS = [f"T{i:02d}" for i in range(1, 15)] + ["OLD", "MID", "NEW", "GONE"]
+
+
+def quarter_index(date):
+    return (int(date[:4]) - 1970) * 4 + (int(date[5:7]) - 1) // 3
+
+
+def reference_ttm(records, field, quarter):
+    """ Summe der letzten vier Quartale bis einschließlich quarter, je Quartal gilt der letzte gültige Bericht"""
+    values = {}
+    for record in records:
+        if record[field] is not None:
+            values[quarter_index(record["date"])] = record[field]
+    window = [values.get(q) for q in range(quarter - 3, quarter + 1)]
+    return np.nan if None in window else sum(window)
+
+
+def test_quarter_as_of_uses_completed_quarters():
+    days = [str_to_day(d) for d in ("2015-03-30", "2015-03-31", "2015-04-01", "2015-12-31", "2016-01-01")]
+    assert quarter_as_of(days).tolist() == [quarter_index(d) for d in
+                                            ("2014-12-31", "2015-03-31", "2015-03-31", "2015-12-31", "2015-12-31")]
+
+
+def test_ttm_metrics_match_quarterly_records(workdir):
+    store = load_store()
+    raw = load_json("data/income_statement_quarter.json")
+    dates = ["2012-12-31", "2015-03-31", "2016-08-15", "2019-09-30", "2021-12-31", "2024-12-31"]
+    as_of = np.repeat([str_to_day(d) for d in dates], len(TICKERS))
+    metrics = compute_ttm_metrics(store, as_of, TICKERS * len(dates))
+    for row in metrics.itertuples():
+        records = raw.get(row.Ticker, [])
+        quarter = quarter_index(row.AsOf)
+        if row.AsOf[5:] not in ("03-31", "06-30", "09-30", "12-31"):
+            quarter -= 1
+        assert row.HasQuarterlyData == (row.Ticker in raw)
+        eps_end, eps_start = reference_ttm(records, "eps", quarter), reference_ttm(records, "eps", quarter - 16)
+        revenue_end, revenue_start = reference_ttm(records, "revenue", quarter), reference_ttm(records, "revenue", quarter - 40)
+        for actual, expected in [(row.TTMEPSEnd, eps_end), (row.TTMEPSStart, eps_start),
+                                 (row.TTMRevenueEnd, revenue_end), (row.TTMRevenueStart, revenue_start)]:
+            # rollierende Summe als Differenz kumulierter Summen: gleich bis auf die letzten Bits
+            assert actual == pytest.approx(expected, rel=1e-12, nan_ok=True), (row.Ticker, row.AsOf)
+        expected_growth = ((eps_end / eps_start) ** (1 / 4) - 1) * 100 if eps_end > 0 and eps_start > 0 else np.nan
+        assert row.EPSGrowth == pytest.approx(expected_growth, rel=1e-9, nan_ok=True), (row.Ticker, row.AsOf)
+
+
+def test_quarter_metrics_take_dividends_from_completed_year(workdir):
+    for as_of, year in [("2016-06-30", 2015), ("2016-12-31", 2016)]:
+        metrics = quarter_metrics(as_of)
+        dividends = year_metrics(year).drop_duplicates("Ticker").set_index("Ticker")
+        for row in metrics.itertuples():
+            np.testing.assert_equal(row.DividendYield, dividends.loc[row.Ticker, "DividendYield"])
+            np.testing.assert_equal(row.DividendCAGR, dividends.loc[row.Ticker, "DividendCAGR"])
+
+
+def test_quarterly_portfolios_are_bought_at_quarter_ends(workdir):
+    run_analysis("ranking_analysis/ranking_analysis.py", "--quarterly")
+    results = load_json("ranking_analysis/results/quarterly_results.json")
+    entries = {row["EntryDate"] for rows in results.values() for row in rows}
+    assert entries and all(date[5:] in ("03-31", "06-30", "09-30", "12-31") for date in entries)
+    summary = load_json("ranking_analysis/results/quarterly_summary.json")
+    assert [row["HoldingYears"] for row in summary] == sorted(
+        int(h) for h, rows in results.items() if any(row["TotalReturn (%)"] is not None for row in rows))
@@ -0,0 +1,61 @@
+#Copyright (C) 2025 Akram
+
+import os
+import runpy
+
+import numpy as np
+import pandas as pd
+
+from conftest import REPO_DIR, run_analysis
+from core.rank_weights import RANK_METRICS, RankMatrix, weight_grid
+
+
+def test_equal_weights_reproduce_extract_top(workdir):
+    module = runpy.run_path(os.path.join(REPO_DIR, "ranking_analysis/ranking_analysis.py"), run_name="analysis")
+    rank_matrix = RankMatrix()
+    ties = 0
+    for top_n in range(1, 31):
+        portfolios = rank_matrix.portfolios([(1, 1, 1, 1)], top_n)[0]
+        for year in rank_matrix.years:
+            ranking = module["merge_and_rank"](year)
+            assert portfolios[year] == ranking["Ticker"].head(top_n).tolist(), (top_n, year)
+            ties += ranking["Rank_Sum"].duplicated().sum()
+    assert portfolios == module["extract_top"]()
+    # der Testdatensatz enthält Gleichstände der Rangsummen
+    assert ties > 0
+
+
+def test_top_indices_break_ties_by_csv_position():
+    # viele Gleichstände und mehr als 16 Zeilen (dort sortiert quicksort nicht mehr stabil)
+    rng = np.random.default_rng(16)
+    years, size = 3, 200
+    rank_matrix = RankMatrix.__new__(RankMatrix)
+    rank_matrix.years = list(range(years))
+    rank_matrix.ranks = rng.integers(1, 6, (years, size, len(RANK_METRICS))).astype(np.float64)
+    rank_matrix.valid = np.ones((years, size), dtype=bool)
+    rank_matrix.valid[1, 150:] = False
+    rank_matrix.tickers = np.array([[f"X{i:03d}" for i in range(size)]] * years, dtype=object)
+
+    weights = [(1, 1, 1, 1), (2, 0, 1, 0), (0, 0, 0, 3)]
+    for top_n in (1, 7, 50, 199, 250):
+        for w, portfolios in enumerate(rank_matrix.portfolios(weights, top_n)):
+            for y in range(years):
+                frame = pd.DataFrame({"Ticker": rank_matrix.tickers[y], "Score": rank_matrix.ranks[y] @ weights[w]})
+                frame = frame[rank_matrix.valid[y]].sort_values("Score", kind="stable")
+                assert portfolios[y] == frame["Ticker"].head(top_n).tolist(), (weights[w], top_n, y)
+
+
+def test_weight_grid_skips_zero_weights():
+    grid = weight_grid([0, 1])
+    assert len(grid) == 15 and (0, 0, 0, 0) not in grid
+
+
+def test_weight_sweep_script(workdir, analysis_results):
+    run_analysis("ranking_analysis/weight_sweep.py", "--weight-values", "0", "1", "--top-n", "5", "30")
+    results = pd.read_csv("ranking_analysis/results/weight_sweep.csv")
+    assert len(results) == 15 * 2 * 10
+    equal = results[(results[[f"Weight_{metric}" for metric in RANK_METRICS]] == 1).all(axis=1) & (results["TopN"] == 30)]
+    for row in equal.to_dict(orient="records"):
+        comparison = analysis_results["comparison_results.json"][str(row["HoldingYears"])]
+        assert row["BeatsIndex"] == sum(r["Strategy_Beats_Index"] for r in comparison)
+        assert row["StartYears"] == len(analysis_results["simulation_results.json"][str(row["HoldingYears"])])
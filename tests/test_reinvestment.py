@@ -0,0 +1,95 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+import pytest
+
+from conftest import load_json
+from core.data_store import load_store
+from core.nav import NavEngine
+from core.simulation import SimulationEngine
+
+TICKERS = [f"T{i:02d}" for i in range(1, 15)] + ["OLD", "MID", "ZZZ", "GONE"]
+HORIZONS = [1, 4, 10]
+
+
+def reference_values(raw, ticker, start_year, end_year):
+    """
+    Endwert je investierter Einheit mit Wiederanlage, direkt aus den Rohdaten: Kauf zum letzten close
+    des Startjahres, jede Dividende mit Zahltag (paymentDate, sonst date) nach dem Startjahr bis zum
+    Ende des Endjahres kauft Anteile zum letzten close des dann aktiven Symbols an oder vor dem Zahltag.
+    """
+    prices, dividends, changes = raw
+    mapping = {c["oldSymbol"]: (c["date"], c["newSymbol"]) for c in changes}
+    segments, date, symbol = [(-np.inf, ticker)], "", ticker
+    while symbol in mapping and mapping[symbol][0] > date:
+        date, symbol = mapping[symbol]
+        segments.append((int(date[:4]), symbol))
+
+    def active(year):
+        return [s for first, s in segments if first <= year][-1]
+
+    def last_close(symbol, accept):
+        records = [r for r in prices.get(symbol, {"historical": []})["historical"] if accept(r["date"])]
+        return max(records, key=lambda r: r["date"])["close"] if records else None
+
+    start = last_close(active(start_year), lambda d: d.startswith(str(start_year)))
+    end = last_close(active(end_year), lambda d: d.startswith(str(end_year)))
+    if start is None or end is None or start <= 0:
+        return None
+    last_day = max(r["date"] for entry in prices.values() for r in entry["historical"])
+    shares = 1.0
+    for stage_symbol in dict.fromkeys(s for _, s in segments):
+        payments = []
+        for record in dividends.get(stage_symbol, {"historical": []})["historical"]:
+            paid = record["paymentDate"] or record["date"]
+            if start_year < int(paid[:4]) <= end_year and paid <= last_day and active(int(paid[:4])) == stage_symbol:
+                payments.append((paid, record["adjDividend"]))
+        # gleicher Zahltag: nacheinander zum selben Kurs
+        for paid, amount in sorted(payments, key=lambda p: p[0]):
+            price = last_close(stage_symbol, lambda d: d <= paid)
+            if price is not None and price > 0:
+                shares *= 1 + amount / price
+    return shares * end / start
+
+
+def test_drip_values_match_raw_records(workdir):
+    raw = (load_json("data/historical_price_full.json"), load_json("data/stock_dividend.json"),
+           load_json("data/symbol_change.json"))
+    engine = SimulationEngine(load_store(), raw[2], drip=True)
+    for start_year in range(2010, 2024):
+        end_years, valid, values, _ = engine.ticker_results(start_year, TICKERS, HORIZONS)
+        for ticker, ticker_valid, ticker_values in zip(TICKERS, valid, values):
+            for end_year, ok, value in zip(end_years.tolist(), ticker_valid, ticker_values):
+                expected = reference_values(raw, ticker, start_year, end_year)
+                assert ok == (expected is not None), (ticker, start_year, end_year)
+                if ok:
+                    assert value == pytest.approx(expected, rel=1e-12), (ticker, start_year, end_year)
+
+
+def test_drip_does_not_count_dividends_twice(workdir):
+    # adjClose enthält die Dividenden bereits: DRIP auf close muss nahe an der adjClose-Rendite liegen,
+    # während zusätzlich wieder angelegte Dividenden auf adjClose deutlich darüber lägen
+    store = load_store()
+    changes = load_json("data/symbol_change.json")
+    adjusted, drip = SimulationEngine(store, changes), SimulationEngine(store, changes, drip=True)
+    tickers = [f"T{i:02d}" for i in range(1, 12)]
+    _, valid, adjusted_values, _ = adjusted.ticker_results(2012, tickers, [10])
+    _, drip_valid, drip_values, _ = drip.ticker_results(2012, tickers, [10])
+    assert (valid == drip_valid).all() and valid.all()
+    ids = store.ticker_ids(tickers)[:, None]
+    growth = store.reinvestment.growth(ids, 2012, 2022)
+    np.testing.assert_allclose(drip_values, adjusted_values, rtol=0.05)
+    assert (adjusted_values * growth / drip_values - 1 > (growth - 1) / 2).all()
+    # T13 zahlt keine Dividenden: close und adjClose stimmen überein
+    _, _, without, _ = drip.ticker_results(2012, ["T13"], [10])
+    assert without == pytest.approx(adjusted.ticker_results(2012, ["T13"], [10])[2])
+
+
+def test_drip_nav_ends_at_total_return(workdir):
+    engine = NavEngine(load_store(), load_json("data/symbol_change.json"), drip=True)
+    tickers = ["T01", "T05", "T14", "OLD", "ZZZ"]
+    curves = engine.ticker_curves(2013, tickers, 2021)
+    _, valid, values, _ = engine.ticker_results(2013, tickers, [8])
+    assert valid.all()
+    # letzter Tageswert = Endwert der Jahressimulation, auch über die Umbenennungen von OLD hinweg
+    np.testing.assert_allclose(curves[:, -1], values[:, 0], rtol=1e-12)
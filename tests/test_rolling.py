@@ -0,0 +1,108 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+import pytest
+
+from conftest import load_json
+from core.data_store import day_to_str, load_store, str_to_day
+from core.rolling import RollingSimulation, shift_years
+from core.simulation import SimulationEngine
+
+TICKERS = [f"T{i:02d}" for i in range(1, 15)] + ["OLD", "MID", "ZZZ", "GONE"]
+
+
+def make_portfolios(seed):
+    rng = np.random.default_rng(seed)
+    portfolios = {year: list(rng.permutation(TICKERS)[:rng.integers(1, 10)]) for year in range(2010, 2024)}
+    portfolios[2010] = ["T01", "T13", "OLD"]
+    portfolios[2013] = ["OLD", "MID", "T12", "ZZZ", "GONE"]
+    return portfolios
+
+
+def normalized(rows):
+    # DataFrame-Spalten speichern None als NaN
+    return [{key: None if isinstance(value, float) and np.isnan(value) else value for key, value in row.items()}
+            for row in rows]
+
+
+def test_year_end_entries_match_yearly_simulation(workdir):
+    changes = load_json("data/symbol_change.json")
+    engine = SimulationEngine(load_store(), changes)
+    portfolios = make_portfolios(20)
+    rolling = RollingSimulation(engine).simulate_rows(portfolios, [f"{year}-12-31" for year in portfolios])
+    for holding_years, frame in engine.simulate(portfolios).items():
+        expected = normalized(frame.to_dict(orient="records"))
+        actual = [{"StartYear": int(row["EntryDate"][:4]), "EndYear": int(row["ExitDate"][:4]),
+                   **{key: row[key] for key in expected[0] if key not in ("StartYear", "EndYear")}}
+                  for row in rolling[holding_years]]
+        # gleiche Jahressummen in gleicher Reihenfolge -> auch TotalDividend bitgleich
+        assert actual == expected, holding_years
+    # 2010: Dividenden vor dem ersten Handelstag des Datensatzes (30.06.2010) zählen mit
+    assert rolling[1][0]["EntryDate"] == "2010-12-31" and rolling[1][0]["TotalDividend"] > 0
+
+
+def reference_rows(raw, portfolio_year, tickers, entry, holding_years, max_tickers):
+    """ Eine Zeile der rollierenden Simulation direkt aus den Rohdaten"""
+    prices, dividends, changes = raw
+    mapping = {c["oldSymbol"]: (c["date"], c["newSymbol"]) for c in changes}
+    exit_date = day_to_str(int(shift_years(str_to_day(entry), holding_years)))
+
+    def chain(ticker):
+        segments, date = [(-np.inf, ticker)], ""
+        while ticker in mapping and mapping[ticker][0] > date:
+            date, ticker = mapping[ticker]
+            segments.append((int(date[:4]), ticker))
+        return segments
+
+    def close(segments, date):
+        symbol = [s for first, s in segments if first <= int(date[:4])][-1]
+        records = [r for r in prices.get(symbol, {"historical": []})["historical"]
+                   if r["date"] <= date and r["date"][:7] == date[:7]]
+        return max(records, key=lambda r: r["date"])["adjClose"] if records else None
+
+    included, end_value, total_dividend = [], 0.0, 0.0
+    for ticker in tickers:
+        segments = chain(ticker)
+        start, end = close(segments, entry), close(segments, exit_date)
+        if start is None or end is None or start <= 0:
+            continue
+        included.append(ticker)
+        end_value += 1 + (((end - start) / start) * 100.0) / 100.0
+        for (first, symbol), (next_first, _) in zip(segments, segments[1:] + [(np.inf, None)]):
+            for record in dividends.get(symbol, {"historical": []})["historical"]:
+                year = int(record["date"][:4])
+                if max(int(entry[:4]), first) <= year <= min(int(exit_date[:4]), next_first - 1) and \
+                        (year < int(exit_date[:4]) or record["date"][:7] <= exit_date[:7]):
+                    total_dividend += record["adjDividend"]
+        if len(included) == max_tickers:
+            break
+    total_return = round((end_value - len(included)) / len(included) * 100, 2) if included else None
+    return {
+        "EntryDate": entry,
+        "ExitDate": exit_date,
+        "HoldingYears": holding_years,
+        "PortfolioYear": portfolio_year,
+        "TotalReturn (%)": total_return,
+        "TotalCAGR (%)": None if total_return is None else
+            round(((1 + total_return / 100.0) ** (1 / holding_years) - 1) * 100, 2),
+        "TotalDividend": round(total_dividend, 2),
+        "IncludedTickersCount": len(included),
+        "IncludedTickers": included,
+    }
+
+
+def test_month_end_entries_match_raw_records(workdir):
+    raw = (load_json("data/historical_price_full.json"), load_json("data/stock_dividend.json"),
+           load_json("data/symbol_change.json"))
+    portfolios = make_portfolios(21)
+    rolling = RollingSimulation(SimulationEngine(load_store(), raw[2])).simulate_rows(
+        portfolios, horizons=[1, 3, 7], max_tickers=4)
+    last_day = max(r["date"] for entry in raw[0].values() for r in entry["historical"])
+    for holding_years, rows in rolling.items():
+        assert rows and all(row["ExitDate"] <= last_day for row in rows)
+        for row in rows:
+            expected = reference_rows(raw, row["PortfolioYear"], portfolios[row["PortfolioYear"]],
+                                      row["EntryDate"], holding_years, 4)
+            # Monatsteilsummen in anderer Additionsreihenfolge: höchstens ein Cent Rundungsunterschied
+            assert row.pop("TotalDividend") == pytest.approx(expected.pop("TotalDividend"), abs=0.01 + 1e-9)
+            assert row == expected
@@ -0,0 +1,46 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+
+from conftest import load_json
+from core.data_store import get_store
+from core.metrics import load_universe
+from core.significance import SignificanceTest, sample_without_replacement
+from core.simulation import SimulationEngine, index_results_by_horizon
+
+
+def test_samples_have_no_repeated_positions():
+    rng = np.random.default_rng(18)
+    for population, size in [(10, 1), (10, 9), (10, 10), (500, 20)]:
+        picks = sample_without_replacement(rng, population, size, 4000)
+        assert picks.shape == (4000, size)
+        assert all(len(set(row)) == size for row in picks.tolist())
+        # jede Position gleich wahrscheinlich (Abweichung höchstens 5 Standardabweichungen)
+        expected = 4000 * size / population
+        counts = np.bincount(picks.ravel(), minlength=population)
+        assert np.abs(counts - expected).max() <= 5 * np.sqrt(expected)
+
+
+def run_test(portfolios, replications=2000):
+    engine = SimulationEngine(get_store(), load_json("data/symbol_change.json"))
+    horizons = [1, 3]
+    test = SignificanceTest(engine, portfolios)
+    rows = engine.simulate_rows(portfolios, horizons, max_tickers=100)
+    return test.run(rows, index_results_by_horizon(load_json("data/sp500_index.json"), horizons), replications)
+
+
+def test_whole_universe_has_no_random_spread(workdir):
+    # Portfolio = alle Unternehmen des Startjahres: ohne Zurücklegen ist jede Zufallsziehung identisch
+    universe = load_universe(range(2011, 2020))
+    results = run_test({year: group["Ticker"].tolist() for year, group in universe.groupby("Year")})
+    assert len(results) == 2
+    for row in results.to_dict(orient="records"):
+        assert np.isclose(row["RandomBandLow (%)"], row["RandomBandHigh (%)"], rtol=0, atol=1e-9)
+        assert np.isclose(row["RandomMeanReturn (%)"], row["StrategyMeanReturn (%)"], rtol=0, atol=1e-9)
+
+
+def test_small_portfolios_have_random_spread(workdir):
+    results = run_test({year: ["T01", "T02", "T03"] for year in range(2011, 2020)})
+    for row in results.to_dict(orient="records"):
+        assert row["RandomBandLow (%)"] < row["RandomMeanReturn (%)"] < row["RandomBandHigh (%)"]
+        assert 0 < row["PValueVsRandom"] <= 1 and 0 < row["PValueVsIndex"] <= 1
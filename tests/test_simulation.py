@@ -0,0 +1,91 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+import pytest
+
+from conftest import load_json
+from core.data_store import load_store
+from core.simulation import SimulationEngine
+
+TICKERS = [f"T{i:02d}" for i in range(1, 15)] + ["OLD", "MID", "NEW", "GONE"]
+
+
+def reference_simulation(raw, portfolios, holding_years, max_tickers):
+    """ Simulation je Haltedauer direkt auf den Rohdaten, Umbenennungen über beliebig viele Stufen"""
+    prices, dividends, changes = raw
+    mapping = {c["oldSymbol"]: (c["date"], c["newSymbol"]) for c in changes}
+
+    def chain(ticker):
+        """ [(erstes Jahr, Symbol)]: jedem Wechsel folgen, solange er nach dem vorherigen liegt"""
+        segments, date = [(-np.inf, ticker)], ""
+        while ticker in mapping and mapping[ticker][0] > date:
+            date, ticker = mapping[ticker]
+            segments.append((int(date[:4]), ticker))
+        return segments
+
+    def symbol_in_year(segments, year):
+        return [symbol for first, symbol in segments if first <= year][-1]
+
+    def year_end_close(ticker, year):
+        records = [r for r in prices.get(ticker, {"historical": []})["historical"] if r["date"].startswith(str(year))]
+        return max(records, key=lambda r: r["date"])["adjClose"] if records else None
+
+    def dividend_sum(ticker, first, last):
+        total = 0.0
+        for record in dividends.get(ticker, {"historical": []})["historical"]:
+            if first <= int(record["date"][:4]) <= last:
+                total += record["adjDividend"]
+        return total
+
+    rows = []
+    for start_year, tickers in portfolios.items():
+        end_year = start_year + holding_years
+        if end_year >= 2025:
+            break
+        included, end_value, total_dividend = [], 0.0, 0.0
+        for ticker in tickers:
+            segments = chain(ticker)
+            start = year_end_close(symbol_in_year(segments, start_year), start_year)
+            end = year_end_close(symbol_in_year(segments, end_year), end_year)
+            if start is None or end is None or start <= 0:
+                continue
+            included.append(ticker)
+            end_value += 1 + (((end - start) / start) * 100.0) / 100.0
+            # Dividenden jedes Symbols für die Jahre, in denen es aktiv war
+            ticker_dividend = 0.0
+            for (first, symbol), (next_first, _) in zip(segments, segments[1:] + [(np.inf, None)]):
+                ticker_dividend += dividend_sum(symbol, max(start_year, first), min(end_year, next_first - 1))
+            total_dividend += ticker_dividend
+            if len(included) == max_tickers:
+                break
+        total_return = round((end_value - len(included)) / len(included) * 100, 2) if included else None
+        rows.append({
+            "StartYear": start_year,
+            "EndYear": end_year,
+            "TotalReturn (%)": total_return,
+            "TotalCAGR (%)": None if total_return is None else
+                round(((1 + total_return / 100.0) ** (1 / holding_years) - 1) * 100, 2),
+            "TotalDividend": round(total_dividend, 2),
+            "IncludedTickersCount": len(included),
+            "IncludedTickers": included,
+        })
+    return rows
+
+
+@pytest.mark.parametrize("max_tickers", [3, 20])
+def test_engine_matches_reference_loop(workdir, max_tickers):
+    raw = (load_json("data/historical_price_full.json"), load_json("data/stock_dividend.json"),
+           load_json("data/symbol_change.json"))
+    rng = np.random.default_rng(max_tickers)
+    portfolios = {year: list(rng.permutation(TICKERS)[:rng.integers(0, 12)]) for year in range(2010, 2025)}
+    portfolios[2012] = ["OLD", "GONE", "T12"]
+    portfolios[2013] = ["OLD", "MID", "T01", "ZZZ"]
+
+    results = SimulationEngine(load_store(), raw[2]).simulate(portfolios, max_tickers=max_tickers)
+    assert sorted(results) == list(range(1, 11))
+    for holding_years, df in results.items():
+        expected = reference_simulation(raw, portfolios, holding_years, max_tickers)
+        # DataFrame-Spalten speichern None als NaN
+        actual = [{key: None if isinstance(value, float) and np.isnan(value) else value for key, value in row.items()}
+                  for row in df.to_dict(orient="records")]
+        assert actual == expected, holding_years
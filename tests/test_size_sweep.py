@@ -0,0 +1,29 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+import pandas as pd
+
+from conftest import load_json, run_analysis
+from core.data_store import get_store
+from core.simulation import SimulationEngine
+
+TICKERS = [f"T{i:02d}" for i in range(1, 15)] + ["OLD", "MID", "NEW", "GONE"]
+
+
+def test_every_size_equals_simulate_with_max_tickers(workdir):
+    engine = SimulationEngine(get_store(), load_json("data/symbol_change.json"))
+    rng = np.random.default_rng(17)
+    portfolios = {year: list(rng.permutation(TICKERS)[:rng.integers(0, 18)]) for year in range(2011, 2025)}
+    sizes = engine.simulate_sizes(portfolios, 12)
+    for size in range(1, 13):
+        expected = engine.simulate(portfolios, max_tickers=size)
+        for holding_years, frame in sizes.items():
+            actual = frame[frame["PortfolioSize"] == size].drop(columns="PortfolioSize").reset_index(drop=True)
+            pd.testing.assert_frame_equal(actual, expected[holding_years], check_exact=True)
+
+
+def test_size_sweep_script(workdir):
+    run_analysis("ranking_analysis/size_sweep.py", "--pool", "10", "--max-size", "6")
+    results = pd.read_csv("ranking_analysis/results/size_sweep.csv")
+    assert sorted(results["PortfolioSize"].unique()) == list(range(1, 7))
+    assert sorted(results["HoldingYears"].unique()) == list(range(1, 11))
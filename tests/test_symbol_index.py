@@ -0,0 +1,60 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+
+from core.symbol_index import SymbolIndex
+
+SYMBOLS = ["A", "B", "C", "D", "E"]
+
+
+def random_changes(rng, n):
+    changes = []
+    for _ in range(n):
+        old, new = rng.choice(SYMBOLS, 2, replace=False)
+        day = np.datetime64("2010-01-01") + int(rng.integers(0, 15 * 365))
+        changes.append({"date": str(day), "oldSymbol": f" {old}", "newSymbol": str(new)})
+    return changes
+
+
+def naive_chain(changes, ticker):
+    """ Ketten-Definition direkt: jeweils die früheste Umbenennung des aktuellen Symbols nach der vorherigen"""
+    hops, symbol, last = [], ticker, ""
+    while True:
+        later = [c for c in changes if c["oldSymbol"].strip() == symbol and c["date"] > last]
+        if not later:
+            return hops
+        first = min(later, key=lambda c: c["date"])
+        last, symbol = first["date"], first["newSymbol"]
+        hops.append((last, symbol))
+
+
+def test_lookups_match_naive_chains():
+    rng = np.random.default_rng(13)
+    for _ in range(50):
+        changes = random_changes(rng, int(rng.integers(0, 12)))
+        index = SymbolIndex(changes)
+        for ticker in SYMBOLS + ["X"]:
+            hops = naive_chain(changes, ticker)
+            for date in ["2009-06-30"] + [str(np.datetime64("2010-01-01") + int(d)) for d in rng.integers(0, 16 * 365, 20)]:
+                expected = ([symbol for day, symbol in hops if day <= date] or [ticker])[-1]
+                assert index.symbol_at(ticker, date) == expected, (changes, ticker, date)
+            for year in range(2009, 2026):
+                expected = ([symbol for day, symbol in hops if int(day[:4]) <= year] or [ticker])[-1]
+                assert index.symbol_in_year(ticker, year) == expected, (changes, ticker, year)
+
+        hop_years, symbols = index.hops(SYMBOLS)
+        for i, ticker in enumerate(SYMBOLS):
+            hops = naive_chain(changes, ticker)
+            assert symbols[i] == [ticker] + [symbol for _, symbol in hops]
+            assert hop_years[i, :len(hops)].tolist() == [int(day[:4]) for day, _ in hops]
+            assert np.isinf(hop_years[i, len(hops):]).all()
+
+
+def test_swapped_back_symbol_does_not_loop():
+    index = SymbolIndex([{"date": "2015-03-01", "oldSymbol": "A", "newSymbol": "B"},
+                         {"date": "2012-01-01", "oldSymbol": "B", "newSymbol": "A"},
+                         {"date": "2018-07-01", "oldSymbol": "B", "newSymbol": "A"}])
+    assert [hop[2] for hop in index.chain("A")] == ["B", "A"]
+    assert index.symbol_at("A", "2016-01-01") == "B"
+    assert index.symbol_at("A", "2019-01-01") == "A"
+    assert index.symbol_in_year("B", 2013) == "A"
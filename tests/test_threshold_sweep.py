@@ -0,0 +1,54 @@
+#Copyright (C) 2025 Akram
+
+import os
+import runpy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import REPO_DIR, run_analysis
+from core.data_store import get_store
+from core.threshold_sweep import FILTER_DEFAULTS, FilterMasks, parameter_grid
+
+
+def test_default_masks_match_filtering_portfolios(workdir):
+    module = runpy.run_path(os.path.join(REPO_DIR, "filtering_analysis/filtering_analysis.py"), run_name="analysis")
+    expected = module["collect_top_tickers_per_year"]()
+    assert FilterMasks(get_store()).portfolios(FILTER_DEFAULTS) == expected
+    assert any(expected.values())
+
+
+def test_masks_match_row_by_row_filters(workdir):
+    masks = FilterMasks(get_store())
+    metrics = masks.metrics
+    for low, high in [(0.5, 6.0), (1.0, 3.0), (0.0, 100.0)]:
+        expected = [low <= value <= high for value in metrics["DividendYield"].tolist()]
+        assert masks.dividend_yield(low, high).tolist() == expected
+        expected = [low <= value <= high for value in metrics["RevenueCAGR"].tolist()]
+        assert masks.revenue_cagr(low, high).tolist() == expected
+    assert masks.dividend_cagr(3.0).tolist() == [value >= 3.0 for value in metrics["DividendCAGR"].tolist()]
+    assert masks.dividend_cagr(3.0) is masks.dividend_cagr(3.0)
+
+
+def test_unknown_parameter_is_rejected():
+    with pytest.raises(ValueError):
+        parameter_grid({"dividend_yield": [1.0]})
+    assert len(parameter_grid({"dividend_cagr_min": [3.0, 5.0], "eps_threshold": [1.0, 5.0, 10.0]})) == 6
+
+
+def test_sweep_summarizes_default_simulation(workdir, analysis_results):
+    run_analysis("filtering_analysis/threshold_sweep.py", "--dividend-cagr-min", "3", "5", "--eps-threshold", "1", "10")
+    results = pd.read_csv("filtering_analysis/results/threshold_sweep.csv")
+    assert len(results) == 4 * 10
+
+    # die Standardkombination fasst filtering_simulation.json bzw. filtering_comparison.json zusammen
+    defaults = results[(results["dividend_cagr_min"] == 5) & (results["eps_threshold"] == 1)]
+    for row in defaults.to_dict(orient="records"):
+        rows = analysis_results["filtering_simulation.json"][str(row["HoldingYears"])]
+        comparison = analysis_results["filtering_comparison.json"][str(row["HoldingYears"])]
+        assert row["StartYears"] == len(rows)
+        # Startjahre ohne Ticker stehen als NaN in der JSON-Datei
+        returns = [r["TotalReturn (%)"] for r in rows if r["TotalReturn (%)"] is not None and not np.isnan(r["TotalReturn (%)"])]
+        assert row["MeanReturn (%)"] == pytest.approx(np.mean(returns))
+        assert row["BeatsIndex"] == sum(r["Strategy_Beats_Index"] for r in comparison)
@@ -0,0 +1,71 @@
+#Copyright (C) 2025 Akram
+
+import numpy as np
+import pytest
+
+from conftest import load_json
+from core.data_store import NO_DAY, load_store, str_to_day
+
+
+def test_dividend_sums_match_record_loops(workdir):
+    store = load_store()
+    yearly = store.yearly
+    raw = load_json("data/stock_dividend.json")
+    for ticker, entry in raw.items():
+        for year in range(2000, 2026):
+            records = [r for r in entry["historical"] if r["date"].startswith(str(year))]
+            expected = 0.0
+            for record in records:
+                expected += record["adjDividend"]
+            ticker_id = store.ticker_id(ticker)
+            # gleiche Additionsreihenfolge -> bitgleiche Summen
+            assert yearly.get("dividend_sum", ticker_id, year) == expected, (ticker, year)
+            days = [str_to_day(r["date"]) for r in records]
+            assert yearly.get("dividend_first_day", ticker_id, year) == (min(days) if days else NO_DAY)
+            assert yearly.get("dividend_last_day", ticker_id, year) == (max(days) if days else NO_DAY)
+
+
+def test_income_values_follow_last_valid_record(workdir):
+    store = load_store()
+    yearly = store.yearly
+    raw = load_json("data/income_statement_annual.json")
+    for ticker, records in raw.items():
+        revenue, eps = {}, {}
+        for record in records:
+            if record["revenue"] is not None:
+                revenue[int(record["date"][:4])] = (record["revenue"], str_to_day(record["date"]))
+            if record["eps"] is not None:
+                eps[int(record["calendarYear"])] = record["eps"]
+        ticker_id = store.ticker_id(ticker)
+        for year in range(2000, 2026):
+            value, day = revenue.get(year, (np.nan, NO_DAY))
+            np.testing.assert_equal(yearly.get("revenue", ticker_id, year), value)
+            assert yearly.get("revenue_day", ticker_id, year) == day
+            np.testing.assert_equal(yearly.get("eps", ticker_id, year), eps.get(year, np.nan))
+
+
+def test_unknown_tickers_and_years_get_fill_values(workdir):
+    yearly = load_store().yearly
+    assert yearly.get("dividend_sum", None, 2015) == 0.0
+    assert np.isnan(yearly.get("eps", -1, 2015))
+    assert yearly.get("dividend_last_day", 0, 1900) == NO_DAY
+    np.testing.assert_array_equal(yearly.get_range("dividend_sum", [-1, -1], 2015, 2017), np.zeros((2, 3)))
+
+
+def test_dividend_total_matches_sequential_sums(workdir):
+    store = load_store()
+    yearly = store.yearly
+    raw = load_json("data/stock_dividend.json")
+    tickers = sorted(raw) + ["GONE"]
+    ids = store.ticker_ids(tickers)
+    starts, ends = np.meshgrid(np.arange(1995, 2030), np.arange(1995, 2030), indexing="ij")
+    totals = yearly.dividend_total(ids[:, None, None], starts, ends)
+    for ticker, ticker_totals in zip(tickers, totals):
+        records = raw.get(ticker, {"historical": []})["historical"]
+        for start, end, total in zip(starts.ravel(), ends.ravel(), ticker_totals.ravel()):
+            expected = 0.0
+            for record in records:
+                if start <= int(record["date"][:4]) <= end:
+                    expected += record["adjDividend"]
+            # Differenz kumulierter Summen: gleiche Summe bis auf die letzten Bits
+            assert total == pytest.approx(expected, rel=1e-12, abs=1e-9), (ticker, start, end)